@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import http.cookiejar
+import json
+import random
+import time
+import urllib.request
+
+from yt_dlp.cookies import YoutubeDLCookieJar
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark generating Cookie headers from a large cookie jar')
+    parser.add_argument('--cookies', type=int, default=20000, help='number of cookies in the jar (default: %(default)s)')
+    parser.add_argument('--domains', type=int, default=3000, help='number of distinct domains (default: %(default)s)')
+    parser.add_argument('--requests', type=int, default=200, help='number of fragment requests (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed for the synthetic jar')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    return parser.parse_args()
+
+
+def make_cookies(count, domain_count, seed):
+    rng = random.Random(seed)
+    domains = ['youtube.com', 'googlevideo.com'] + [f'site{i}.example' for i in range(domain_count - 2)]
+    expires = int(time.time()) + 86400
+    for i in range(count):
+        domain = domains[i % len(domains)] if i < len(domains) else rng.choice(domains)
+        host = rng.choice(['', '.', 'www.', '.www.'])
+        yield http.cookiejar.Cookie(
+            version=0, name=f'cookie{i}', value=f'{rng.getrandbits(64):x}', port=None, port_specified=False,
+            domain=f'{host}{domain}', domain_specified=host.startswith('.'), domain_initial_dot=host.startswith('.'),
+            path=rng.choice(['/', '/', '/', '/videoplayback']), path_specified=True, secure=rng.random() < 0.5,
+            expires=rng.choice([None, expires]), discard=False, comment=None, comment_url=None, rest={})
+
+
+def run(jar, urls):
+    headers = []
+    start = time.perf_counter()
+    for url in urls:
+        request = urllib.request.Request(url)
+        jar.add_cookie_header(request)
+        headers.append(request.get_header('Cookie'))
+    return time.perf_counter() - start, headers
+
+
+def main():
+    args = parse_args()
+    cookies = list(make_cookies(args.cookies, args.domains, args.seed))
+    reference_jar, jar = http.cookiejar.MozillaCookieJar(), YoutubeDLCookieJar()
+    for cookie in cookies:
+        reference_jar.set_cookie(cookie)
+        jar.set_cookie(cookie)
+
+    urls = [
+        f'https://rr{i % 8}---sn-{i % 5}.googlevideo.com/videoplayback?id={i}&range={i * 1000}-{i * 1000 + 999}'
+        if i % 4 else f'https://www.youtube.com/api/timedtext?v={i}'
+        for i in range(args.requests)]
+    reference_time, reference_headers = run(reference_jar, urls)
+    indexed_time, indexed_headers = run(jar, urls)
+    if indexed_headers != reference_headers:
+        sys.exit('The Cookie headers differ from http.cookiejar')
+
+    results = {
+        'cookies': args.cookies,
+        'domains': args.domains,
+        'requests': args.requests,
+        'cookiejar': reference_time,
+        'indexed': indexed_time,
+        'speedup': reference_time / indexed_time,
+    }
+    if args.json:
+        print(json.dumps(results))
+        return
+    for key, value in results.items():
+        print(f'{key:<16}{value:.3f}' if isinstance(value, float) else f'{key:<16}{value}')
+
+
+if __name__ == '__main__':
+    main()
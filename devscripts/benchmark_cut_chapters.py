@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import json
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+
+from yt_dlp import YoutubeDL
+from yt_dlp.postprocessor import FFmpegSplitChaptersPP, ModifyChaptersPP
+from yt_dlp.utils import prepend_extension
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark removing SponsorBlock segments with forced keyframes')
+    parser.add_argument('--duration', type=int, default=3600, help='length of the test video in seconds (default: %(default)s)')
+    parser.add_argument('--segments', type=int, default=40, help='number of segments to remove (default: %(default)s)')
+    parser.add_argument('--gop', type=float, default=5, help='keyframe interval of the test video in seconds (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed for the segment positions')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    return parser.parse_args()
+
+
+def make_video(path, duration, gop):
+    fps = 25
+    subprocess.run([
+        'ffmpeg', '-v', 'error', '-y',
+        '-f', 'lavfi', '-i', f'testsrc2=size=320x180:rate={fps}',
+        '-f', 'lavfi', '-i', 'sine=frequency=440',
+        '-t', str(duration), '-c:v', 'libx264', '-preset', 'ultrafast', '-g', str(int(gop * fps)),
+        '-c:a', 'aac', '-shortest', path], check=True)
+
+
+def make_cuts(duration, count, seed):
+    rng = random.Random(seed)
+    slot = duration / count
+    cuts = []
+    for i in range(count):
+        start = i * slot + rng.uniform(0, slot / 2)
+        cuts.append({'start_time': round(start, 3), 'end_time': round(start + rng.uniform(5, slot / 3), 3)})
+    return cuts
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    args = parse_args()
+    if not shutil.which('ffmpeg') or not shutil.which('ffprobe'):
+        sys.exit('ffmpeg and ffprobe are required')
+
+    ydl = YoutubeDL({'quiet': True, 'noprogress': True})
+    pp = ModifyChaptersPP(ydl, force_keyframes=True)
+    results = {'duration': args.duration, 'segments': args.segments, 'gop': args.gop}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        video = os.path.join(tmpdir, 'video.mp4')
+        make_video(video, args.duration, args.gop)
+        cuts = make_cuts(args.duration, args.segments, args.seed)
+        concat_opts = pp._make_concat_opts(cuts, args.duration)
+
+        def full_reencode():
+            keyframe_file = pp.force_keyframes(video, (t for c in cuts for t in (c['start_time'], c['end_time'])))
+            pp.concat_files([keyframe_file] * len(concat_opts), prepend_extension(video, 'full'), concat_opts)
+            os.remove(keyframe_file)
+
+        def keyframe_cut():
+            pp._invalidate_probe_cache(video)
+            pp.cut_at_keyframes(video, prepend_extension(video, 'keyframes'), [
+                (float(opts.get('inpoint', 0)), float(opts['outpoint']) if 'outpoint' in opts else None)
+                for opts in concat_opts])
+
+        chapters = [{'start_time': c['start_time'], 'end_time': c['end_time'], 'title': str(i)}
+                    for i, c in enumerate(cuts)]
+        info = {'filepath': video, 'chapters': chapters, 'id': 'video', 'title': 'video', 'ext': 'mp4'}
+        ydl.params['outtmpl'] = {'default': '%(id)s', 'chapter': os.path.join(tmpdir, 'chapters', '%(section_number)s.%(ext)s')}
+
+        def split():
+            pp._invalidate_probe_cache(video)
+            FFmpegSplitChaptersPP(ydl, force_keyframes=True).run(dict(info, chapters=[dict(c) for c in chapters]))
+
+        results['remove_full_reencode'] = timed(full_reencode)
+        results['remove_keyframe_cut'] = timed(keyframe_cut)
+        results['split_keyframe_cut'] = timed(split)
+
+    if args.json:
+        print(json.dumps(results))
+        return
+    for key, value in results.items():
+        print(f'{key:<24}{value:.2f}s' if isinstance(value, float) else f'{key:<24}{value}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import json
+import subprocess
+import tempfile
+import time
+
+from test.media_server import MediaServer
+from yt_dlp.downloader.external import get_external_downloader
+
+EXTERNAL_DOWNLOADERS = ('aria2c', 'curl', 'wget', 'axel')
+# External downloaders that can download the fragments of HLS and DASH
+FRAGMENT_DOWNLOADERS = ('aria2c',)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark the downloaders against a local media server')
+    parser.add_argument('--size', type=float, default=128, help='size of each download in MB (default: %(default)s)')
+    parser.add_argument('--segments', type=int, default=64, help='number of HLS and DASH segments (default: %(default)s)')
+    parser.add_argument(
+        '--concurrency', type=lambda x: [int(n) for n in x.split(',')], default=[1, 4, 16], metavar='N,...',
+        help='values of --concurrent-fragments to benchmark the fragment downloaders with (default: 1,4,16)')
+    parser.add_argument('--latency', type=float, default=0, metavar='MS', help='latency of each response (default: %(default)s)')
+    parser.add_argument('--bandwidth', type=float, metavar='MB/S', help='bandwidth cap of each response (default: none)')
+    parser.add_argument('--error-rate', type=float, default=0, help='probability of a failed media request (default: %(default)s)')
+    parser.add_argument('--no-ranges', action='store_true', help='do not support byte ranges in the server')
+    parser.add_argument('--runs', type=int, default=3, help='number of runs of each case; the fastest is kept (default: %(default)s)')
+    parser.add_argument('--only', metavar='TEXT', help='only run the cases whose name contains TEXT')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def make_cases(server, args):
+    size = int(args.size * 1024 * 1024)
+    segment_size = size // args.segments
+    streams = {
+        'progressive': server.progressive_url(size),
+        'hls': server.hls_url(args.segments, segment_size),
+        'hls-aes': server.hls_url(args.segments, segment_size, encrypted=True),
+        'dash': server.dash_url(args.segments, segment_size),
+    }
+    for stream, url in streams.items():
+        concurrency = [1] if stream == 'progressive' else args.concurrency
+        externals = EXTERNAL_DOWNLOADERS if stream == 'progressive' else FRAGMENT_DOWNLOADERS
+        for downloader in ('native', *(name for name in externals if get_external_downloader(name).available())):
+            for n in concurrency if downloader == 'native' else [1]:
+                name = f'{stream}/{downloader}' + (f' -N {n}' if stream != 'progressive' and downloader == 'native' else '')
+                if not args.only or args.only in name:
+                    yield name, {'url': url, 'downloader': downloader, 'concurrency': n}
+
+
+def run_case(case):
+    """Download in this process and print the measurements as JSON"""
+    import resource
+
+    from yt_dlp import YoutubeDL
+
+    spans = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        params = {
+            'quiet': True,
+            'no_warnings': True,
+            'noprogress': True,
+            'outtmpl': os.path.join(tmpdir, '%(id)s.%(ext)s'),
+            'concurrent_fragment_downloads': case['concurrency'],
+            'retries': 10,
+            'fragment_retries': 10,
+            'retry_sleep_functions': {'http': lambda n: 0, 'fragment': lambda n: 0},
+            'timing_hooks': [spans.append],
+        }
+        if case['downloader'] != 'native':
+            params['external_downloader'] = {'default': case['downloader']}
+
+        # The CPU time and memory of the external downloaders are those of the child processes
+        def rusage():
+            return [resource.getrusage(who) for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)]
+
+        before, start = rusage(), time.perf_counter()
+        with YoutubeDL(params) as ydl:
+            info = ydl.extract_info(case['url'])
+        after, elapsed = rusage(), time.perf_counter() - start
+        size = os.path.getsize(info['requested_downloads'][0]['filepath'])
+
+    download = next(span for span in spans if span['phase'] == 'download')
+    # ru_maxrss is in kilobytes, except on macOS where it is in bytes
+    rss_unit = 1 if sys.platform == 'darwin' else 1024
+    print(json.dumps({
+        'downloader': download['name'],
+        'bytes': size,
+        'time': elapsed,
+        'download_time': download['duration'],
+        'speed': size / download['duration'] / 1024 / 1024,
+        'cpu': sum(a.ru_utime + a.ru_stime - b.ru_utime - b.ru_stime for a, b in zip(after, before)),
+        'peak_rss': max(usage.ru_maxrss for usage in after) * rss_unit / 1024 / 1024,
+        'retries': download['retries'],
+    }))
+
+
+def measure(case, runs):
+    best = None
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, __file__, '--run-case', json.dumps(case)],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if proc.returncode:
+            return {'error': proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f'exit code {proc.returncode}'}
+        result = json.loads(proc.stdout)
+        if best is None or result['download_time'] < best['download_time']:
+            best = result
+    return best
+
+
+def main():
+    args = parse_args()
+    if args.run_case:
+        return run_case(json.loads(args.run_case))
+
+    results, errors = {}, []
+    with MediaServer(
+            latency=args.latency / 1000, error_rate=args.error_rate, ranges=not args.no_ranges,
+            bandwidth=args.bandwidth and args.bandwidth * 1024 * 1024) as server:
+        for name, case in make_cases(server, args):
+            requests, server_errors = server.requests, server.errors
+            results[name] = measure(case, args.runs)
+            results[name].update({
+                'concurrency': case['concurrency'],
+                'requests': (server.requests - requests) // args.runs,
+                'injected_errors': server.errors - server_errors,
+            })
+            if 'error' in results[name]:
+                errors.append(f'{name}: {results[name]["error"]}')
+
+    if args.json:
+        print(json.dumps(results))
+    else:
+        print(f'{"case":<28}{"MB/s":>10}{"CPU s":>10}{"RSS MB":>10}{"retries":>10}')
+        for name, result in results.items():
+            if 'error' not in result:
+                print(f'{name:<28}{result["speed"]:>10.1f}{result["cpu"]:>10.2f}'
+                      f'{result["peak_rss"]:>10.1f}{result["retries"]:>10}')
+    if errors:
+        sys.exit('\n'.join(errors))
+
+
+if __name__ == '__main__':
+    main()
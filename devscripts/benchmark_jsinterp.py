@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import json
+import time
+
+from yt_dlp.jsinterp import JSInterpreter
+
+# Modelled on the signature and n-parameter functions of YouTube's player
+CODE = '''
+var Xy={Ab:function(a,b){a.splice(0,b)},Cd:function(a){a.reverse()},Ef:function(a,b){var c=a[0];a[0]=a[b%a.length];a[b%a.length]=c}};
+function sig(a) {
+    a = a.split("");
+    Xy.Cd(a, 45); Xy.Ef(a, 12); Xy.Ab(a, 3); Xy.Ef(a, 61); Xy.Cd(a, 2); Xy.Ef(a, 7);
+    return a.join("")
+}
+function nsig(a) {
+    var b = a.split(""), c = [1, 2, 3, 4, 5, 6, 7, 8];
+    for (var d = 0; d < b.length; d++) {
+        switch (d % 4) {
+            case 0: c.push(d); break;
+            case 1: c[d % 8] = (c[d % 8] + d) % 97; break;
+            default: c.unshift(c.pop())
+        }
+    }
+    try{b.reverse()}catch(e){}
+    return b.join("") + b[c.length % 8]
+}
+'''
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark calling JS functions repeatedly with JSInterpreter')
+    parser.add_argument('--calls', type=int, default=200, help='number of calls of each function (default: %(default)s)')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    return parser.parse_args()
+
+
+def run(get_interpreter, calls):
+    results = []
+    start = time.perf_counter()
+    for i in range(calls):
+        arg = f'{i:08x}' * 8
+        jsi = get_interpreter()
+        results.append((jsi.call_function('sig', arg), jsi.call_function('nsig', arg)))
+    return time.perf_counter() - start, results
+
+
+def main():
+    args = parse_args()
+    # A new interpreter per call has to parse the code every time, as the interpreter used to
+    uncached_time, uncached_results = run(lambda: JSInterpreter(CODE), args.calls)
+    jsi = JSInterpreter(CODE)
+    cached_time, cached_results = run(lambda: jsi, args.calls)
+    if cached_results != uncached_results:
+        sys.exit('The results of the compiled functions differ')
+
+    results = {
+        'calls': args.calls,
+        'uncached': uncached_time,
+        'cached': cached_time,
+        'speedup': uncached_time / cached_time,
+    }
+    if args.json:
+        print(json.dumps(results))
+        return
+    for key, value in results.items():
+        print(f'{key:<16}{value:.3f}' if isinstance(value, float) else f'{key:<16}{value}')
+
+
+if __name__ == '__main__':
+    main()
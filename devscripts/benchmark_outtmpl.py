@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import json
+import time
+
+from yt_dlp import YoutubeDL
+from yt_dlp.YoutubeDL import _compile_outtmpl
+
+TEMPLATES = (
+    '%(title)s [%(id)s].%(ext)s',
+    '%(playlist_title)s/%(playlist_index)s - %(title).50B [%(id)s].%(ext)s',
+    '%(uploader,channel|Unknown)s/%(upload_date>%Y-%m-%d)s %(title)s.%(ext)s',
+    '%(duration>%H-%M-%S)s %(view_count)D %(like_count*1000)d %(tags)l %(formats.:.format_id)j',
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark evaluating output templates for a large playlist')
+    parser.add_argument('--entries', type=int, default=5000, help='number of playlist entries (default: %(default)s)')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    return parser.parse_args()
+
+
+def make_entry(i, n_entries):
+    return {
+        'id': f'{i:011x}',
+        'title': f'Video number {i} / with some "special" characters?',
+        'ext': 'mp4',
+        'uploader': f'Uploader {i % 17}' if i % 3 else None,
+        'channel': f'Channel {i % 5}',
+        'upload_date': f'2024{i % 12 + 1:02d}{i % 28 + 1:02d}',
+        'duration': i * 7 % 5000,
+        'view_count': i * 12345,
+        'like_count': i,
+        'tags': [f'tag{j}' for j in range(i % 5)],
+        'formats': [{'format_id': f'{j}'} for j in range(3)],
+        'playlist_title': 'A large playlist',
+        'playlist_index': i + 1,
+        'n_entries': n_entries,
+        '__last_playlist_index': n_entries,
+    }
+
+
+def run(ydl, entries, clear_cache):
+    results = []
+    start = time.perf_counter()
+    for entry in entries:
+        for tmpl in TEMPLATES:
+            if clear_cache:
+                _compile_outtmpl.cache_clear()
+            results.append(ydl.evaluate_outtmpl(tmpl, entry, True))
+    return time.perf_counter() - start, results
+
+
+def main():
+    args = parse_args()
+    entries = [make_entry(i, args.entries) for i in range(args.entries)]
+    ydl = YoutubeDL({'quiet': True})
+    # Clearing the cache before each evaluation parses the template every time, as it used to be
+    uncached_time, uncached_results = run(ydl, entries, True)
+    cached_time, cached_results = run(ydl, entries, False)
+    if cached_results != uncached_results:
+        sys.exit('The results of the compiled templates differ')
+
+    results = {
+        'evaluations': len(cached_results),
+        'uncached': uncached_time,
+        'cached': cached_time,
+        'speedup': uncached_time / cached_time,
+    }
+    if args.json:
+        print(json.dumps(results))
+        return
+    for key, value in results.items():
+        print(f'{key:<16}{value:.3f}' if isinstance(value, float) else f'{key:<16}{value}')
+
+
+if __name__ == '__main__':
+    main()
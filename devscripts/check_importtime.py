@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import json
+import re
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+INVOCATIONS = {
+    'import': ['-c', 'import yt_dlp'],
+    'version': ['-m', 'yt_dlp', '--ignore-config', '--version'],
+    'help': ['-m', 'yt_dlp', '--ignore-config', '--help'],
+}
+
+# Heavy optional dependencies and subsystems that must only be imported when they are used
+LAZY_MODULES = (
+    'asyncio',
+    'sqlite3',
+    'secretstorage',
+    'Cryptodome.Cipher',
+    'Crypto.Cipher',
+    'requests',
+    'urllib3',
+    'curl_cffi',
+    'websockets',
+    'mutagen',
+    'yt_dlp.networking._requests',
+    'yt_dlp.networking._websockets',
+    'yt_dlp.networking._curlcffi',
+)
+
+_IMPORTTIME_RE = re.compile(r'import time:\s*(?P<self>\d+) \|\s*(?P<cumulative>\d+) \|(?P<indent> +)(?P<name>\S+)')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Check the import time of representative yt-dlp invocations')
+    parser.add_argument(
+        '--budget', type=float, default=750, metavar='MS',
+        help=(
+            'maximum import time of each invocation in milliseconds. The import time depends on the machine, '
+            'so the default only catches large regressions; on CI, use about twice the times measured '
+            'on its runners (default: %(default)s)'))
+    parser.add_argument('--runs', type=int, default=5, help='number of runs of each invocation (default: %(default)s)')
+    parser.add_argument('--top', type=int, default=10, help='number of the slowest modules to list (default: %(default)s)')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    return parser.parse_args()
+
+
+def importtime(args):
+    """@returns {module: (self, cumulative, depth)} in microseconds of a run of python with args"""
+    # Compiling the modules is not part of the import time of an installed yt-dlp, so the bytecode is cached
+    env = {k: v for k, v in os.environ.items() if k != 'PYTHONDONTWRITEBYTECODE'}
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', *args], cwd=ROOT_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    return {
+        mobj.group('name'): (int(mobj.group('self')), int(mobj.group('cumulative')), len(mobj.group('indent')) // 2)
+        for mobj in map(_IMPORTTIME_RE.match, proc.stderr.splitlines()) if mobj}
+
+
+def measure(args, baseline, runs):
+    """@returns the total import time in ms of the modules not imported by the interpreter itself, and the fastest run"""
+    best_time, best_modules = None, None
+    importtime(args)  # warm up
+    for _ in range(runs):
+        modules = {name: times for name, times in importtime(args).items() if name not in baseline}
+        total = sum(cumulative for _, cumulative, depth in modules.values() if depth == 0) / 1000
+        if best_time is None or total < best_time:
+            best_time, best_modules = total, modules
+    return best_time, best_modules
+
+
+def main():
+    args = parse_args()
+    # Modules imported at interpreter startup are not attributed to yt-dlp
+    baseline = importtime(['-c', 'pass'])
+
+    results, errors = {}, []
+    for name, invocation in INVOCATIONS.items():
+        total, modules = measure(invocation, baseline, args.runs)
+        eager = [name for name in LAZY_MODULES if any(
+            module == name or module.startswith(f'{name}.') for module in modules)]
+        results[name] = {
+            'time': total,
+            'modules': len(modules),
+            'eager_imports': eager,
+            'slowest': [
+                (module, times[0] / 1000)
+                for module, times in sorted(modules.items(), key=lambda x: x[1][0], reverse=True)[:args.top]],
+        }
+        if total > args.budget:
+            errors.append(f'{name}: {total:.1f}ms exceeds the budget of {args.budget:.1f}ms')
+        if eager:
+            errors.append(f'{name}: {", ".join(eager)} must only be imported when used')
+
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for name, result in results.items():
+            print(f'{name:<16}{result["time"]:.3f}ms ({result["modules"]} modules)')
+            for module, time in result['slowest']:
+                print(f'    {module:<44}{time:.3f}ms')
+    if errors:
+        sys.exit('\n'.join(errors))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import json
+
+from test.test_replay import FIXTURES_DIR, extract_test_case, get_fixture_test_cases
+from yt_dlp.networking._replay import load_fixture, save_fixture
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Record the network fixtures of extractor test cases, with budgets for test/test_replay.py')
+    parser.add_argument('tests', nargs='+', metavar='TEST', help='names of the test cases, like those of test_download without "test_"')
+    parser.add_argument(
+        '--cpu-factor', type=float, default=2, metavar='FACTOR',
+        help='CPU time budget as a multiple of the CPU time of the replayed extraction (default: %(default)s)')
+    parser.add_argument('--no-gzip', action='store_true', help='do not compress the fixtures')
+    parser.add_argument('--json', action='store_true', help='print the budgets as JSON')
+    return parser.parse_args()
+
+
+def record(test_case, filename, cpu_factor):
+    _, stats = extract_test_case(test_case, record_network=filename)
+    # The CPU time while recording includes the network stack, so measure it offline
+    _, replayed_stats = extract_test_case(test_case, replay_network=filename)
+    budget = {
+        'requests': stats['requests'],
+        'bytes': stats['bytes'],
+        'cpu': round(replayed_stats['cpu'] * cpu_factor, 3),
+    }
+    fixture = load_fixture(filename)
+    save_fixture(filename, fixture['exchanges'], {**fixture['meta'], 'budget': budget})
+    return budget
+
+
+def main():
+    args = parse_args()
+    test_cases = get_fixture_test_cases()
+    unknown = [name for name in args.tests if name.removeprefix('test_') not in test_cases]
+    if unknown:
+        sys.exit(f'Unknown test cases: {", ".join(unknown)}')
+
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    results, errors = {}, []
+    for name in args.tests:
+        name = name.removeprefix('test_')
+        filename = os.path.join(FIXTURES_DIR, f'{name}.json{"" if args.no_gzip else ".gz"}')
+        try:
+            results[name] = record(test_cases[name], filename, args.cpu_factor)
+        except Exception as e:
+            errors.append(f'{name}: {e}')
+            if os.path.exists(filename):
+                os.remove(filename)
+            continue
+        if not args.json:
+            print(f'{name}: {results[name]["requests"]} requests, {results[name]["bytes"]} bytes, '
+                  f'{results[name]["cpu"]:.3f}s CPU budget')
+
+    if args.json:
+        print(json.dumps(results))
+    if errors:
+        sys.exit('\n'.join(errors))
+
+
+if __name__ == '__main__':
+    main()
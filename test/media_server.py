@@ -0,0 +1,233 @@
+"""A local HTTP server of synthetic media for downloader tests and benchmarks
+
+Paths (SIZE is in bytes, of the whole file or of each segment):
+    /progressive/SIZE.mp4                    A progressive file
+    /hls/SEGMENTSxSIZE/index.m3u8            A HLS media playlist
+    /hls-aes/SEGMENTSxSIZE/index.m3u8        A HLS media playlist with AES-128 encrypted segments
+    /dash/SEGMENTSxSIZE/manifest.mpd         A DASH manifest with an initialization segment
+"""
+import functools
+import http.server
+import random
+import re
+import threading
+import time
+
+from test.helper import http_server_port
+from yt_dlp.aes import BLOCK_SIZE_BYTES, aes_cbc_encrypt_bytes
+from yt_dlp.dependencies import Cryptodome
+
+AES_KEY = bytes(range(16))
+AES_IV = bytes(range(16, 32))
+SEGMENT_DURATION = 4
+CHUNK_SIZE = 64 * 1024
+
+_PATH_RE = re.compile(r'''(?x)
+    /(?:
+        progressive/(?P<size>\d+)\.mp4|
+        (?P<type>hls|hls-aes|dash)/(?P<segments>\d+)x(?P<segment_size>\d+)/
+            (?P<file>index\.m3u8|manifest\.mpd|key|init\.mp4|seg(?P<index>\d+)\.(?:ts|m4s))
+    )$''')
+
+MPD_TEMPLATE = '''<?xml version="1.0" encoding="UTF-8"?>
+<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="static" minBufferTime="PT2S"
+     mediaPresentationDuration="PT{duration}S" profiles="urn:mpeg:dash:profile:isoff-live:2011">
+  <Period id="0">
+    <AdaptationSet mimeType="video/mp4" contentType="video" segmentAlignment="true">
+      <Representation id="video" bandwidth="1000000" codecs="avc1.64001f" width="1280" height="720">
+        <SegmentTemplate timescale="1" duration="{segment_duration}" startNumber="0"
+                         initialization="init.mp4" media="seg$Number$.m4s"/>
+      </Representation>
+    </AdaptationSet>
+  </Period>
+</MPD>
+'''
+
+
+class MediaServer:
+    """Serve synthetic media on 127.0.0.1 in a background thread
+
+    @param latency      Delay before each response in seconds
+    @param bandwidth    Maximum speed of each response in bytes/second
+    @param error_rate   Probability of failing a media request, with either
+                        a 503 response or a connection dropped halfway
+    @param ranges       Whether byte ranges are supported
+    """
+
+    def __init__(self, latency=0, bandwidth=None, error_rate=0, ranges=True, seed=0):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.ranges = ranges
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _MediaRequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.media_server = self
+        self.base_url = f'http://127.0.0.1:{http_server_port(self._httpd)}'
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        if self._thread:
+            self._httpd.shutdown()
+            self._thread = None
+        self._httpd.server_close()
+
+    def progressive_url(self, size):
+        return f'{self.base_url}/progressive/{size}.mp4'
+
+    def hls_url(self, segments, segment_size, encrypted=False):
+        return f'{self.base_url}/{"hls-aes" if encrypted else "hls"}/{segments}x{segment_size}/index.m3u8'
+
+    def dash_url(self, segments, segment_size):
+        return f'{self.base_url}/dash/{segments}x{segment_size}/manifest.mpd'
+
+    @staticmethod
+    @functools.cache
+    def payload(size):
+        """@returns the content of a progressive file or of a segment of the given size"""
+        return random.Random(size).randbytes(size)
+
+    @staticmethod
+    @functools.cache
+    def encrypted_payload(size):
+        padding = BLOCK_SIZE_BYTES - size % BLOCK_SIZE_BYTES
+        data = MediaServer.payload(size) + bytes([padding]) * padding
+        if Cryptodome.AES:
+            return Cryptodome.AES.new(AES_KEY, Cryptodome.AES.MODE_CBC, AES_IV).encrypt(data)
+        return aes_cbc_encrypt_bytes(data, AES_KEY, AES_IV)
+
+    @staticmethod
+    def hls_playlist(segments, encrypted):
+        lines = [
+            '#EXTM3U',
+            '#EXT-X-VERSION:3',
+            f'#EXT-X-TARGETDURATION:{SEGMENT_DURATION}',
+            '#EXT-X-MEDIA-SEQUENCE:0',
+            '#EXT-X-PLAYLIST-TYPE:VOD',
+        ]
+        if encrypted:
+            lines.append(f'#EXT-X-KEY:METHOD=AES-128,URI="key",IV=0x{AES_IV.hex()}')
+        for index in range(segments):
+            lines.extend((f'#EXTINF:{SEGMENT_DURATION:.1f},', f'seg{index}.ts'))
+        lines.append('#EXT-X-ENDLIST')
+        return '\n'.join(lines).encode()
+
+    def get(self, path):
+        """@returns (content type, content, whether it is media) of the path, or None"""
+        mobj = _PATH_RE.match(path)
+        if not mobj:
+            return None
+        elif mobj.group('size'):
+            return 'video/mp4', self.payload(int(mobj.group('size'))), True
+
+        media_type, file = mobj.group('type', 'file')
+        segments, segment_size = int(mobj.group('segments')), int(mobj.group('segment_size'))
+        if file == 'index.m3u8' and media_type != 'dash':
+            return 'application/vnd.apple.mpegurl', self.hls_playlist(segments, media_type == 'hls-aes'), False
+        elif file == 'manifest.mpd' and media_type == 'dash':
+            return 'application/dash+xml', MPD_TEMPLATE.format(
+                duration=segments * SEGMENT_DURATION, segment_duration=SEGMENT_DURATION).encode(), False
+        elif file == 'key' and media_type == 'hls-aes':
+            return 'application/octet-stream', AES_KEY, False
+        elif file == 'init.mp4' and media_type == 'dash':
+            return 'video/mp4', self.payload(1024), True
+        elif mobj.group('index') and int(mobj.group('index')) < segments:
+            if media_type == 'hls-aes':
+                return 'video/mp2t', self.encrypted_payload(segment_size), True
+            return 'video/mp2t' if media_type == 'hls' else 'video/mp4', self.payload(segment_size), True
+        return None
+
+    def should_fail(self):
+        with self._lock:
+            self.requests += 1
+            if not self.error_rate or self._random.random() >= self.error_rate:
+                return False
+            self.errors += 1
+            return self._random.choice(('status', 'drop'))
+
+
+class _MediaRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def do_GET(self):
+        self._respond()
+
+    def _respond(self, send_body=True):
+        server = self.server.media_server
+        if server.latency:
+            time.sleep(server.latency)
+
+        result = server.get(self.path.partition('?')[0])
+        if result is None:
+            return self._send_error(404)
+        content_type, content, is_media = result
+        failure = is_media and server.should_fail()
+        if failure == 'status':
+            return self._send_error(503)
+
+        start, end, status = 0, len(content), 200
+        range_header = server.ranges and self.headers.get('Range')
+        if range_header:
+            mobj = re.fullmatch(r'bytes=(\d+)-(\d*)', range_header.strip())
+            if not mobj or int(mobj.group(1)) >= len(content):
+                return self._send_error(416, {'Content-Range': f'bytes */{len(content)}'})
+            start = int(mobj.group(1))
+            end = min(int(mobj.group(2)) + 1, len(content)) if mobj.group(2) else len(content)
+            status = 206
+
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(end - start))
+        if server.ranges:
+            self.send_header('Accept-Ranges', 'bytes')
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{end - 1}/{len(content)}')
+        self.end_headers()
+        if not send_body:
+            return
+        if failure == 'drop':
+            end = start + (end - start) // 2
+        try:
+            self._write(memoryview(content)[start:end], server.bandwidth)
+        except ConnectionError:  # The client may close the connection without reading the whole response
+            failure = 'drop'
+        if failure == 'drop':
+            self.close_connection = True
+
+    def _write(self, data, bandwidth):
+        if not bandwidth:
+            self.wfile.write(data)
+            return
+        started = time.monotonic()
+        for offset in range(0, len(data), CHUNK_SIZE):
+            self.wfile.write(data[offset:offset + CHUNK_SIZE])
+            ahead = (offset + CHUNK_SIZE) / bandwidth - (time.monotonic() - started)
+            if ahead > 0:
+                time.sleep(ahead)
+
+    def _send_error(self, status, headers={}):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
@@ -18,11 +18,13 @@
 from test.helper import FakeYDL, assertRegexpMatches, try_rm
 from yt_dlp import YoutubeDL
 from yt_dlp.extractor.common import InfoExtractor
-from yt_dlp.postprocessor.common import PostProcessor
+from yt_dlp.postprocessor.common import PostProcessingPool, PostProcessor
 from yt_dlp.utils import (
+    DownloadError,
     ExtractorError,
     LazyList,
     OnDemandPagedList,
+    PostProcessingError,
     int_or_none,
     match_filter_func,
 )
@@ -857,6 +859,13 @@ def gen():
         test('%(title3)s', ('foo/bar\\test', 'foo⧸bar⧹test'))
         test('folder/%(title3)s', ('folder/foo/bar\\test', f'folder{os.path.sep}foo⧸bar⧹test'))
 
+        # Compiled templates are reused, but their values are not
+        ydl = FakeYDL()
+        for i in range(3):
+            self.assertEqual(
+                ydl.evaluate_outtmpl('%(id)s-%(n+1)03d-%(missing,n)s', {'id': f'id{i}', 'n': i}),
+                f'id{i}-{i + 1:03d}-{i}')
+
     def test_format_note(self):
         ydl = YoutubeDL()
         self.assertEqual(ydl._format_note({}), '')
@@ -905,6 +914,196 @@ def run(self, info):
         self.assertTrue(os.path.exists(filename), f'{filename} doesn\'t exist')
         os.unlink(filename)
 
+    def test_postprocessor_workers(self):
+        import tempfile
+        import time
+
+        class _YDL(YoutubeDL):
+            def dl(self, name, info, *args, **kwargs):
+                with open(name, 'w') as f:
+                    f.write(info['id'])
+                return True, True
+
+        class SlowPP(PostProcessor):
+            def run(self, info):
+                # Finish the first video last
+                time.sleep(0.3 if info['id'] == '1' else 0)
+                return [], info
+
+        class RecordPP(PostProcessor):
+            def run(self, info):
+                order.append(info['id'])
+                return [], info
+
+        order, depths = [], []
+        with tempfile.TemporaryDirectory() as tmpdir:
+            archive = os.path.join(tmpdir, 'archive.txt')
+            ydl = _YDL({
+                'outtmpl': os.path.join(tmpdir, '%(id)s.%(ext)s'),
+                'download_archive': archive,
+                'postprocessor_workers': 3,
+                'quiet': True,
+                'postprocessor_hooks': [lambda d: depths.append(d.get('queue_depth'))],
+            })
+            ydl.add_post_processor(SlowPP())
+            ydl.add_post_processor(RecordPP(), when='after_move')
+            for video_id in ('1', '2', '3'):
+                ydl.process_ie_result({
+                    'id': video_id, 'title': video_id, 'url': TEST_URL, 'ext': 'mp4',
+                    'extractor': 'test', 'extractor_key': 'Test',
+                })
+            ydl.wait_for_postprocessing()
+            ydl.close()
+            with open(archive) as f:
+                self.assertEqual(f.read().splitlines(), ['test 1', 'test 2', 'test 3'])
+
+        self.assertEqual(order, ['1', '2', '3'])
+        self.assertTrue(all(depth is not None for depth in depths))
+        self.assertGreater(max(depths), 1)
+
+    def test_postprocessor_workers_playlist(self):
+        import tempfile
+
+        class _YDL(YoutubeDL):
+            def dl(self, name, info, *args, **kwargs):
+                with open(name, 'w') as f:
+                    f.write(info['id'])
+                return True, True
+
+        class PlaylistPP(PostProcessor):
+            def run(self, info):
+                filepaths.append(traverse_obj(info, ('entries', ..., 'requested_downloads', ..., 'filepath')))
+                return [], info
+
+        filepaths = []
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ydl = _YDL({
+                'outtmpl': os.path.join(tmpdir, '%(id)s.%(ext)s'),
+                'postprocessor_workers': 2,
+                'quiet': True,
+            })
+            ydl.add_post_processor(PlaylistPP(), when='playlist')
+            ydl.process_ie_result({
+                '_type': 'playlist', 'id': 'playlist', 'title': 'playlist',
+                'extractor': 'test', 'extractor_key': 'Test', 'webpage_url': 'http://example.com/playlist',
+                'entries': [{
+                    'id': video_id, 'title': video_id, 'url': TEST_URL, 'ext': 'mp4',
+                    'extractor': 'test', 'extractor_key': 'Test',
+                } for video_id in ('1', '2')],
+            })
+            ydl.close()
+            # The playlist postprocessors see the entries once their postprocessing has finished
+            self.assertEqual(filepaths, [[os.path.join(tmpdir, '1.mp4'), os.path.join(tmpdir, '2.mp4')]])
+
+    def test_postprocessor_workers_errors(self):
+        import tempfile
+        import threading
+
+        class _YDL(YoutubeDL):
+            def dl(self, name, info, *args, **kwargs):
+                with open(name, 'w') as f:
+                    f.write(info['id'])
+                return True, True
+
+            def report_error(self, message, *args, **kwargs):
+                errors.append(message)
+                super().report_error(message, *args, **kwargs)
+
+        class FailPP(PostProcessor):
+            def run(self, info):
+                if info['id'] == '1':
+                    raise PostProcessingError('failed')
+                return [], info
+
+        def process(ydl, video_id):
+            return ydl.process_ie_result({
+                'id': video_id, 'title': video_id, 'url': TEST_URL, 'ext': 'mp4',
+                'extractor': 'test', 'extractor_key': 'Test',
+            })
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            params = {
+                'outtmpl': os.path.join(tmpdir, '%(id)s.%(ext)s'),
+                'postprocessor_workers': 2,
+                'quiet': True,
+                'ignoreerrors': True,
+            }
+            errors = []
+            ydl = _YDL(params)
+            ydl.add_post_processor(FailPP())
+            results = [process(ydl, video_id) for video_id in ('1', '2')]
+            ydl.wait_for_postprocessing()
+            ydl.close()
+            # The error is reported for the video that failed, and does not affect the others
+            self.assertEqual(errors, ['1: failed'])
+            # The returned info is completed by the background postprocessing
+            self.assertEqual(traverse_obj(results, (1, 'requested_downloads', ..., 'filepath')), [
+                os.path.join(tmpdir, '2.mp4')])
+
+            errors = []
+            ydl = _YDL({**params, 'ignoreerrors': False})
+            ydl.add_post_processor(FailPP())
+            process(ydl, '1')
+            self.assertRaises(DownloadError, ydl.wait_for_postprocessing)
+            ydl.close()
+            self.assertEqual(errors, ['1: Postprocessing: failed'])
+
+        # submit() blocks while all the workers are busy
+        pool, started, release = PostProcessingPool(1), threading.Event(), threading.Event()
+        pool.submit(release.wait)
+        thread = threading.Thread(target=lambda: pool.submit(started.set))
+        thread.start()
+        thread.join(0.2)
+        self.assertTrue(thread.is_alive())
+        release.set()
+        thread.join()
+        pool.join()
+        pool.close()
+        self.assertTrue(started.is_set())
+
+    def test_comments_jsonl(self):
+        import tempfile
+
+        class CommentsIE(InfoExtractor):
+            def _get_comments(self, video_id):
+                for i in range(3):
+                    yield {'id': f'{video_id}.{i}', 'text': f'comment {i}', 'parent': 'root', 'like_count': None}
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            def process(video_id, **params):
+                ydl = YoutubeDL({
+                    'outtmpl': os.path.join(tmpdir, '%(id)s.%(ext)s'),
+                    'getcomments': True,
+                    'comments_jsonl': True,
+                    'skip_download': True,
+                    'quiet': True,
+                    **params,
+                })
+                return ydl.process_ie_result({
+                    'id': video_id, 'title': 'video', 'ext': 'mp4', 'formats': [
+                        {'format_id': 'video', 'url': TEST_URL, 'ext': 'mp4', 'vcodec': 'h264', 'acodec': 'none'},
+                        {'format_id': 'audio', 'url': TEST_URL, 'ext': 'm4a', 'vcodec': 'none', 'acodec': 'aac'},
+                    ],
+                    '__post_extractor': CommentsIE(ydl).extract_comments(video_id),
+                })
+
+            # The comments are written once even if several formats are downloaded
+            info = process('video', format='video,audio')
+            self.assertNotIn('comments', info)
+            self.assertEqual(info['comment_count'], 3)
+            with open(os.path.join(tmpdir, 'video.comments.jsonl'), encoding='utf-8') as f:
+                self.assertEqual([json.loads(line) for line in f], [
+                    {'id': f'video.{i}', 'text': f'comment {i}', 'parent': 'root'} for i in range(3)])
+
+            # Like the other files, the comments are not written when simulating
+            info = process('video2', simulate=True)
+            self.assertEqual(len(info['comments']), 3)
+            self.assertFalse(os.path.exists(os.path.join(tmpdir, 'video2.comments.jsonl')))
+
+            info = process('video3', comments_jsonl=False)
+            self.assertEqual(len(info['comments']), 3)
+            self.assertFalse(os.path.exists(os.path.join(tmpdir, 'video3.comments.jsonl')))
+
     def test_match_filter(self):
         first = {
             'id': '1',
@@ -8,8 +8,12 @@
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+import http.cookiejar
+import random
 import re
 import tempfile
+import time
+import urllib.request
 
 from yt_dlp.cookies import YoutubeDLCookieJar
 
@@ -61,6 +65,70 @@ def test_get_cookies_for_url(self):
         cookies = cookiejar.get_cookies_for_url('https://foobar.foobar/')
         self.assertFalse(cookies)
 
+    @staticmethod
+    def _make_cookie(name, domain, path='/', secure=False, expires=None, version=0, port=None, value=None):
+        return http.cookiejar.Cookie(
+            version=version, name=name, value=name if value is None else value, port=port, port_specified=port is not None,
+            domain=domain, domain_specified=domain.startswith('.'), domain_initial_dot=domain.startswith('.'),
+            path=path, path_specified=True, secure=secure, expires=expires, discard=False,
+            comment=None, comment_url=None, rest={})
+
+    def test_indexed_lookup(self):
+        rng = random.Random(0)
+        now = int(time.time())
+        hosts = ['example.com', 'www.example.com', 'a.b.example.com', 'example.org', 'localhost', '127.0.0.1', 'com', '']
+        paths = ['/', '/a', '/a/', '/a/b', '/b/c/']
+        cookies = [self._make_cookie(
+            f'c{i}', rng.choice(['', '.']) + rng.choice(hosts) if rng.random() < 0.95 else rng.choice(hosts).upper(),
+            path=rng.choice(paths), secure=rng.random() < 0.3,
+            expires=rng.choice([None, now - 10, now + 3600]),
+            version=int(rng.random() < 0.05), port=rng.choice([None] * 10 + ['443', '80,8080']),
+            value=rng.choice([None, 'v', 'with space'])) for i in range(300)]
+
+        expected_jar, jar = http.cookiejar.CookieJar(), YoutubeDLCookieJar()
+        for cookie in cookies:
+            expected_jar.set_cookie(cookie)
+            jar.set_cookie(cookie)
+
+        def cookie_header(cookiejar, url, unverifiable=False):
+            request = urllib.request.Request(url, unverifiable=unverifiable, origin_req_host='other.net')
+            cookiejar.add_cookie_header(request)
+            return request.get_header('Cookie')
+
+        urls = [
+            f'{scheme}://{host}{port}{path}'
+            for scheme in ('http', 'https') for host in hosts[:-1] + ['EXAMPLE.com', 'sub.www.example.com', 'other.net']
+            for port in ('', ':8080') for path in ('', '/a', '/a/b/c', '/b/c/d')]
+        for _ in range(2):  # The second time uses the cached headers
+            for url in urls:
+                for unverifiable in (False, True):
+                    with self.subTest(url=url, unverifiable=unverifiable):
+                        self.assertEqual(
+                            cookie_header(jar, url, unverifiable), cookie_header(expected_jar, url, unverifiable))
+                self.assertEqual(
+                    [cookie.name for cookie in jar.get_cookies_for_url(url)],
+                    [cookie.name for cookie in expected_jar._cookies_for_request(urllib.request.Request(url))])
+
+        self.assertEqual(cookie_header(jar, 'https://www.example.com/a'), cookie_header(expected_jar, 'https://www.example.com/a'))
+        self.assertEqual(len(jar), len(expected_jar))
+        self.assertNotIn('new', cookie_header(jar, 'https://www.example.com/a'))
+        jar.set_cookie(self._make_cookie('new', '.example.com'))
+        self.assertIn('new=new', cookie_header(jar, 'https://www.example.com/a'))
+        jar.clear('.example.com', '/', 'new')
+        self.assertNotIn('new', cookie_header(jar, 'https://www.example.com/a'))
+        jar.clear()
+        self.assertIsNone(cookie_header(jar, 'https://www.example.com/a'))
+
+    def test_indexed_lookup_expiry(self):
+        jar = YoutubeDLCookieJar()
+        jar.set_cookie(self._make_cookie('short', '.example.com', expires=int(time.time()) + 1))
+        jar.set_cookie(self._make_cookie('long', '.example.com', expires=int(time.time()) + 3600))
+        self.assertEqual(jar.get_cookie_header('https://example.com'), 'short=short; long=long')
+        self.assertEqual(len(jar), 2)
+        time.sleep(1.1)
+        self.assertEqual(jar.get_cookie_header('https://example.com'), 'long=long')
+        self.assertEqual(len(jar), 1)
+
 
 if __name__ == '__main__':
     unittest.main()
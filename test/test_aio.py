@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import asyncio
+import contextlib
+import http.server
+import tempfile
+import threading
+import time
+
+from test.helper import http_server_port
+from yt_dlp.aio import AsyncYoutubeDL
+
+TEST_SIZE = 10 * 1024
+
+FEED = '''<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Feed</title>
+<item><title>First</title><link>{0}/first.mp4</link></item>
+<item><title>Second</title><link>{0}/second.mp4</link></item>
+<item><title>Third</title><link>{0}/third.mp4</link></item>
+</channel></rss>'''
+
+
+class HTTPTestRequestHandler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == '/feed.rss':
+            content = FEED.format(f'http://127.0.0.1:{self.server.server_port}').encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/rss+xml')
+            self.send_header('Content-Length', len(content))
+            self.end_headers()
+            self.wfile.write(content)
+            return
+
+        slow = self.path == '/slow.mp4'
+        size = TEST_SIZE * 100 if slow else TEST_SIZE
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', size)
+        self.end_headers()
+        for _ in range(size // 1024):
+            self.wfile.write(b'#' * 1024)
+            if slow:
+                time.sleep(0.02)
+
+
+class TestAsyncYoutubeDL(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), HTTPTestRequestHandler)
+        self.httpd.daemon_threads = True
+        self.base_url = f'http://127.0.0.1:{http_server_port(self.httpd)}'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.tmpdir.cleanup()
+
+    def ydl(self, **params):
+        return AsyncYoutubeDL({
+            'quiet': True,
+            'no_warnings': True,
+            'noprogress': True,
+            'outtmpl': os.path.join(self.tmpdir.name, '%(id)s.%(ext)s'),
+            **params,
+        })
+
+    async def test_extract_info(self):
+        async with self.ydl() as ydl:
+            progress = ydl.progress_stream(maxsize=1)
+            task = asyncio.create_task(ydl.extract_info(f'{self.base_url}/video.mp4', progress=progress))
+            statuses = [status async for status in progress]
+            info = await task
+            self.assertEqual(info['id'], 'video')
+            self.assertEqual(statuses[-1]['status'], 'finished')
+            self.assertEqual(statuses[-1]['downloaded_bytes'], TEST_SIZE)
+            self.assertEqual(os.path.getsize(os.path.join(self.tmpdir.name, 'video.mp4')), TEST_SIZE)
+
+            infos = await asyncio.gather(*(
+                ydl.extract_info(f'{self.base_url}/{name}.mp4', download=False) for name in ('a', 'b', 'c')))
+            self.assertEqual([info['id'] for info in infos], ['a', 'b', 'c'])
+            self.assertLessEqual(len(ydl._idle), 4)
+
+    async def test_cancel(self):
+        async with self.ydl() as ydl:
+            progress = ydl.progress_stream()
+            task = asyncio.create_task(ydl.extract_info(f'{self.base_url}/slow.mp4', progress=progress))
+            await anext(progress)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            # The stream ends and the instance is not reused
+            async for _ in progress:
+                pass
+            self.assertEqual(ydl._idle, [])
+
+    async def test_entries(self):
+        async with self.ydl(playlist_items='2:') as ydl:
+            entries = [(index, entry['url']) async for index, entry in ydl.entries(f'{self.base_url}/feed.rss')]
+            self.assertEqual(entries, [(2, f'{self.base_url}/second.mp4'), (3, f'{self.base_url}/third.mp4')])
+
+            async with contextlib.aclosing(ydl.entries(f'{self.base_url}/feed.rss')) as entries:
+                async for _ in entries:
+                    break
+            self.assertEqual(len(ydl._idle), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
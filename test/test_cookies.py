@@ -1,4 +1,7 @@
 import datetime as dt
+import os
+import stat
+import tempfile
 import unittest
 
 from yt_dlp import cookies
@@ -7,11 +10,14 @@
     LinuxChromeCookieDecryptor,
     MacChromeCookieDecryptor,
     WindowsChromeCookieDecryptor,
+    _BrowserCookieCache,
     _get_linux_desktop_environment,
     _LinuxDesktopEnvironment,
+    extract_cookies_from_browser,
     parse_safari_cookies,
     pbkdf2_sha1,
 )
+from yt_dlp.dependencies import Cryptodome, sqlite3
 
 
 class Logger:
@@ -171,6 +177,71 @@ def test_pbkdf2_sha1(self):
         self.assertEqual(key, b'g\xe1\x8e\x0fQ\x1c\x9b\xf3\xc9`!\xaa\x90\xd9\xd34')
 
 
+@unittest.skipUnless(sqlite3, 'sqlite3 is not available')
+class TestBrowserCookies(unittest.TestCase):
+    HOSTS = ('youtube.com', '.youtube.com', 'www.youtube.com', 'notyoutube.com', 'youtube.com.example', '.example.com')
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.profile = os.path.join(self._tmpdir.name, 'profile') + os.path.sep
+        self.cache_dir = os.path.join(self._tmpdir.name, 'cache')
+        os.mkdir(self.profile)
+        self._add_cookies(self.HOSTS)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _add_cookies(self, hosts):
+        with sqlite3.connect(os.path.join(self.profile, 'cookies.sqlite')) as conn:
+            conn.execute('PRAGMA user_version = 15')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS moz_cookies (host TEXT, name TEXT, value TEXT, path TEXT, '
+                'expiry INTEGER, isSecure INTEGER, originAttributes TEXT)')
+            conn.executemany(
+                'INSERT INTO moz_cookies VALUES (?, ?, ?, \'/\', 2000000000, 1, \'\')',
+                [(host, 'name', f'value of {host}') for host in hosts])
+        conn.close()
+
+    def _extract(self, **kwargs):
+        jar = extract_cookies_from_browser('firefox', self.profile, Logger(), **kwargs)
+        return sorted((cookie.domain, cookie.value) for cookie in jar)
+
+    def test_domain_filter(self):
+        self.assertEqual(len(self._extract()), len(self.HOSTS))
+        self.assertEqual(self._extract(domains=['YouTube.com']), [
+            (host, f'value of {host}') for host in sorted(('youtube.com', '.youtube.com', 'www.youtube.com'))])
+        self.assertEqual(self._extract(domains=['.example.com', 'www.youtube.com']), [
+            ('.example.com', 'value of .example.com'), ('www.youtube.com', 'value of www.youtube.com')])
+        self.assertEqual(self._extract(domains=['_xample.com']), [])
+
+    @unittest.skipUnless(Cryptodome.AES, 'pycryptodomex is not installed')
+    def test_cache(self):
+        cache = _BrowserCookieCache(self.cache_dir)
+        extracted = self._extract(cache=cache)
+        self.assertEqual(len(extracted), len(self.HOSTS))
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+        if os.name != 'nt':
+            for file in os.listdir(self.cache_dir):
+                self.assertEqual(stat.S_IMODE(os.stat(os.path.join(self.cache_dir, file)).st_mode), 0o600)
+        for file in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, file), 'rb') as f:
+                self.assertNotIn(b'value of', f.read())
+
+        def fail(*args, **kwargs):
+            raise AssertionError('The cookies should have been loaded from the cache')
+
+        with MonkeyPatch(cookies, {'_open_database_copy': fail}):
+            self.assertEqual(self._extract(cache=cache), extracted)
+            self.assertEqual(self._extract(cache=_BrowserCookieCache(self.cache_dir)), extracted)
+
+        # A different specification and a changed database are not served from the cache
+        self.assertEqual(len(self._extract(cache=cache, domains=['youtube.com'])), 3)
+        self._add_cookies(['new.example.com'])
+        self.assertEqual(len(self._extract(cache=cache)), len(self.HOSTS) + 1)
+        with MonkeyPatch(cookies, {'_open_database_copy': fail}):
+            self.assertEqual(len(self._extract(cache=cache)), len(self.HOSTS) + 1)
+
+
 class TestLenientSimpleCookie(unittest.TestCase):
     def _run_tests(self, *cases):
         for message, raw_cookie, expected in cases:
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import http.server
+import tempfile
+import threading
+import time
+
+from test.helper import http_server_port
+from yt_dlp import YoutubeDL
+from yt_dlp.daemon import JobServer, _remove_option, read_secret_file, send_request
+
+TEST_SIZE = 10 * 1024
+TEST_SECRET = 'secret'
+
+
+class HTTPTestRequestHandler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        slow = self.path == '/slow.mp4'
+        size = TEST_SIZE * 100 if slow else TEST_SIZE
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', size)
+        self.end_headers()
+        for _ in range(size // 1024):
+            self.wfile.write(b'#' * 1024)
+            if slow:
+                time.sleep(0.02)
+
+
+class TestJobServer(unittest.TestCase):
+    def setUp(self):
+        self.httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), HTTPTestRequestHandler)
+        self.httpd.daemon_threads = True
+        self.base_url = f'http://127.0.0.1:{http_server_port(self.httpd)}'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.server = JobServer(YoutubeDL({'quiet': True}), '127.0.0.1:0', [
+            '--ignore-config', '--no-progress', '-o', os.path.join(self.tmpdir.name, '%(id)s.%(ext)s'),
+        ], secret=TEST_SECRET)
+        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.server_thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server_thread.join()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.tmpdir.cleanup()
+
+    def request(self, **request):
+        return list(send_request(self.server.address, request, timeout=30, secret=TEST_SECRET))
+
+    def test_download(self):
+        for _ in range(2):
+            events = self.request(action='download', urls=[f'{self.base_url}/video.mp4'], args=['--no-part'])
+            self.assertEqual(events[0]['type'], 'queued')
+            self.assertEqual(events[1]['type'], 'started')
+            self.assertEqual(events[-1], {'job': events[0]['job'], 'type': 'finished', 'status': 'finished', 'retcode': 0})
+            [info] = [event['info'] for event in events if event['type'] == 'info']
+            self.assertEqual(info['id'], 'video')
+            self.assertEqual(
+                [event['downloaded_bytes'] for event in events if event['type'] == 'progress'][-1], TEST_SIZE)
+            self.assertEqual(os.path.getsize(os.path.join(self.tmpdir.name, 'video.mp4')), TEST_SIZE)
+            os.remove(os.path.join(self.tmpdir.name, 'video.mp4'))
+
+        # The YoutubeDL instance is reused by the second job
+        self.assertEqual(len(self.server._idle), 1)
+        self.assertEqual([job['status'] for job in self.request(action='status')[0]['jobs']], ['finished'] * 2)
+
+    def test_cancel(self):
+        events = send_request(self.server.address, {
+            'action': 'download', 'urls': [f'{self.base_url}/slow.mp4'], 'args': []}, timeout=30, secret=TEST_SECRET)
+        job_id = next(events)['job']
+        next(event for event in events if event['type'] == 'progress')
+        self.assertEqual(self.request(action='cancel', job=job_id), [{'job': job_id, 'type': 'cancel', 'ok': True}])
+        self.assertEqual(list(events)[-1], {'job': job_id, 'type': 'finished', 'status': 'cancelled'})
+        self.assertEqual(self.request(action='cancel', job=job_id)[0]['ok'], False)
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.request(action='bogus'), [{'type': 'error', 'error': "unknown action 'bogus'"}])
+        self.assertEqual(self.request(action='download', urls='x')[0]['type'], 'error')
+        events = self.request(action='download', urls=['x'], args=['--bogus-option'])
+        self.assertEqual(events[-1]['status'], 'error')
+        self.assertIn('no such option: --bogus-option', events[-1]['error'])
+
+    def test_secret(self):
+        for secret in (None, 'bogus', 1):
+            self.assertEqual(
+                list(send_request(self.server.address, {'action': 'status', 'secret': secret}, timeout=30)),
+                [{'type': 'error', 'error': 'invalid secret'}])
+        self.assertEqual(self.request(action='status')[0]['type'], 'status')
+
+        with self.assertRaisesRegex(ValueError, 'secret is required'):
+            JobServer(YoutubeDL({'quiet': True}), '127.0.0.1:0')
+
+    def test_secret_file(self):
+        path = os.path.join(self.tmpdir.name, 'secret')
+        secret = read_secret_file(path, create=True)
+        self.assertTrue(secret)
+        self.assertEqual(read_secret_file(path, create=True), secret)
+        self.assertEqual(read_secret_file(path), secret)
+        if os.name != 'nt':
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+            os.chmod(path, 0o644)
+            with self.assertRaisesRegex(ValueError, 'only be accessible by its owner'):
+                read_secret_file(path)
+
+        # The jobs are not parsed with the secret file
+        self.assertEqual(
+            _remove_option(['--daemon-secret-file', path, '-f', 'b', '--daemon-secret-file=x', '--', '--daemon-secret-file'],
+                           '--daemon-secret-file'),
+            ['-f', 'b', '--', '--daemon-secret-file'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,9 +8,14 @@
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import http.cookiejar
+import tempfile
+from unittest.mock import Mock, patch
 
 from test.helper import FakeYDL
+from test.media_server import MediaServer
+from yt_dlp import YoutubeDL
 from yt_dlp.downloader.external import (
+    Aria2cDaemon,
     Aria2cFD,
     AxelFD,
     CurlFD,
@@ -18,6 +23,7 @@
     HttpieFD,
     WgetFD,
 )
+from yt_dlp.networking._replay import save_fixture
 
 TEST_COOKIE = {
     'version': 0,
@@ -104,6 +110,111 @@ def test_make_cmd(self):
             cmd = downloader._make_cmd('test', TEST_INFO)
             self.assertIn(f'--load-cookies={downloader._cookies_tempfile}', cmd)
 
+    def test_make_jobs(self):
+        with FakeYDL() as ydl:
+            downloader = Aria2cFD(ydl, {})
+            ydl.cookiejar.set_cookie(http.cookiejar.Cookie(**TEST_COOKIE))
+            [(url, options)] = downloader._make_jobs('test', {**TEST_INFO, 'http_headers': {'X-Test': '1'}})
+            self.assertEqual(url, TEST_INFO['url'])
+            self.assertEqual(options['out'], f'.{os.path.sep}test')
+            self.assertEqual(options['dir'], os.path.abspath('.') + os.path.sep)
+            # Cookies are sent as a header instead of a cookies file
+            self.assertEqual(options['header'], ['X-Test: 1', 'Cookie: test=ytdlp'])
+            self.assertFalse(hasattr(downloader, '_cookies_tempfile'))
+
+            jobs = downloader._make_jobs('test', {**TEST_INFO, 'fragments': [
+                {'url': 'http://www.example.com/0'}, {'url': 'http://example.net/1'}]})
+            self.assertEqual([(url, options['out'], options['header']) for url, options in jobs], [
+                ('http://www.example.com/0', f'.{os.path.sep}test-Frag0', ['Cookie: test=ytdlp']),
+                ('http://example.net/1', f'.{os.path.sep}test-Frag1', [])])
+
+    def test_rate_limit_per_host(self):
+        with FakeYDL() as ydl:
+            downloader = Aria2cFD(ydl, {'ratelimit_per_host': 300_000})
+            self.assertIn('--max-download-limit=300000', downloader._make_cmd('test', TEST_INFO))
+            [(_, options)] = downloader._make_jobs('test', TEST_INFO)
+            self.assertEqual(options['max-download-limit'], '300000')
+
+            # The downloads from the same host share its limit
+            jobs = downloader._make_jobs('test', {**TEST_INFO, 'fragments': [
+                {'url': 'http://www.example.com/0'}, {'url': 'http://www.example.com/1'},
+                {'url': 'http://www.example.com/2'}, {'url': 'http://example.net/3'}]})
+            self.assertEqual(
+                [options['max-download-limit'] for _, options in jobs], ['100000', '100000', '100000', '300000'])
+
+    def test_daemon_status_fault(self):
+        daemon = Aria2cDaemon.__new__(Aria2cDaemon)
+        complete = {'status': 'complete', 'totalLength': '10', 'completedLength': '10', 'downloadSpeed': '0'}
+        with patch.object(daemon, 'multicall', return_value=[
+                complete, {'faultCode': 1, 'faultString': 'GID 0000000000000001 is not found'}]):
+            stats = daemon.status(['0000000000000000', '0000000000000001'])
+        self.assertEqual(stats[0], complete)
+        self.assertEqual(stats[1]['status'], 'error')
+
+        # A download that aria2c does not know about has failed
+        with FakeYDL() as ydl:
+            downloader = Aria2cFD(ydl, {'compat_opts': []})
+            _, stderr, retval = downloader._wait_daemon_jobs(
+                Mock(status=Mock(return_value=stats)), ['0000000000000000', '0000000000000001'], TEST_INFO)
+        self.assertEqual((stderr, retval), ('GID 0000000000000001 is not found', 1))
+
+    def test_unsupported_rate_limits(self):
+        with FakeYDL({'ratelimit_per_host': 1000, 'ratelimit_burst': 1000}) as ydl:
+            warnings = []
+            ydl.report_warning = lambda msg, only_once=False: warnings.append(msg)
+            for fd in (Aria2cFD, CurlFD):
+                downloader = fd(ydl, ydl.params)
+                downloader._call_downloader = lambda *_: 1
+                downloader.report_error = lambda *_: None
+                downloader.real_download('test', TEST_INFO)
+        self.assertEqual(warnings, [
+            'aria2c does not support --limit-rate-burst; ignoring',
+            'curl does not support --limit-rate-per-host and --limit-rate-burst; ignoring'])
+
+
+@unittest.skipUnless(Aria2cFD.available(), 'aria2c not found')
+class TestAria2cDaemon(unittest.TestCase):
+    def test_daemon(self):
+        with MediaServer() as server, tempfile.TemporaryDirectory() as tmpdir, YoutubeDL({
+            'quiet': True,
+            'no_warnings': True,
+            'noprogress': True,
+            'aria2c_daemon': True,
+            'external_downloader': {'default': 'aria2c'},
+            'outtmpl': os.path.join(tmpdir, '%(id)s.%(ext)s'),
+        }) as ydl:
+            def download(url):
+                info = ydl.extract_info(url)
+                with open(info['requested_downloads'][0]['filepath'], 'rb') as f:
+                    return f.read()
+
+            self.assertEqual(download(server.progressive_url(10000)), MediaServer.payload(10000))
+            daemon = ydl._aria2c_daemon
+            self.assertEqual(download(server.hls_url(4, 1000)), MediaServer.payload(1000) * 4)
+            self.assertIs(ydl._aria2c_daemon, daemon)
+
+            # A new daemon is started if it exits
+            daemon._process.kill(timeout=None)
+            self.assertEqual(download(server.progressive_url(20000)), MediaServer.payload(20000))
+            self.assertIsNot(ydl._aria2c_daemon, daemon)
+            daemon = ydl._aria2c_daemon
+        self.assertFalse(daemon.alive)
+
+    def test_rpc_outside_session(self):
+        # The RPC is not sent through the request director of the session, which would replay it
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fixture = os.path.join(tmpdir, 'fixture.json')
+            save_fixture(fixture, [])
+            with YoutubeDL({
+                'quiet': True,
+                'aria2c_daemon': True,
+                'replay_network': fixture,
+                'external_downloader': {'default': 'aria2c'},
+            }) as ydl:
+                daemon = Aria2cFD(ydl, ydl.params)._get_daemon()
+                self.assertIn('version', daemon.call('aria2.getVersion'))
+                self.assertEqual(ydl._request_director.handlers['Replay'].requests, 0)
+
 
 @unittest.skipUnless(FFmpegFD.available(), 'ffmpeg not found')
 class TestFFmpegFD(unittest.TestCase):
@@ -34,6 +34,12 @@ def test_import(self):
     def test_module_exec(self):
         self.run_yt_dlp(exe=(sys.executable, '-m', 'yt_dlp'))
 
+    def test_lazy_imports(self):
+        lazy_modules = ('asyncio', 'sqlite3', 'Cryptodome.Cipher.AES', 'mutagen', 'yt_dlp.networking._requests')
+        stdout, _ = self.run_yt_dlp(exe=(
+            sys.executable, '-c', f'import sys, yt_dlp; print(*(m for m in {lazy_modules!r} if m in sys.modules))'))
+        self.assertFalse(stdout)
+
     def test_cmdline_umlauts(self):
         _, stderr = self.run_yt_dlp(opts=('ä', '--version'))
         self.assertFalse(stderr)
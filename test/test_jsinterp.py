@@ -541,6 +541,28 @@ def test_undefined_varnames(self):
         self._test(jsi, [JS_Undefined, JS_Undefined])
         self.assertEqual(jsi._undefined_varnames, {'b'})
 
+    def test_repeated_calls(self):
+        jsi = JSInterpreter('function f(a){var b = (a - 10) * 2; return [b, "x".length][0] ** 2}')
+        for i in range(20):
+            self._test(jsi, (i - 10) ** 2 * 4, args=(i,))
+
+        jsi = JSInterpreter('function f(a){if(a>0){return [a, 0, 5][f(a - 1) % 3]}; return 1}')
+        for _ in range(2):
+            self.assertEqual([jsi.call_function('f', i) for i in range(5)], [1, 0, 2, 5, 5])
+
+    def test_compiled_statements(self):
+        jsi = JSInterpreter('function f(a){var s = 0, j = 0; for (var i = 0; i < a; i++) { s = (s + i * j++) % 97 }; return s}')
+        self._test(jsi, sum(i * i for i in range(50)) % 97, args=(50,))
+        compiled = len(jsi._compiled_statements)
+        # The runtime values are not compiled into the statements
+        self._test(jsi, sum(i * i for i in range(200)) % 97, args=(200,))
+        self.assertEqual(len(jsi._compiled_statements), compiled)
+
+        jsi = JSInterpreter(jsi.code)
+        jsi._MAX_COMPILED_STATEMENTS = compiled - 1
+        self._test(jsi, sum(i * i for i in range(200)) % 97, args=(200,))
+        self.assertEqual(len(jsi._compiled_statements), compiled - 1)
+
 
 if __name__ == '__main__':
     unittest.main()
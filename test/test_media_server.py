@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import tempfile
+import urllib.request
+
+from test.media_server import MediaServer
+from yt_dlp import YoutubeDL
+
+SEGMENT_SIZE = 10 * 1024 + 5
+
+
+class TestMediaServer(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def download(self, url, **params):
+        with YoutubeDL({
+            'quiet': True,
+            'no_warnings': True,
+            'noprogress': True,
+            # The payloads are not real media files
+            'fixup': 'never',
+            'outtmpl': os.path.join(self.tmpdir.name, '%(id)s.%(ext)s'),
+            'retry_sleep_functions': {'http': lambda n: 0, 'fragment': lambda n: 0},
+            **params,
+        }) as ydl:
+            info = ydl.extract_info(url)
+        with open(info['requested_downloads'][0]['filepath'], 'rb') as f:
+            return info, f.read()
+
+    def test_ranges(self):
+        with MediaServer() as server:
+            request = urllib.request.Request(server.progressive_url(1000), headers={'Range': 'bytes=100-199'})
+            with urllib.request.urlopen(request) as response:
+                self.assertEqual(response.status, 206)
+                self.assertEqual(response.headers['Content-Range'], 'bytes 100-199/1000')
+                self.assertEqual(response.read(), MediaServer.payload(1000)[100:200])
+
+    def test_downloaders(self):
+        with MediaServer() as server:
+            _, data = self.download(server.progressive_url(SEGMENT_SIZE * 4))
+            self.assertEqual(data, MediaServer.payload(SEGMENT_SIZE * 4))
+
+            for encrypted in (False, True):
+                info, data = self.download(server.hls_url(4, SEGMENT_SIZE, encrypted), concurrent_fragment_downloads=2)
+                self.assertEqual(info['protocol'], 'm3u8_native')
+                self.assertEqual(data, MediaServer.payload(SEGMENT_SIZE) * 4)
+
+            info, data = self.download(server.dash_url(4, SEGMENT_SIZE))
+            self.assertEqual(info['protocol'], 'http_dash_segments')
+            self.assertEqual(data, MediaServer.payload(1024) + MediaServer.payload(SEGMENT_SIZE) * 4)
+
+    def test_errors(self):
+        with MediaServer(error_rate=0.3) as server:
+            _, data = self.download(server.hls_url(8, SEGMENT_SIZE), retries=20, fragment_retries=20)
+            self.assertEqual(data, MediaServer.payload(SEGMENT_SIZE) * 8)
+            _, data = self.download(server.progressive_url(SEGMENT_SIZE * 8), retries=20)
+            self.assertEqual(data, MediaServer.payload(SEGMENT_SIZE * 8))
+            self.assertGreater(server.errors, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -53,6 +53,7 @@
     IncompleteRead,
     NoSupportingHandlers,
     ProxyError,
+    RequestCancelled,
     RequestError,
     SSLError,
     TransportError,
@@ -1593,6 +1594,15 @@ def test_send(self):
         director.add_handler(FakeRH(logger=FakeLogger()))
         assert isinstance(director.send(Request('http://')), FakeResponse)
 
+    def test_cancel(self):
+        director = RequestDirector(logger=FakeLogger())
+        director.add_handler(FakeRH(logger=FakeLogger()))
+        response = director.send(Request('http://'))
+        director.cancel()
+        assert response.closed
+        with pytest.raises(RequestCancelled):
+            director.send(Request('http://'))
+
     def test_unsupported_handlers(self):
         class SupportedRH(RequestHandler):
             _SUPPORTED_URL_SCHEMES = ['http']
@@ -1,7 +1,9 @@
+import dataclasses
 import importlib
 import os
 import shutil
 import sys
+import tempfile
 import unittest
 from pathlib import Path
 
@@ -19,10 +21,12 @@
     register_plugin_spec,
 )
 
+from yt_dlp.extractor.common import LazyPluginExtractor
 from yt_dlp.globals import (
     extractors,
     postprocessors,
     plugin_dirs,
+    plugin_index_dir,
     plugin_ies,
     plugin_pps,
     all_plugins_loaded,
@@ -49,6 +53,7 @@ def reset_plugins():
     plugin_ies.value = {}
     plugin_pps.value = {}
     plugin_dirs.value = ['default']
+    plugin_index_dir.value = None
     plugin_specs.value = {}
     all_plugins_loaded.value = False
     # Clearing override plugins is probably difficult
@@ -233,6 +238,59 @@ def test_append_plugin_dirs(self):
         self.assertIn(f'{PACKAGE_NAME}.extractor.package', sys.modules.keys())
         self.assertIn('PackagePluginIE', plugin_ies.value)
 
+    def test_plugin_index(self):
+        spec = dataclasses.replace(EXTRACTOR_PLUGIN_SPEC, lazy_loader=lambda: LazyPluginExtractor)
+        normal_module = f'{PACKAGE_NAME}.extractor.normal'
+        with tempfile.TemporaryDirectory() as tmpdir:
+            plugin_index_dir.value = tmpdir
+            # The index is created when the modules are imported
+            plugins_ie = load_plugins(spec)
+            self.assertIn(normal_module, sys.modules)
+            self.assertIn('NormalPluginIE', plugins_ie)
+            self.assertTrue(os.path.isfile(os.path.join(tmpdir, 'plugins', 'extractor.json')))
+
+            reset_plugins()
+            plugin_index_dir.value = tmpdir
+            plugins_ie = load_plugins(spec)
+            self.assertEqual(list(plugins_ie), ['InAllPluginIE', 'NormalPluginIE'])
+            # Modules with overrides are always imported
+            self.assertIn(f'{PACKAGE_NAME}.extractor.override', sys.modules)
+            self.assertNotIn(normal_module, sys.modules)
+
+            ie = plugins_ie['NormalPluginIE']
+            self.assertTrue(ie.suitable('normalpluginie'))
+            self.assertFalse(ie.suitable('inallpluginie'))
+            self.assertEqual(ie.ie_key(), 'NormalPlugin')
+            self.assertEqual(ie.IE_NAME, 'NormalPlugin')
+            self.assertNotIn(normal_module, sys.modules)
+            # Other attributes and instances come from the plugin
+            self.assertFalse(ie.REPLACED)
+            self.assertIsInstance(ie(), sys.modules[normal_module].NormalPluginIE)
+
+    def test_plugin_index_invalidation(self):
+        spec = dataclasses.replace(EXTRACTOR_PLUGIN_SPEC, lazy_loader=lambda: LazyPluginExtractor)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            plugin_dir = os.path.join(tmpdir, 'plugins')
+            shutil.copytree(TEST_DATA_DIR / 'plugin_packages', plugin_dir)
+            module_path = os.path.join(plugin_dir, 'testpackage', PACKAGE_NAME, 'extractor', 'package.py')
+
+            def load():
+                reset_plugins()
+                plugin_dirs.value = [plugin_dir]
+                plugin_index_dir.value = os.path.join(tmpdir, 'cache')
+                return load_plugins(spec)
+
+            self.assertEqual(load()['PackagePluginIE']._VALID_URL, 'package')
+            self.assertEqual(load()['PackagePluginIE']._VALID_URL, 'package')
+            self.assertNotIn(f'{PACKAGE_NAME}.extractor.package', sys.modules)
+
+            with open(module_path, 'a') as f:
+                f.write('\n    _VALID_URL = "changed"\n')
+            mtime = os.stat(module_path).st_mtime_ns
+            os.utime(module_path, ns=(mtime, mtime + 10**9))
+            self.assertEqual(load()['PackagePluginIE']._VALID_URL, 'changed')
+            self.assertIn(f'{PACKAGE_NAME}.extractor.package', sys.modules)
+
     def test_get_plugin_spec(self):
         register_plugin_spec(EXTRACTOR_PLUGIN_SPEC)
         register_plugin_spec(POSTPROCESSOR_PLUGIN_SPEC)
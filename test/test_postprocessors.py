@@ -8,18 +8,28 @@
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+import json
 import subprocess
+import tempfile
+from unittest.mock import patch
 
 from yt_dlp import YoutubeDL
+from yt_dlp.downloader.ism import box, full_box, u32, write_piff_header
 from yt_dlp.utils import shell_quote
 from yt_dlp.postprocessor import (
     ExecPP,
+    FFmpegFixupM4aPP,
+    FFmpegMergerPP,
+    FFmpegPostProcessor,
+    FFmpegSplitChaptersPP,
     FFmpegThumbnailsConvertorPP,
     MetadataFromFieldPP,
     MetadataParserPP,
     ModifyChaptersPP,
     SponsorBlockPP,
 )
+from yt_dlp.postprocessor import _mp4
+from yt_dlp.postprocessor.ffmpeg import FFmpegPostProcessorError
 
 
 class TestMetadataFromField(unittest.TestCase):
@@ -87,6 +97,207 @@ def test_parse_cmd(self):
         self.assertEqual(pp.parse_cmd('echo %(filepath)q', info), cmd)
 
 
+class TestFFmpegMerger(unittest.TestCase):
+    VIDEO = {'format_id': '1', 'protocol': 'https', 'ext': 'mp4', 'container': 'mp4_dash', 'vcodec': 'avc1', 'acodec': 'none'}
+    AUDIO = {'format_id': '2', 'protocol': 'm3u8_native', 'ext': 'mp4', 'vcodec': 'none', 'acodec': 'mp4a.40.2'}
+
+    def test_merge_opts_without_probe(self):
+        self.assertEqual(FFmpegMergerPP()._merge_opts([self.VIDEO, self.AUDIO], probe=False), [
+            '-c', 'copy', '-map', '0:v:0', '-map', '1:a:0', '-bsf:a:0', 'aac_adtstoasc'])
+
+    @unittest.skipUnless(hasattr(os, 'mkfifo'), 'Named pipes are not supported')
+    def test_can_stream_merge(self):
+        self.assertTrue(FFmpegMergerPP.can_stream_merge([self.VIDEO, self.AUDIO]))
+        self.assertTrue(FFmpegMergerPP.can_stream_merge([{'protocol': 'https', 'ext': 'webm'}]))
+        # Progressive mp4 may have its moov atom at the end
+        self.assertFalse(FFmpegMergerPP.can_stream_merge([self.AUDIO, {'protocol': 'https', 'ext': 'mp4'}]))
+
+
+class TestFFprobeCache(unittest.TestCase):
+    METADATA = {
+        'streams': [{'codec_type': 'video', 'codec_name': 'h264'}, {'codec_type': 'audio', 'codec_name': 'aac'}],
+        'format': {'duration': '12.5'},
+        'chapters': [],
+    }
+
+    def _make_pp(self):
+        pp = FFmpegPostProcessor()
+        pp.basename, pp.probe_basename, pp._version = 'ffmpeg', 'ffprobe', '7.0'
+        pp._paths = {'ffmpeg': 'ffmpeg', 'ffprobe': 'ffprobe'}
+        return pp
+
+    def test_probe_cache(self):
+        pp = self._make_pp()
+        with tempfile.TemporaryDirectory() as tmpdir, patch(
+                'yt_dlp.postprocessor.ffmpeg.Popen.run', return_value=(json.dumps(self.METADATA), '', 0)) as run:
+            path = os.path.join(tmpdir, 'video.mp4')
+            with open(path, 'wb') as f:
+                f.write(b'video')
+            self.assertEqual(pp.get_audio_codec(path), 'aac')
+            self.assertEqual(pp._get_real_video_duration(path), 12.5)
+            self.assertEqual(pp.get_stream_number(path, ('codec_type',), 'audio'), (1, 2))
+            self.assertEqual(run.call_count, 1)
+            # Other instances share the cache
+            self.assertEqual(self._make_pp().get_metadata_object(path), self.METADATA)
+            self.assertEqual(run.call_count, 1)
+
+            with open(path, 'ab') as f:
+                f.write(b' rewritten')
+            pp.get_audio_codec(path)
+            self.assertEqual(run.call_count, 2)
+
+            pp._invalidate_probe_cache(path)
+            pp.get_audio_codec(path)
+            self.assertEqual(run.call_count, 3)
+
+    def test_probe_failure_not_cached(self):
+        pp = self._make_pp()
+        with tempfile.TemporaryDirectory() as tmpdir, patch(
+                'yt_dlp.postprocessor.ffmpeg.Popen.run', return_value=('{}', '', 1)) as run:
+            path = os.path.join(tmpdir, 'broken.mp4')
+            with open(path, 'wb') as f:
+                f.write(b'broken')
+            self.assertIsNone(pp.get_audio_codec(path))
+            self.assertIsNone(pp.get_audio_codec(path))
+            self.assertEqual(run.call_count, 2)
+
+    def test_keyframes(self):
+        pp = self._make_pp()
+        stdout = '4.004000,K__\n0.000000,K__\n0.033367,___\nN/A,K__\n2.002000,K_D\n'
+        with tempfile.TemporaryDirectory() as tmpdir, patch(
+                'yt_dlp.postprocessor.ffmpeg.Popen.run', return_value=(stdout, '', 0)) as run:
+            path = os.path.join(tmpdir, 'video.mp4')
+            with open(path, 'wb') as f:
+                f.write(b'video')
+            self.assertEqual(pp.get_keyframes(path), [0.0, 2.002, 4.004])
+            self.assertEqual(pp.get_keyframes(path), [0.0, 2.002, 4.004])
+            self.assertEqual(run.call_count, 1)
+
+
+class TestNativeMP4Fixups(unittest.TestCase):
+    SAMPLES = [(b'a' * 10, 1024), (b'bb' * 7, 1024), (b'c' * 3, 512), (b'd' * 5, 1024)]
+
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.m4a')
+        with os.fdopen(fd, 'wb') as f:
+            write_piff_header(f, {
+                'track_id': 1, 'fourcc': 'AACL', 'duration': 0, 'timescale': 44100,
+                'stream_type': 'audio', 'sampling_rate': 44100,
+            })
+            for decode_time, samples in ((0, self.SAMPLES[:2]), (2560, self.SAMPLES[2:])):
+                f.write(self._fragment(decode_time, samples))
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    @staticmethod
+    def _fragment(decode_time, samples, track_id=1):
+        def moof(data_offset):
+            trun = full_box(b'trun', 0, 0x301, u32.pack(len(samples)) + u32.pack(data_offset) + b''.join(
+                u32.pack(duration) + u32.pack(len(data)) for data, duration in samples))
+            return box(b'moof', box(b'traf', b''.join((
+                full_box(b'tfhd', 0, 0x20000, u32.pack(track_id)),
+                full_box(b'tfdt', 1, 0, decode_time.to_bytes(8, 'big')),
+                trun))))
+
+        size = len(moof(0))
+        return moof(size + 8) + box(b'mdat', b''.join(data for data, _ in samples))
+
+    def _read(self):
+        with open(self.filename, 'rb') as f:
+            return f.read()
+
+    def _sample_table(self, data, box_type):
+        top_level = {t: (s, e) for t, s, e in _mp4.iter_boxes(data)}
+        start, end = _mp4.find_box(data, *top_level[b'moov'], b'trak', b'mdia', b'minf', b'stbl', box_type)
+        return data[start + 4:end]
+
+    def test_defragment(self):
+        original_size = len(self._read())
+        self.assertTrue(_mp4.defragment(self.filename))
+        data = self._read()
+        self.assertGreater(len(data), original_size)
+        self.assertEqual([t for t, *_ in _mp4.iter_boxes(data)], [b'ftyp', b'free', b'free', b'mdat', b'free', b'mdat', b'moov'])
+
+        # The gap between the fragments is added to the duration of the last sample before it
+        self.assertEqual(self._sample_table(data, b'stts'), u32.pack(4) + b''.join(
+            u32.pack(count) + u32.pack(delta) for count, delta in ((1, 1024), (1, 1536), (1, 512), (1, 1024))))
+        self.assertEqual(self._sample_table(data, b'stsz'), u32.pack(0) + u32.pack(4) + b''.join(
+            u32.pack(len(sample)) for sample, _ in self.SAMPLES))
+        co64 = self._sample_table(data, b'co64')
+        offsets = [int.from_bytes(co64[i:i + 8], 'big') for i in range(4, len(co64), 8)]
+        self.assertEqual([data[offset:offset + 1] for offset in offsets], [b'a', b'c'])
+
+        top_level = {t: (s, e) for t, s, e in _mp4.iter_boxes(data)}
+        mvhd = _mp4.find_box(data, *top_level[b'moov'], b'mvhd')
+        self.assertEqual(int.from_bytes(data[mvhd[0] + 24:mvhd[0] + 32], 'big'), 4096)
+        self.assertIsNone(_mp4.find_box(data, *top_level[b'moov'], b'mvex'))
+
+    def test_defragment_unsupported(self):
+        with open(self.filename, 'ab') as f:
+            f.write(b'\0\0\0\0mdat')
+        data = self._read()
+        self.assertFalse(_mp4.defragment(self.filename))
+        self.assertEqual(self._read(), data)
+
+    def test_defragment_write_error(self):
+        data = self._read()
+        free_box = _mp4._free_box
+
+        def failing_free_box(f, box_info):
+            if box_info[0] == b'moof':
+                raise OSError('No space left on device')
+            free_box(f, box_info)
+
+        with patch.object(_mp4, '_free_box', side_effect=failing_free_box):
+            self.assertRaises(OSError, _mp4.defragment, self.filename)
+        # The file is left as it was, so that ffmpeg can be used instead
+        self.assertEqual(self._read(), data)
+
+    def test_fix_duplicate_moov(self):
+        with open(self.filename, 'rb') as f:
+            header = f.read(_mp4.find_box(self._read(), 0, len(self._read()), b'moov')[1])
+        with open(self.filename, 'ab') as f:
+            f.write(header)
+            f.write(self._fragment(4096, self.SAMPLES[:1]))
+        self.assertTrue(_mp4.fix_duplicate_moov(self.filename))
+        self.assertEqual(
+            [t for t, *_ in _mp4.iter_boxes(self._read())],
+            [b'ftyp', b'moov', b'moof', b'mdat', b'moof', b'mdat', b'free', b'free', b'moof', b'mdat'])
+
+        with open(self.filename, 'ab') as f:
+            f.write(header)
+            f.write(self._fragment(0, self.SAMPLES[:1]))
+        data = self._read()
+        self.assertFalse(_mp4.fix_duplicate_moov(self.filename))
+        self.assertEqual(self._read(), data)
+
+    def test_fix_duration(self):
+        self.assertFalse(_mp4.fix_duration(self.filename))
+        self.assertTrue(_mp4.defragment(self.filename))
+        data = bytearray(self._read())
+        top_level = {t: (s, e) for t, s, e in _mp4.iter_boxes(data)}
+        mdhd = _mp4.find_box(data, *top_level[b'moov'], b'trak', b'mdia', b'mdhd')
+        data[mdhd[0] + 24:mdhd[0] + 32] = (1).to_bytes(8, 'big')
+        with open(self.filename, 'wb') as f:
+            f.write(data)
+        self.assertTrue(_mp4.fix_duration(self.filename))
+        data = self._read()
+        self.assertEqual(int.from_bytes(data[mdhd[0] + 24:mdhd[0] + 32], 'big'), 4096)
+
+    def test_fixup_falls_back_to_ffmpeg(self):
+        pp = FFmpegFixupM4aPP()
+        with patch.object(_mp4, 'defragment', return_value=False), \
+                patch.object(FFmpegFixupM4aPP, 'run_ffmpeg') as run_ffmpeg, \
+                patch('os.replace'):
+            pp.run({'filepath': self.filename, 'container': 'm4a_dash', 'ext': 'm4a', 'vcodec': 'none', 'acodec': 'mp4a.40.2'})
+        run_ffmpeg.assert_called_once()
+
+        with patch.object(FFmpegFixupM4aPP, 'run_ffmpeg') as run_ffmpeg:
+            pp.run({'filepath': self.filename, 'container': 'm4a_dash', 'ext': 'm4a', 'vcodec': 'none', 'acodec': 'mp4a.40.2'})
+        run_ffmpeg.assert_not_called()
+
+
 class TestModifyChaptersPP(unittest.TestCase):
     def setUp(self):
         self._pp = ModifyChaptersPP(YoutubeDL())
@@ -611,6 +822,100 @@ def test_make_concat_opts_NoZeroDurationChunkAtVideoEnd(self):
         opts = self._pp._make_concat_opts(sponsor_chapters, 20)
         self.assertEqual(expected, ''.join(self._pp._concat_spec(['test'] * len(opts), opts)))
 
+    def test_plan_keyframe_cut(self):
+        keyframes = [0.0, 2.0, 4.0, 6.0]
+        self.assertEqual(self._pp._plan_keyframe_cut(keyframes, 2.0, 5.0), [(2.0, 5.0, True)])
+        self.assertEqual(self._pp._plan_keyframe_cut(keyframes, 1.5, 5.0), [(1.5, 2.0, False), (2.0, 5.0, True)])
+        self.assertEqual(self._pp._plan_keyframe_cut(keyframes, 4.5, None), [(4.5, 6.0, False), (6.0, None, True)])
+        self.assertEqual(self._pp._plan_keyframe_cut(keyframes, 4.5, 5.5), [(4.5, 5.5, False)])
+        self.assertEqual(self._pp._plan_keyframe_cut(keyframes, 6.5, None), [(6.5, None, False)])
+        self.assertEqual(self._pp._plan_keyframe_cut(None, 1.5, 5.0), [(1.5, 5.0, True)])
+
+    def test_cut_at_keyframes(self):
+        calls = []
+        with patch.object(self._pp, '_keyframe_encoder_opts', return_value=['-c:v', 'libx264']), \
+                patch.object(self._pp, 'get_keyframes', return_value=[0.0, 2.0, 4.0, 6.0]), \
+                patch.object(self._pp, 'real_run_ffmpeg', side_effect=lambda i, o: calls.append((i, o))), \
+                patch.object(self._pp, 'concat_files') as concat_files:
+            self.assertTrue(self._pp.cut_at_keyframes('in.mp4', 'out.mp4', [(0, 1.5), (3, 5), (6, None)]))
+        self.assertEqual(sorted(calls), [
+            ([('in.mp4', ['-ss', '3.000000', '-t', '1.000000'])],
+             [('out.part0.temp.mp4', ['-c:v', 'libx264', '-avoid_negative_ts', 'make_zero'])]),
+        ])
+        concat_files.assert_called_once_with(
+            ['in.mp4', 'out.part0.temp.mp4', 'in.mp4', 'in.mp4'], 'out.mp4',
+            [{'outpoint': '1.500000'}, {}, {'inpoint': '4.000000', 'outpoint': '5.000000'}, {'inpoint': '6.000000'}])
+
+        with patch.object(self._pp, '_keyframe_encoder_opts', return_value=None):
+            self.assertFalse(self._pp.cut_at_keyframes('in.mp4', 'out.mp4', [(0, 1.5)]))
+
+    def test_keyframe_encoder_opts(self):
+        metadata = {'streams': [{'codec_type': 'video', 'codec_name': 'av1', 'pix_fmt': 'yuv420p'}]}
+        with patch.object(self._pp, 'get_metadata_object', return_value=metadata), \
+                patch.object(type(self._pp), '_encoders', {'libaom-av1'}):
+            self.assertEqual(self._pp._keyframe_encoder_opts('in.mp4')[-4:], ['-c:v:0', 'libaom-av1', '-pix_fmt', 'yuv420p'])
+        # The encoder is missing from this ffmpeg build
+        with patch.object(self._pp, 'get_metadata_object', return_value=metadata), \
+                patch.object(type(self._pp), '_encoders', {'libx264'}):
+            self.assertIsNone(self._pp._keyframe_encoder_opts('in.mp4'))
+
+    def test_remove_chapters_fallback(self):
+        with patch.object(self._pp, 'cut_at_keyframes', side_effect=FFmpegPostProcessorError('Unknown encoder')), \
+                patch.object(self._pp, 'force_keyframes', return_value='in.keyframes.mp4') as force_keyframes, \
+                patch.object(self._pp, 'concat_files') as concat_files, \
+                patch.object(self._pp, '_delete_downloaded_files'), \
+                patch.object(self._pp, 'report_warning'):
+            self._pp.remove_chapters('in.mp4', [{'start_time': 1, 'end_time': 2}], [{'outpoint': '1'}, {'inpoint': '2'}], True)
+        force_keyframes.assert_called_once()
+        concat_files.assert_called_once_with(
+            ['in.keyframes.mp4'] * 2, 'in.temp.mp4', [{'outpoint': '1'}, {'inpoint': '2'}])
+
+    def test_split_chapters_keyframes(self):
+        pp = FFmpegSplitChaptersPP(YoutubeDL(), force_keyframes=True)
+        chapters = [{'start_time': i, 'end_time': i + 1} for i in range(4)]
+        with patch.object(pp, '_keyframe_encoder_opts', return_value=[]), \
+                patch.object(pp, 'get_keyframes') as get_keyframes, \
+                patch.object(pp, '_ffmpeg_args_for_chapter', side_effect=lambda n, *_: (f'{n}.mp4', [])), \
+                patch.object(pp, 'cut_at_keyframes', return_value=False) as cut_at_keyframes, \
+                patch.object(pp, 'force_keyframes', return_value='in.keyframes.mp4') as force_keyframes, \
+                patch.object(pp, 'real_run_ffmpeg') as real_run_ffmpeg, \
+                patch.object(pp, '_delete_downloaded_files'), \
+                patch.object(pp, 'report_warning'), \
+                patch.object(pp, 'to_screen'):
+            pp.run({'filepath': 'in.mp4', 'chapters': chapters, 'vcodec': 'h264'})
+        # The keyframes are probed once for all the workers
+        get_keyframes.assert_called_once_with('in.mp4')
+        self.assertTrue(cut_at_keyframes.called)
+        # and the video is re-encoded if the chapters cannot be cut at the keyframes
+        force_keyframes.assert_called_once()
+        self.assertEqual(real_run_ffmpeg.call_count, 4)
+
+    def test_cut_at_keyframes_concat(self):
+        if not self._pp.available or not self._pp.probe_available or 'libx264' not in self._pp._encoders:
+            self.skipTest('ffmpeg with libx264 not found')
+
+        def frame_hashes(path):
+            stdout = subprocess.check_output([
+                self._pp.executable, '-v', 'error', '-xerror', '-i', path, '-map', '0:v', '-f', 'framemd5', '-'], text=True)
+            return [line.rpartition(',')[2].strip() for line in stdout.splitlines() if not line.startswith('#')]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            video, out_file = os.path.join(tmpdir, 'video.mp4'), os.path.join(tmpdir, 'video.cut.mp4')
+            # Encoded with other settings than the re-encoded parts, so that their SPS/PPS differ
+            subprocess.check_call([
+                self._pp.executable, '-v', 'error', '-f', 'lavfi', '-i', 'testsrc2=size=320x180:rate=30', '-t', '8',
+                '-c:v', 'libx264', '-preset', 'slower', '-profile:v', 'high',
+                '-x264-params', 'keyint=60:min-keyint=60:scenecut=0:bframes=3:ref=4', video])
+            self.assertTrue(self._pp.cut_at_keyframes(video, out_file, [(0, 1.5), (2.5, 4.2), (5.1, None)]))
+
+            source_hashes, hashes = set(frame_hashes(video)), frame_hashes(out_file)
+            self.assertAlmostEqual(len(hashes), (1.5 + 1.7 + 2.9) * 30, delta=6)
+            # Only the parts before the keyframes at 4s and 6s are re-encoded, the copied frames
+            # must decode exactly like the original ones. The stream copied parts end at a packet
+            # in decoding order, so the B-frames around their outpoints may be off by a few frames
+            copied = [h in source_hashes for h in hashes]
+            self.assertAlmostEqual(copied.count(False), (4 - 2.5 + 6 - 5.1) * 30, delta=4)
+
     def test_quote_for_concat_RunsOfQuotes(self):
         self.assertEqual(
             r"'special '\'' '\'\''characters'\'\'\''galore'",
@@ -0,0 +1,133 @@
+import json
+import multiprocessing
+import time
+
+import pytest
+from yt_dlp.extractor.youtube.pot._provider import IEContentProvider, BuiltinIEContentProvider
+from yt_dlp.extractor.youtube.pot.cache import PoTokenCacheProviderError
+from yt_dlp.utils import bug_reports_message
+from yt_dlp.extractor.youtube.pot._builtin.disk_cache import DiskLRUPCP, disklru_preference
+from yt_dlp.extractor.youtube.pot._builtin.memory_cache import memorylru_preference
+from yt_dlp.version import __version__
+from yt_dlp.extractor.youtube.pot._registry import _pot_cache_providers
+
+
+def _store_many(cachedir, worker, count):
+    from yt_dlp import YoutubeDL
+    from test.test_pot.conftest import MockLogger
+
+    ie = YoutubeDL({'cachedir': cachedir}).get_info_extractor('Youtube')
+    pcp = DiskLRUPCP(ie, MockLogger(), {'max_size': ['1000']})
+    for i in range(count):
+        pcp.store(f'{worker}-{i}', 'value', int(time.time()) + 60)
+
+
+class TestDiskLRUPCP:
+
+    def test_base_type(self):
+        assert issubclass(DiskLRUPCP, IEContentProvider)
+        assert issubclass(DiskLRUPCP, BuiltinIEContentProvider)
+
+    @pytest.fixture
+    def cachedir(self, ie, tmp_path):
+        ie._downloader.params['cachedir'] = str(tmp_path)
+        return tmp_path
+
+    @pytest.fixture
+    def pcp(self, ie, logger, cachedir) -> DiskLRUPCP:
+        return DiskLRUPCP(ie, logger, {})
+
+    def _entries(self, cachedir):
+        with open(cachedir / 'youtube-pot' / 'cache.json', encoding='utf-8') as f:
+            return json.load(f)['data']
+
+    def test_is_registered(self):
+        assert _pot_cache_providers.value.get('DiskLRU') == DiskLRUPCP
+
+    def test_initialization(self, pcp):
+        assert pcp.PROVIDER_NAME == 'disk'
+        assert pcp.PROVIDER_VERSION == __version__
+        assert pcp.BUG_REPORT_MESSAGE == bug_reports_message(before='')
+        assert pcp.max_size == 100
+        assert pcp.is_available()
+
+    def test_invalid_max_size(self, ie, logger, cachedir):
+        assert DiskLRUPCP(ie, logger, {'max_size': ['none']}).max_size == 100
+        assert len(logger.messages['warning']) == 1
+        assert not DiskLRUPCP(ie, logger, {'max_size': ['0']}).is_available()
+
+    def test_unavailable_without_cachedir(self, ie, logger):
+        ie._downloader.params['cachedir'] = False
+        assert not DiskLRUPCP(ie, logger, {}).is_available()
+
+    def test_store_and_get(self, pcp, cachedir):
+        pcp.store('key1', 'value1', int(time.time()) + 60)
+        assert pcp.get('key1') == 'value1'
+        assert list(self._entries(cachedir)) == ['key1']
+
+    def test_persists_across_instances(self, ie, logger, pcp):
+        pcp.store('key1', 'value1', int(time.time()) + 60)
+        assert DiskLRUPCP(ie, logger, {}).get('key1') == 'value1'
+
+    def test_store_ignore_expired(self, pcp, cachedir):
+        pcp.store('key1', 'value1', int(time.time()) - 1)
+        assert pcp.get('key1') is None
+        assert not (cachedir / 'youtube-pot' / 'cache.json').exists()
+
+    def test_get_key_expired(self, pcp, cachedir):
+        pcp.store('key1', 'value1', int(time.time()) + 60)
+        pcp.store('key2', 'value2', int(time.time()) + 60)
+        entries = self._entries(cachedir)
+        entries['key1']['expires_at'] = int(time.time()) - 1
+        (cachedir / 'youtube-pot' / 'cache.json').write_text(json.dumps({'data': entries}))
+        assert pcp.get('key1') is None
+        assert pcp.get('key2') == 'value2'
+        pcp.store('key3', 'value3', int(time.time()) + 60)
+        assert list(self._entries(cachedir)) == ['key2', 'key3']
+
+    def test_invalid_cache_file(self, pcp, cachedir, logger):
+        (cachedir / 'youtube-pot').mkdir()
+        (cachedir / 'youtube-pot' / 'cache.json').write_text('{invalid')
+        assert pcp.get('key1') is None
+        assert len(logger.messages['warning']) == 1
+        pcp.store('key1', 'value1', int(time.time()) + 60)
+        assert pcp.get('key1') == 'value1'
+
+    def test_lru_eviction(self, ie, logger, cachedir):
+        provider = DiskLRUPCP(ie, logger, {'max_size': ['2']})
+        provider.store('key1', 'value1', int(time.time()) + 5)
+        provider.store('key2', 'value2', int(time.time()) + 5)
+        assert provider.get('key1') == 'value1'
+
+        # Reading does not write the cache; the order is updated on the next write
+        assert list(self._entries(cachedir)) == ['key1', 'key2']
+
+        provider.store('key3', 'value3', int(time.time()) + 5)
+        assert list(self._entries(cachedir)) == ['key1', 'key3']
+        assert provider.get('key2') is None
+
+    def test_delete(self, pcp, cachedir):
+        pcp.store('key1', 'value1', int(time.time()) + 5)
+        pcp.delete('key1')
+        assert pcp.get('key1') is None
+        assert self._entries(cachedir) == {}
+
+    def test_unwritable_cachedir(self, ie, logger, tmp_path):
+        (tmp_path / 'file').touch()
+        ie._downloader.params['cachedir'] = str(tmp_path / 'file')
+        with pytest.raises(PoTokenCacheProviderError):
+            DiskLRUPCP(ie, logger, {}).store('key1', 'value1', int(time.time()) + 5)
+
+    def test_concurrent_processes(self, pcp, cachedir):
+        ctx = multiprocessing.get_context('spawn')
+        processes = [ctx.Process(target=_store_many, args=(str(cachedir), worker, 10)) for worker in range(3)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            assert process.exitcode == 0
+        assert len(self._entries(cachedir)) == 30
+
+    def test_disk_lru_preference(self, pcp, ie, pot_request):
+        assert disklru_preference(pcp, pot_request) == 5000
+        assert disklru_preference(pcp, pot_request) < memorylru_preference(pcp, pot_request)
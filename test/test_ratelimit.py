@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import tempfile
+import threading
+import time
+
+from test.media_server import MediaServer
+from yt_dlp import YoutubeDL
+from yt_dlp.utils.ratelimit import RateLimiter, TokenBucket
+
+
+class TestRateLimit(unittest.TestCase):
+    def test_token_bucket(self):
+        bucket = TokenBucket(1000, burst=500)
+        self.assertEqual(bucket.reserve(500), 0)
+        # The bucket is in debt, and the next reservations wait for it
+        self.assertAlmostEqual(bucket.reserve(1000), 1, delta=0.05)
+        self.assertAlmostEqual(bucket.reserve(500), 1.5, delta=0.05)
+
+    def test_shared_limiter(self):
+        self.assertIsNone(RateLimiter.get())
+        limiter = RateLimiter.get(100_000, burst=10_000)
+        self.assertIs(RateLimiter.get(100_000, burst=10_000), limiter)
+        self.assertIsNot(RateLimiter.get(100_000), limiter)
+        self.assertEqual(limiter.block_size, 10_000)
+
+        # The threads draw from the same bucket, so their total rate is limited
+        start = time.monotonic()
+        threads = [
+            threading.Thread(target=lambda: [limiter.consume(5_000) for _ in range(4)])
+            for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertGreaterEqual(time.monotonic() - start, 0.65)
+
+    def test_host_limits(self):
+        limiter = RateLimiter(host_rate=1000)
+        self.assertEqual(limiter.reserve(1000, 'http://a.example/1'), 0)
+        self.assertEqual(limiter.reserve(1000, 'http://b.example/1'), 0)
+        self.assertAlmostEqual(limiter.reserve(500, 'http://a.example/2'), 0.5, delta=0.05)
+
+    def test_concurrent_fragments(self):
+        with MediaServer() as server, tempfile.TemporaryDirectory() as tmpdir:
+            with YoutubeDL({
+                'quiet': True,
+                'noprogress': True,
+                'outtmpl': os.path.join(tmpdir, '%(id)s.%(ext)s'),
+                'concurrent_fragment_downloads': 4,
+                'ratelimit': 200_000,
+                'ratelimit_burst': 50_000,
+            }) as ydl:
+                start = time.monotonic()
+                ydl.extract_info(server.hls_url(8, 50_000))
+                # The first 50KB are the burst, and the fragments share the limit of 200KB/s
+                self.assertGreaterEqual(time.monotonic() - start, 1.6)
+
+
+if __name__ == '__main__':
+    unittest.main()
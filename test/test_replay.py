@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import base64
+import collections
+import glob
+import tempfile
+import time
+
+from test.helper import (
+    assertGreaterEqual,
+    assertLessEqual,
+    expect_info_dict,
+    get_params,
+    gettestcases,
+    getwebpagetestcases,
+)
+from test.media_server import MediaServer
+from yt_dlp import YoutubeDL
+from yt_dlp.networking._replay import load_fixture
+from yt_dlp.networking.exceptions import HTTPError, TransportError
+from yt_dlp.utils import join_nonempty
+
+# Network fixtures of extractor test cases, named like the tests of test_download without "test_"
+# They are recorded with devscripts/record_network_fixtures.py
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'testdata', 'network')
+
+
+def get_fixture_test_cases():
+    """@returns {name: test case} of the extractor test cases"""
+    test_cases, counter = {}, collections.defaultdict(collections.Counter)
+    for label, cases in (('', gettestcases()), ('webpage', getwebpagetestcases())):
+        for test_case in cases:
+            name = test_case['name']
+            test_cases[join_nonempty(name, label, counter[name][label], delim='_')] = test_case
+            counter[name][label] += 1
+    return test_cases
+
+
+def extract_test_case(test_case, **params):
+    """Extract the test case without downloading
+    @returns the info dict, and the number of requests, bytes fetched and CPU time of the extraction"""
+    params = get_params({
+        **test_case.get('params', {}),
+        'skip_download': True,
+        'cachedir': False,
+        **params,
+    })
+    if any(k.startswith('playlist') for k in test_case) and 'playlist' not in test_case:
+        params.setdefault('playlistend', max(
+            test_case.get('playlist_mincount', -1),
+            test_case.get('playlist_count', -2) + 1,
+            test_case.get('playlist_maxcount', -2) + 1))
+        if 'playlist_duration_sum' not in test_case:
+            params.setdefault('extract_flat', 'in_playlist')
+
+    with YoutubeDL(params, auto_init=False) as ydl:
+        ydl.add_default_info_extractors()
+        start = time.process_time()
+        info = ydl.extract_info(
+            test_case['url'], download=False, force_generic_extractor=params.get('force_generic_extractor', False))
+        stats = {'cpu': time.process_time() - start}
+        if params.get('replay_network'):
+            handler = ydl._request_director.handlers['Replay']
+            stats.update(requests=handler.requests, bytes=handler.bytes)
+        else:
+            exchanges = ydl._network_recorder.exchanges
+            stats.update(requests=len(exchanges), bytes=sum(
+                len(base64.b64decode(exchange['response']['body'])) for exchange in exchanges if 'response' in exchange))
+    return info, stats
+
+
+class TestReplay(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.fixture = os.path.join(self.tmpdir.name, 'fixture.json.gz')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_record_replay(self):
+        test_case = {'params': {'quiet': True}}
+        errors_fixture = os.path.join(self.tmpdir.name, 'errors.json')
+        with MediaServer() as server:
+            test_case['url'] = server.hls_url(4, 1024)
+            info, stats = extract_test_case(test_case, record_network=self.fixture)
+            with YoutubeDL({'quiet': True, 'record_network': errors_fixture}) as ydl:
+                with self.assertRaises(HTTPError):
+                    ydl.urlopen(f'{server.base_url}/missing')
+        self.assertEqual(stats['requests'], 3)
+        self.assertEqual(len(load_fixture(self.fixture)['exchanges']), stats['requests'])
+
+        # The server is closed, so everything is served from the fixtures
+        replayed_info, replayed_stats = extract_test_case(test_case, replay_network=self.fixture)
+        self.assertEqual(replayed_stats['requests'], stats['requests'])
+        self.assertEqual(replayed_stats['bytes'], stats['bytes'])
+        self.assertEqual(replayed_info['formats'], info['formats'])
+
+        with YoutubeDL({'quiet': True, 'replay_network': errors_fixture}) as ydl:
+            with self.assertRaises(HTTPError) as cm:
+                ydl.urlopen(f'{server.base_url}/missing')
+            self.assertEqual(cm.exception.status, 404)
+            with self.assertRaisesRegex(TransportError, 'No recorded response'):
+                ydl.urlopen(f'{server.base_url}/other')
+
+
+class TestReplayFixtures(unittest.TestCase):
+    """Extract the test cases that have a network fixture offline, within the budgets of the fixture"""
+    maxDiff = None
+
+
+def generator(test_case, fixture_file):
+    def test_template(self):
+        meta = load_fixture(fixture_file)['meta']
+        info, stats = extract_test_case(test_case, replay_network=fixture_file)
+
+        if 'playlist_count' in test_case:
+            self.assertEqual(len(info['entries']), test_case['playlist_count'])
+        if 'playlist_mincount' in test_case:
+            assertGreaterEqual(self, len(info['entries']), test_case['playlist_mincount'])
+        entries = info.get('entries') if 'playlist' in test_case else None
+        for tc, entry in zip(test_case.get('playlist', [test_case]), entries or [info]):
+            expect_info_dict(self, entry, tc.get('info_dict', {}))
+
+        for key, budget in meta.get('budget', {}).items():
+            assertLessEqual(self, stats[key], budget, f'{stats[key]} {key} exceed the budget of {budget}')
+    return test_template
+
+
+def inject_tests():
+    fixture_files = {
+        os.path.basename(path).partition('.')[0]: path
+        for path in glob.glob(os.path.join(FIXTURES_DIR, '*.json*'))}
+    if not fixture_files:
+        return
+    for name, test_case in get_fixture_test_cases().items():
+        if name in fixture_files:
+            test_method = generator(test_case, fixture_files[name])
+            test_method.__name__ = f'test_{name}'
+            setattr(TestReplayFixtures, test_method.__name__, test_method)
+
+
+inject_tests()
+
+
+if __name__ == '__main__':
+    unittest.main()
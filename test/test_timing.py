@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import http.server
+import json
+import pstats
+import tempfile
+import threading
+import time
+
+from test.helper import http_server_port
+from yt_dlp import YoutubeDL
+from yt_dlp.extractor.common import InfoExtractor
+from yt_dlp.utils.timing import NULL_SPAN, PrometheusTimingWriter
+
+TEST_SIZE = 10 * 1024
+
+
+class HTTPTestRequestHandler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', TEST_SIZE)
+        self.end_headers()
+        if self.path == '/slow':
+            self.wfile.flush()
+            time.sleep(0.3)
+        self.wfile.write(b'#' * TEST_SIZE)
+
+
+class TestTiming(unittest.TestCase):
+    def setUp(self):
+        self.httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), HTTPTestRequestHandler)
+        self.httpd.daemon_threads = True
+        self.url = f'http://127.0.0.1:{http_server_port(self.httpd)}/video.mp4'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.tmpdir.cleanup()
+
+    def download(self, **params):
+        with YoutubeDL({
+            'quiet': True,
+            'no_warnings': True,
+            'noprogress': True,
+            'outtmpl': os.path.join(self.tmpdir.name, '%(id)s.%(ext)s'),
+            **params,
+        }) as ydl:
+            ydl.extract_info(self.url)
+
+    def test_disabled(self):
+        with YoutubeDL({'quiet': True}) as ydl:
+            with ydl.timing_span('extract', 'generic') as span:
+                span['video_id'] = 'video'
+            self.assertIs(ydl.timing_span('extract'), NULL_SPAN)
+            self.assertEqual(span, {})
+
+    def test_timing_hooks(self):
+        spans = []
+        self.download(timing_hooks=[spans.append])
+
+        phases = [span['phase'] for span in spans]
+        for phase in ('webpage', 'extract', 'format_selection', 'download'):
+            self.assertIn(phase, phases)
+        self.assertLess(phases.index('webpage'), phases.index('extract'))
+        for span in spans:
+            self.assertEqual(span['status'], 'finished')
+            self.assertGreaterEqual(span['duration'], 0)
+
+        extract = spans[phases.index('extract')]
+        with YoutubeDL() as ydl:
+            # Plugins may override the name of the generic extractor
+            generic_name = ydl.get_info_extractor('Generic').IE_NAME
+        self.assertEqual((extract['name'], extract['video_id']), (generic_name, 'video'))
+        download = spans[phases.index('download')]
+        self.assertEqual(download['name'], 'http')
+        self.assertEqual(download['host'], '127.0.0.1')
+        self.assertEqual(download['bytes'], TEST_SIZE)
+        self.assertEqual(download['retries'], 0)
+
+    def test_webpage_span(self):
+        spans = []
+        with YoutubeDL({'quiet': True, 'timing_hooks': [spans.append]}) as ydl:
+            InfoExtractor(ydl)._download_webpage(self.url.replace('/video.mp4', '/slow'), 'video')
+        # A single span that includes reading the content
+        self.assertEqual([span['phase'] for span in spans], ['webpage'])
+        self.assertEqual(spans[0]['host'], '127.0.0.1')
+        self.assertGreaterEqual(spans[0]['duration'], 0.3)
+
+    def test_timings_file(self):
+        filename = os.path.join(self.tmpdir.name, 'timings.jsonl')
+        self.download(timings_file=filename)
+        with open(filename, encoding='utf-8') as f:
+            spans = list(map(json.loads, f))
+        self.assertIn('download', [span['phase'] for span in spans])
+
+        filename = os.path.join(self.tmpdir.name, 'yt-dlp.prom')
+        self.download(timings_file=filename, timings_format='prometheus', overwrites=True)
+        with open(filename, encoding='utf-8') as f:
+            metrics = f.read().splitlines()
+        self.assertIn('yt_dlp_spans_total{phase="download",name="http",status="finished"} 1', metrics)
+        self.assertIn(f'yt_dlp_downloaded_bytes_total{{host="127.0.0.1"}} {TEST_SIZE}', metrics)
+        self.assertEqual(os.listdir(self.tmpdir.name).count('yt-dlp.prom'), 1)
+
+    def test_profile(self):
+        directory = os.path.join(self.tmpdir.name, 'profile')
+        self.download(profile=directory)
+        files = os.listdir(directory)
+        for phase in ('extract', 'process', 'format_selection', 'download'):
+            self.assertIn(f'video.{phase}.pstats', files)
+        self.assertIn('summary.txt', files)
+        stats = pstats.Stats(os.path.join(directory, 'video.download.pstats'))
+        self.assertTrue(any(func.endswith('real_download') for _, _, func in stats.stats))
+        # The nested phases are excluded from the profile of the enclosing phase
+        stats = pstats.Stats(os.path.join(directory, 'video.process.pstats'))
+        self.assertFalse(any(func.endswith('real_download') for _, _, func in stats.stats))
+
+    def test_prometheus_escape(self):
+        filename = os.path.join(self.tmpdir.name, 'yt-dlp.prom')
+        writer = PrometheusTimingWriter(filename)
+        writer({'phase': 'extract', 'name': 'a"b\\c', 'status': 'error', 'duration': 0.5})
+        writer.close()
+        with open(filename, encoding='utf-8') as f:
+            self.assertIn(r'yt_dlp_span_seconds_total{phase="extract",name="a\"b\\c"} 0.5', f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import io
+
+from yt_dlp import webvtt
+
+SAMPLE = '''﻿WEBVTT
+X-TIMESTAMP-MAP=LOCAL:00:00:00.000,MPEGTS:900000
+Kind: captions
+
+STYLE
+::cue(b) { color: red }
+
+NOTE a comment
+
+1
+00:00:01.000 --> 00:00:02.500 align:start
+<v Speaker>Hello <b>wörld</b> &amp; <c.red>everyone</c>
+
+00:00:02.500 --> 00:00:04.000
+Second line
+<i>continued</i>
+'''
+
+
+def _serialize(blocks):
+    output = io.StringIO()
+    for block in blocks:
+        block.write_into(output)
+    return output.getvalue()
+
+
+class TestWebVTT(unittest.TestCase):
+    def test_stream_parser(self):
+        expected = _serialize(webvtt.parse_fragment(SAMPLE.encode()))
+        self.assertIn('00:00:02.500 --> 00:00:04.000\nSecond line\n<i>continued</i>\n', expected)
+        for newline in ('\n', '\r\n'):
+            data = SAMPLE.replace('\n', newline).encode()
+            for chunk_size in (1, 2, 3, 7, 64):
+                parser = webvtt.StreamParser()
+                blocks = []
+                for i in range(0, len(data), chunk_size):
+                    blocks.extend(parser.feed(data[i:i + chunk_size]))
+                blocks.extend(parser.close())
+                self.assertEqual(
+                    _serialize(blocks).replace('\r\n', '\n'), expected, f'chunk size {chunk_size}')
+
+    def test_stream_parser_yields_complete_blocks(self):
+        parser = webvtt.StreamParser()
+        [magic] = parser.feed('WEBVTT\n\n00:00:01.000 --> 00:00:02.000\nfirst')
+        self.assertIsInstance(magic, webvtt.Magic)
+        [cue] = parser.feed(' cue\n\n00:00:03.000 --> ')
+        self.assertEqual(cue.text, 'first cue\n')
+        # Incomplete cues at the end of the stream are errors, as with parse_fragment
+        self.assertRaises(webvtt.ParseError, list, parser.close())
+
+    def test_cue_window(self):
+        def cue(start, end, text='text\n'):
+            return webvtt.CueBlock(id=None, start=start * 90, end=end * 90, text=text, settings=None)
+
+        state = []
+        window = webvtt.CueWindow(state)
+        self.assertEqual(window.push(cue(0, 1000)), [])
+        self.assertEqual(window.push(cue(0, 1000)), [])  # repeated
+        self.assertEqual(window.push(cue(1000, 2000)), [])  # continued
+        self.assertEqual(state, [cue(0, 2000).as_json])
+
+        # A resumed window continues from the saved state
+        window = webvtt.CueWindow(state)
+        self.assertEqual(window.push(cue(2000, 3000, 'other\n')), [cue(0, 2000)])
+        self.assertEqual(window.flush(), [cue(2000, 3000, 'other\n')])
+        self.assertEqual(state, [])
+
+        window = webvtt.CueWindow(max_size=2)
+        self.assertEqual(window.push(cue(0, 5000, 'a\n')), [])
+        self.assertEqual(window.push(cue(100, 5000, 'b\n')), [])
+        self.assertEqual(window.push(cue(200, 5000, 'c\n')), [cue(0, 5000, 'a\n')])
+        self.assertEqual(len(window.cues), 2)
+
+    def test_convert_to_srt(self):
+        output = io.StringIO()
+        webvtt.convert_to_srt(io.StringIO(SAMPLE), output, chunk_size=5)
+        self.assertEqual(output.getvalue(), (
+            '1\n00:00:01,000 --> 00:00:02,500\nHello <b>wörld</b> & everyone\n\n'
+            '2\n00:00:02,500 --> 00:00:04,000\nSecond line\n<i>continued</i>\n\n'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,7 +8,15 @@
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+import json
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+from test.helper import FakeYDL
 from yt_dlp.extractor import YoutubeIE
+from yt_dlp.extractor.youtube._tab import _prefetch
 
 
 class TestYoutubeMisc(unittest.TestCase):
@@ -21,6 +29,211 @@ def test_youtube_extract(self):
         assertExtractId('http://www.youtube.com/watch?v=BaW_jenozKcsharePLED17F32AD9753930', 'BaW_jenozKc')
         assertExtractId('BaW_jenozKc', 'BaW_jenozKc')
 
+    def test_player_responses_order(self):
+        ie = YoutubeIE(FakeYDL())
+        requested, threads = [], set()
+
+        def extract_player_response(client, video_id, **kwargs):
+            requested.append(client)
+            threads.add(threading.get_ident())
+            # Make the first clients finish last
+            time.sleep({'tv': 0.3, 'android_sdkless': 0.2}.get(client, 0.1))
+            pr = {'videoDetails': {'videoId': video_id}, 'playabilityStatus': {'status': 'OK'}}
+            if client == 'tv':
+                pr['playabilityStatus'] = {'status': 'LOGIN_REQUIRED', 'reason': 'Sign in to confirm your age'}
+            return pr
+
+        with patch.object(ie, '_extract_player_response', side_effect=extract_player_response), \
+                patch.object(ie, '_download_ytcfg', return_value={}), \
+                patch.object(ie, '_download_player_url', return_value=None), \
+                patch.object(ie, 'fetch_po_token', return_value=None):
+            prs, _ = ie._extract_player_responses(
+                ['tv', 'android_sdkless', 'web'], 'BaW_jenozKc', None, 'web', {}, False)
+
+        # The age-gate fallback is only requested after the response of its client is seen
+        self.assertEqual(requested[-1], 'web_embedded')
+        self.assertEqual(set(requested[:3]), {'tv', 'android_sdkless', 'web'})
+        self.assertGreater(len(threads), 1)
+        # but the player responses are in the same order as if the clients were requested one by one
+        self.assertEqual(
+            [pr['streamingData']['__yt_dlp_client'] for pr in prs],
+            ['tv', 'web_embedded', 'android_sdkless', 'web'])
+
+    def test_player_responses_po_token_lock(self):
+        ie = YoutubeIE(FakeYDL())
+        lock = threading.Lock()
+        active, overlapping, requests = 0, [], set()
+
+        def fetch_po_token(**kwargs):
+            nonlocal active
+            with lock:
+                active += 1
+                overlapping.append(active > 1)
+            time.sleep(0.1)
+            with lock:
+                active -= 1
+
+        def extract_player_response(client, video_id, **kwargs):
+            time.sleep(0.05)
+            with lock:
+                requests.add(active)
+            time.sleep(0.15)
+            return {'videoDetails': {'videoId': video_id}, 'playabilityStatus': {'status': 'OK'}}
+
+        with patch.object(ie, '_extract_player_response', side_effect=extract_player_response), \
+                patch.object(ie, '_download_ytcfg', return_value={}), \
+                patch.object(ie, '_download_player_url', return_value=None), \
+                patch.object(ie, 'fetch_po_token', side_effect=fetch_po_token):
+            ie._extract_player_responses(['tv', 'android_sdkless', 'mweb'], 'BaW_jenozKc', None, 'web', {}, False)
+
+        # The PO Tokens are fetched one at a time, while other player responses are requested
+        self.assertEqual(overlapping, [False] * 3)
+        self.assertIn(1, requests)
+
+    def test_ytcfg_cache(self):
+        ytcfg = {
+            'INNERTUBE_CLIENT_VERSION': '2.20250101.00.00',
+            'INNERTUBE_CONTEXT': {'client': {'visitorData': 'VISITOR', 'remoteHost': '192.0.2.1'}},
+            'XSRF_TOKEN': 'secret',
+        }
+        webpage = f'<script>ytcfg.set({json.dumps(ytcfg)});</script>'
+        with tempfile.TemporaryDirectory() as cachedir:
+            ie = YoutubeIE(FakeYDL({'cachedir': cachedir}))
+            with patch.object(YoutubeIE, '_download_webpage_with_retries', return_value=webpage) as download:
+                self.assertEqual(ie._download_ytcfg('mweb', 'BaW_jenozKc'), ytcfg)
+                # A new process starts with an empty in-memory state
+                ie = YoutubeIE(FakeYDL({'cachedir': cachedir}))
+                cached = ie._download_ytcfg('mweb', 'BaW_jenozKc')
+                self.assertEqual(download.call_count, 1)
+                self.assertNotIn('XSRF_TOKEN', cached)
+                self.assertNotIn('remoteHost', cached['INNERTUBE_CONTEXT']['client'])
+                self.assertEqual(ie._extract_visitor_data(cached), 'VISITOR')
+
+                # Embed pages are specific to the video
+                ie._download_ytcfg('web_embedded', 'BaW_jenozKc')
+                ie._download_ytcfg('web_embedded', 'BaW_jenozKc')
+                self.assertEqual(download.call_count, 3)
+
+                with patch('time.time', return_value=time.time() + ie._YTCFG_CACHE_TTL + 1):
+                    ie._download_ytcfg('mweb', 'BaW_jenozKc')
+                self.assertEqual(download.call_count, 4)
+
+                with patch.object(ie, '_extract_client_version', return_value='3.0'):
+                    ie._download_ytcfg('mweb', 'BaW_jenozKc')
+                self.assertEqual(download.call_count, 5)
+                ie._download_ytcfg('mweb', 'BaW_jenozKc')
+                self.assertEqual(download.call_count, 6)
+                ie._download_ytcfg('mweb', 'BaW_jenozKc')
+                self.assertEqual(download.call_count, 6)
+
+            ie = YoutubeIE(FakeYDL({'cachedir': False}))
+            with patch.object(ie, '_download_webpage_with_retries', return_value=webpage) as download:
+                ie._download_ytcfg('mweb', 'BaW_jenozKc')
+                ie._download_ytcfg('mweb', 'BaW_jenozKc')
+                self.assertEqual(download.call_count, 2)
+
+    def test_prefetch(self):
+        requested = []
+        fetched = threading.Condition()
+
+        def pages():
+            for page in range(10):
+                with fetched:
+                    requested.append(page)
+                    fetched.notify_all()
+                yield [page]
+
+        def wait_for(count):
+            with fetched:
+                self.assertTrue(fetched.wait_for(lambda: len(requested) >= count, timeout=5))
+            time.sleep(0.1)
+
+        for depth in (1, 2):
+            requested.clear()
+            prefetched = _prefetch(pages(), depth)
+            self.assertEqual(next(prefetched), [0])
+            # Only `depth` pages are requested ahead of the consumer
+            wait_for(1 + depth)
+            self.assertEqual(requested, list(range(1 + depth)))
+            self.assertEqual(next(prefetched), [1])
+            wait_for(2 + depth)
+            self.assertEqual(requested, list(range(2 + depth)))
+            # Stopping early cancels the remaining requests
+            prefetched.close()
+            time.sleep(0.1)
+            self.assertEqual(requested, list(range(2 + depth)))
+
+        self.assertEqual(list(_prefetch(pages(), 0)), [[i] for i in range(10)])
+        self.assertEqual(list(_prefetch(pages(), 2)), [[i] for i in range(10)])
+
+        def failing_pages():
+            yield [0]
+            raise ValueError('page 1')
+
+        prefetched = _prefetch(failing_pages(), 1)
+        self.assertEqual(next(prefetched), [0])
+        with self.assertRaisesRegex(ValueError, 'page 1'):
+            next(prefetched)
+
+    def test_comment_reply_threads(self):
+        def continuation(token):
+            return {'continuationItemRenderer': {'continuationEndpoint': {'continuationCommand': {'token': token}}}}
+
+        def comment(comment_id, replies=None):
+            renderer = {'commentRenderer': {'commentId': comment_id, 'contentText': {'simpleText': comment_id}}}
+            if replies:
+                return {'commentThreadRenderer': {
+                    'comment': renderer, 'replies': {'commentRepliesRenderer': {'contents': [continuation(replies)]}}}}
+            return {'commentThreadRenderer': {'comment': renderer}}
+
+        def page(*items):
+            return {'onResponseReceivedEndpoints': [{'appendContinuationItemsAction': {'continuationItems': list(items)}}]}
+
+        responses = {
+            None: {'onResponseReceivedEndpoints': [{'reloadContinuationItemsCommand': {'continuationItems': [{
+                'commentsHeaderRenderer': {'sortMenu': {'sortFilterSubMenuRenderer': {'subMenuItems': [
+                    {'title': 'Top', 'serviceEndpoint': {'continuationCommand': {'token': 'top'}}},
+                    {'title': 'Newest', 'serviceEndpoint': {'continuationCommand': {'token': 'new'}}},
+                ]}}},
+            }]}}]},
+            'new': page(comment('a', 'replies-a'), comment('b'), comment('c', 'replies-c'), continuation('page-2')),
+            'page-2': page(comment('d', 'replies-d')),
+            'replies-a': page({'commentRenderer': {'commentId': 'a.1'}}, continuation('replies-a-2')),
+            'replies-a-2': page({'commentRenderer': {'commentId': 'a.2'}}),
+            'replies-c': page({'commentRenderer': {'commentId': 'c.1'}}),
+            'replies-d': page({'commentRenderer': {'commentId': 'd.1'}}),
+        }
+
+        def extract_response(query, **kwargs):
+            token = query['continuation']
+            requested.append(token)
+            # Make the first reply threads finish last
+            time.sleep({'replies-a': 0.2, 'replies-a-2': 0.1}.get(token, 0))
+            return responses.get(token if token in responses else None)
+
+        requested = []
+        expected = [('a', 'root'), ('a.1', 'a'), ('a.2', 'a'), ('b', 'root'), ('c', 'root'), ('c.1', 'c'), ('d', 'root'), ('d.1', 'd')]
+        for workers in ('1', '4'):
+            ie = YoutubeIE(FakeYDL({'extractor_args': {'youtube': {'comment_workers': [workers]}}}))
+            with patch.object(ie, '_extract_response', side_effect=extract_response):
+                comments = list(ie._get_comments({}, 'BaW_jenozKc', [], None))
+            self.assertEqual([(c['id'], c['parent']) for c in comments], expected)
+
+            # Limiting the total number of replies works the same
+            ie = YoutubeIE(FakeYDL({'extractor_args': {'youtube': {
+                'comment_workers': [workers], 'max_comments': ['all', 'all', '2', 'all']}}}))
+            with patch.object(ie, '_extract_response', side_effect=extract_response):
+                comments = list(ie._get_comments({}, 'BaW_jenozKc', [], None))
+            self.assertEqual([c['id'] for c in comments], ['a', 'a.1', 'a.2', 'b', 'c', 'd'])
+
+            # The reply threads are only requested as the comments are consumed
+            requested = []
+            ie = YoutubeIE(FakeYDL({'extractor_args': {'youtube': {'comment_workers': [workers], 'max_comments': ['1']}}}))
+            with patch.object(ie, '_extract_response', side_effect=extract_response):
+                comments = list(ie._get_comments({}, 'BaW_jenozKc', [], None))
+            self.assertEqual([c['id'] for c in comments], ['a'])
+            self.assertNotIn('replies-a', requested)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -6,6 +6,7 @@
 import fileinput
 import functools
 import http.cookiejar
+import inspect
 import io
 import itertools
 import json
@@ -46,7 +47,7 @@
     supported_remote_components,
 )
 from .minicurses import format_text
-from .networking import HEADRequest, Request, RequestDirector
+from .networking import HEADRequest, Request, RequestDirector, _load_request_handlers
 from .networking.common import _REQUEST_HANDLERS, _RH_PREFERENCES
 from .networking.exceptions import (
     HTTPError,
@@ -71,6 +72,7 @@
     MoveFilesAfterDownloadPP,
     get_postprocessor,
 )
+from .postprocessor.common import PostProcessingPool
 from .postprocessor.ffmpeg import resolve_mapping as resolve_recode_mapping
 from .update import (
     REPOSITORY,
@@ -176,6 +178,7 @@
     clean_proxies,
     std_headers,
 )
+from .utils.timing import NULL_SPAN, TIMING_WRITERS, timing_span
 from .version import CHANNEL, ORIGIN, RELEASE_GIT_HEAD, VARIANT, __version__
 
 if os.name == 'nt':
@@ -196,6 +199,134 @@ def wrapper(self, *args, **kwargs):
     return wrapper
 
 
+_OUTTMPL_EXTERNAL_FORMAT_RE = re.compile(STR_FORMAT_RE_TMPL.format('[^)]*', f'[{STR_FORMAT_TYPES}ljhqBUDS]'))
+_OUTTMPL_ESCAPE_RE = re.compile(STR_FORMAT_RE_TMPL.format('', '(?![%(\0])'))
+_OUTTMPL_MATH_FUNCTIONS = {
+    '+': float.__add__,
+    '-': float.__sub__,
+    '*': float.__mul__,
+}
+# Field is of the form key1.key2...
+# where keys (except first) can be string, int, slice or "{field, ...}"
+_OUTTMPL_FIELD_INNER_RE = r'(?:\w+|%(num)s|%(num)s?(?::%(num)s?){1,2})' % {'num': r'(?:-?\d+)'}  # noqa: UP031
+_OUTTMPL_FIELD_RE = r'\w*(?:\.(?:%(inner)s|{%(field)s(?:,%(field)s)*}))*' % {  # noqa: UP031
+    'inner': _OUTTMPL_FIELD_INNER_RE,
+    'field': rf'\w*(?:\.{_OUTTMPL_FIELD_INNER_RE})*',
+}
+_OUTTMPL_MATH_FIELD_RE = re.compile(rf'(?:{_OUTTMPL_FIELD_RE}|-?{NUMBER_RE})')
+_OUTTMPL_MATH_OPERATORS_RE = re.compile(r'(?:{})'.format('|'.join(map(re.escape, _OUTTMPL_MATH_FUNCTIONS.keys()))))
+_OUTTMPL_INTERNAL_FORMAT_RE = re.compile(rf'''(?xs)
+    (?P<negate>-)?
+    (?P<fields>{_OUTTMPL_FIELD_RE})
+    (?P<maths>(?:{_OUTTMPL_MATH_OPERATORS_RE.pattern}{_OUTTMPL_MATH_FIELD_RE.pattern})*)
+    (?:>(?P<strf_format>.+?))?
+    (?P<remaining>
+        (?P<alternate>(?<!\\),[^|&)]+)?
+        (?:&(?P<replacement>.*?))?
+        (?:\|(?P<default>.*?))?
+    )$''')
+
+# A field of a compiled output template. "alternatives" holds the parsed
+# "field1,field2,..." chain; "key" is the key used in the prepared template
+_OuttmplField = collections.namedtuple('_OuttmplField', ('prefix', 'key', 'format', 'flags', 'alternatives'))
+# "name" is set when the path is a single top-level key, which can be looked up directly
+_OuttmplAlternative = collections.namedtuple('_OuttmplAlternative', (
+    'fields', 'path', 'name', 'negate', 'maths', 'strf_format', 'replacement', 'default', 'alternate'))
+
+
+def _outtmpl_path(fields):
+    """Convert the "key1.key2..." syntax of output template fields into a path for traverse_obj"""
+    def from_user_input(field):
+        if field == ':':
+            return ...
+        elif ':' in field:
+            return slice(*map(int_or_none, field.split(':')))
+        elif int_or_none(field) is not None:
+            return int(field)
+        return field
+
+    fields = [f for x in re.split(r'\.({.+?})\.?', fields)
+              for f in ([x] if x.startswith('{') else x.split('.'))]
+    for i in (0, -1):
+        if fields and not fields[i]:
+            fields.pop(i)
+
+    for i, f in enumerate(fields):
+        if not f.startswith('{'):
+            fields[i] = from_user_input(f)
+            continue
+        assert f.endswith('}'), f'No closing brace for {f} in {fields}'
+        fields[i] = {k: list(map(from_user_input, k.split('.'))) for k in f[1:-1].split(',')}
+    return fields
+
+
+def _compile_outtmpl_maths(maths):
+    """Parse the maths of a field into (operator, multiplier, constant offset, offset path) tuples"""
+    operations, operator = [], None
+    while maths:
+        item = (_OUTTMPL_MATH_FIELD_RE if operator else _OUTTMPL_MATH_OPERATORS_RE).match(maths).group(0)
+        maths = maths[len(item):]
+        if operator is None:
+            operator = _OUTTMPL_MATH_FUNCTIONS[item]
+            continue
+        item, multiplier = (item[1:], -1) if item[0] == '-' else (item, 1)
+        offset = float_or_none(item)
+        operations.append((operator, multiplier, offset, None if offset is not None else _outtmpl_path(item)))
+        operator = None
+    return tuple(operations)
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_outtmpl(outtmpl):
+    """Parse an output template once into a tuple of literal strings and _OuttmplField's,
+    so that only the values have to be fetched and formatted when it is evaluated"""
+    parts, last_end = [], 0
+
+    def add_literal(text):
+        if parts and isinstance(parts[-1], str):
+            parts[-1] += text
+        elif text:
+            parts.append(text)
+
+    for outer_mobj in _OUTTMPL_EXTERNAL_FORMAT_RE.finditer(outtmpl):
+        add_literal(outtmpl[last_end:outer_mobj.start()])
+        last_end = outer_mobj.end()
+        if not outer_mobj.group('has_key'):
+            add_literal(outer_mobj.group(0))
+            continue
+
+        key, alternatives = outer_mobj.group('key'), []
+        mobj = _OUTTMPL_INTERNAL_FORMAT_RE.match(key)
+        while mobj:
+            mobj = mobj.groupdict()
+            path = _outtmpl_path(mobj['fields'])
+            alternatives.append(_OuttmplAlternative(
+                mobj['fields'], path, path[0] if len(path) == 1 and isinstance(path[0], str) else None,
+                bool(mobj['negate']),
+                _compile_outtmpl_maths(mobj['maths']),
+                mobj['strf_format'] and mobj['strf_format'].replace('\\,', ','),
+                mobj['replacement'], mobj['default'], bool(mobj['alternate'])))
+            mobj = mobj['alternate'] and _OUTTMPL_INTERNAL_FORMAT_RE.match(mobj['remaining'][1:])
+
+        parts.append(_OuttmplField(
+            outer_mobj.group('prefix'), '{}\0{}'.format(key.replace('%', '%\0'), outer_mobj.group('format')),
+            outer_mobj.group('format'), outer_mobj.group('conversion') or '', tuple(alternatives)))
+    add_literal(outtmpl[last_end:])
+    return tuple(parts)
+
+
+@functools.lru_cache(maxsize=256)
+def _escape_outtmpl(outtmpl):
+    return _OUTTMPL_ESCAPE_RE.sub(lambda mobj: ('' if mobj.group('has_key') else '%') + mobj.group(0), outtmpl)
+
+
+class _ReplacementFormatter(string.Formatter):
+    def get_field(self, field_name, args, kwargs):
+        if field_name.isdigit():
+            return args[0], -1
+        raise ValueError('Unsupported field')
+
+
 class YoutubeDL:
     """YoutubeDL class.
 
@@ -306,6 +437,9 @@ class YoutubeDL:
     clean_infojson:    Remove internal metadata from the infojson
     getcomments:       Extract video comments. This will not be written to disk
                        unless writeinfojson is also given
+    comments_jsonl:    Write the extracted comments to a JSON lines file as they
+                       are extracted instead of adding them to the info_dict.
+                       Needs getcomments. Not done when simulating
     writethumbnail:    Write the thumbnail image to a file
     allow_playlist_files: Whether to write playlists' description, infojson etc
                        also to disk when using the 'write*' options
@@ -351,6 +485,10 @@ class YoutubeDL:
                        name/path from where cookies are loaded, the name of the keyring,
                        and the container name, e.g. ('chrome', ) or
                        ('vivaldi', 'default', 'BASICTEXT') or ('firefox', 'default', None, 'Meta')
+    cookiesfrombrowser_domains: Only load the cookies of these domains (and their
+                       subdomains) from the browser
+    cookiesfrombrowser_cache: Cache the cookies loaded from the browser (encrypted) in the
+                       cachedir until the browser's cookie database changes
     legacyserverconnect: Explicitly allow HTTPS connection to servers that do not
                        support RFC 5746 secure renegotiation
     nocheckcertificate:  Do not verify SSL certificates
@@ -421,9 +559,52 @@ class YoutubeDL:
                        * postprocessor: Name of the postprocessor
                        * info_dict: The extracted info_dict
 
+                       * queue_depth: Number of videos queued or being postprocessed
+                                 in the background (if postprocessor_workers is set)
+
                        Progress hooks are guaranteed to be called at least twice
                        (with status "started" and "finished") if the processing is successful.
+    timing_hooks:      A list of functions that get called with the timing span
+                       of each phase of the processing of a video, with a
+                       dictionary with the entries
+                       * phase: One of "extract", "webpage", "jsc", "pot", "process",
+                                "format_selection", "download" or "postprocess".
+                                Ignore unknown values.
+                       * name: Name of the extractor, downloader or postprocessor
+                       * status: One of "finished" or "error"
+                       * start: Start time as a Unix timestamp
+                       * duration: Duration in seconds
+                       * video_id: ID of the video, if known
+                       * error: Name of the exception, if status is "error"
+                       The phases may also add other entries, e.g.
+                       * url, host: The requested URL and its host ("webpage", "download")
+                       * bytes, fragments, retries: ("download")
+                       Spans of nested phases are emitted before the enclosing span.
+    timings_file:      Name of a file to write the timing spans to
+    timings_format:    Format of timings_file. One of "jsonl" (default) to
+                       append the spans as JSON lines, or "prometheus" to
+                       write aggregated counters as a Prometheus textfile
+    profile:           Directory to write cProfile statistics of each phase
+                       of each video (see timing_hooks) to, along with a
+                       summary of the functions with the most internal time.
+                       The statistics of a phase exclude its nested phases
+    record_network:    Name of a file to record the network requests and their
+                       responses to, as a network fixture (see networking._replay).
+                       The responses are read completely before being used,
+                       so this is meant to be used with skip_download.
+                       Compressed with gzip if the name ends with ".gz"
+    replay_network:    Name of a network fixture to serve the responses of the
+                       requests from, instead of sending them
+    postprocessor_workers: Number of videos to postprocess in the background while
+                       downloading the next ones. The "after_move" postprocessors,
+                       post hooks and download archive are still processed in
+                       download order. Use wait_for_postprocessing() to wait for them;
+                       until then, the info returned by extract_info etc. lacks
+                       "requested_downloads" and the final "filepath"
     merge_output_format: "/" separated list of extensions to use when merging formats.
+    stream_merge:      Download the formats to be merged simultaneously into a single
+                       ffmpeg process instead of merging separate files afterwards.
+                       Falls back to the latter if this is not possible
     final_ext:         Expected final extension; used to detect when the file was
                        already downloaded and converted
     fixup:             Automatically correct known faults of the file.
@@ -481,6 +662,8 @@ class YoutubeDL:
                        external downloader to use for it. The allowed protocols
                        are default|http|ftp|m3u8|dash|rtsp|rtmp|mms.
                        Set the value to 'native' to use the native downloader
+    aria2c_daemon:     Download with a single aria2c process that is kept running
+                       until YoutubeDL is closed, instead of one for each download
     compat_opts:       Compatibility options. See "Differences in default behavior".
                        The following options do not work when used through the API:
                        filename, abort-on-error, multistreams, no-live-chat,
@@ -510,10 +693,10 @@ class YoutubeDL:
 
     The following parameters are not used by YoutubeDL itself, they are used by
     the downloader (see yt_dlp/downloader/common.py):
-    nopart, updatetime, buffersize, ratelimit, throttledratelimit, min_filesize,
-    max_filesize, test, noresizebuffer, retries, file_access_retries, fragment_retries,
-    continuedl, hls_use_mpegts, http_chunk_size, external_downloader_args,
-    concurrent_fragment_downloads, progress_delta.
+    nopart, updatetime, buffersize, ratelimit, ratelimit_per_host, ratelimit_burst,
+    throttledratelimit, min_filesize, max_filesize, test, noresizebuffer, retries,
+    file_access_retries, fragment_retries, continuedl, hls_use_mpegts, http_chunk_size,
+    external_downloader_args, concurrent_fragment_downloads, progress_delta.
 
     The following options are used by the post processors:
     ffmpeg_location:   Location of the ffmpeg binary; either the path
@@ -643,6 +826,11 @@ def __init__(self, params=None, auto_init=True):
         self._close_hooks = []
         self._progress_hooks = []
         self._postprocessor_hooks = []
+        self._timing_hooks = []
+        self._profiler = None
+        self._network_recorder = None
+        self._aria2c_daemon = None
+        self._pp_pool = None
         self._download_retcode = 0
         self._num_downloads = 0
         self._num_videos = 0
@@ -818,11 +1006,28 @@ def check_deprecated(param, option, suggestion):
             'post_hooks': self.add_post_hook,
             'progress_hooks': self.add_progress_hook,
             'postprocessor_hooks': self.add_postprocessor_hook,
+            'timing_hooks': self.add_timing_hook,
         }
         for opt, fn in hooks.items():
             for ph in self.params.get(opt, []):
                 fn(ph)
 
+        if self.params.get('timings_file'):
+            timings_writer = TIMING_WRITERS[self.params.get('timings_format') or 'jsonl'](
+                expand_path(self.params['timings_file']))
+            self.add_timing_hook(timings_writer)
+            self.add_close_hook(timings_writer.close)
+        if self.params.get('profile'):
+            from .utils.profiling import Profiler
+            self._profiler = Profiler(expand_path(self.params['profile']))
+            self.add_close_hook(self._profiler.close)
+        if self.params.get('record_network'):
+            from .networking._replay import NetworkRecorder
+            self._network_recorder = NetworkRecorder()
+            self.add_close_hook(lambda: self._network_recorder.save(expand_path(self.params['record_network'])))
+        if self.params.get('aria2c_daemon'):
+            self.add_close_hook(lambda: self._aria2c_daemon and self._aria2c_daemon.close())
+
         for pp_def_raw in self.params.get('postprocessors', []):
             pp_def = dict(pp_def_raw)
             when = pp_def.pop('when', 'post_process')
@@ -959,6 +1164,16 @@ def add_postprocessor_hook(self, ph):
             for pp in pps:
                 pp.add_progress_hook(ph)
 
+    def add_timing_hook(self, th):
+        """Add the timing hook"""
+        self._timing_hooks.append(th)
+
+    def timing_span(self, phase, name=None, **data):
+        """Context manager timing a phase for the timing hooks and the profiler. See timing_hooks in the docstring"""
+        if not self._timing_hooks and not self._profiler:
+            return NULL_SPAN
+        return timing_span(self._timing_hooks, phase, name, profiler=self._profiler, **data)
+
     def _bidi_workaround(self, message):
         if not hasattr(self, '_output_channel'):
             return message
@@ -1051,6 +1266,9 @@ def __exit__(self, *args):
         self.close()
 
     def close(self):
+        if self._pp_pool:
+            self._pp_pool.close()
+            self._pp_pool = None
         self.save_cookies()
         if '_request_director' in self.__dict__:
             self._request_director.close()
@@ -1229,10 +1447,7 @@ def _outtmpl_expandpath(outtmpl):
     @staticmethod
     def escape_outtmpl(outtmpl):
         """ Escape any remaining strings like %s, %abc% etc. """
-        return re.sub(
-            STR_FORMAT_RE_TMPL.format('', '(?![%(\0])'),
-            lambda mobj: ('' if mobj.group('has_key') else '%') + mobj.group(0),
-            outtmpl)
+        return _escape_outtmpl(outtmpl)
 
     @classmethod
     def validate_outtmpl(cls, outtmpl):
@@ -1279,91 +1494,35 @@ def prepare_outtmpl(self, outtmpl, info_dict, sanitize=False):
             'autonumber': self.params.get('autonumber_size') or 5,
         }
 
-        TMPL_DICT = {}
-        EXTERNAL_FORMAT_RE = re.compile(STR_FORMAT_RE_TMPL.format('[^)]*', f'[{STR_FORMAT_TYPES}ljhqBUDS]'))
-        MATH_FUNCTIONS = {
-            '+': float.__add__,
-            '-': float.__sub__,
-            '*': float.__mul__,
-        }
-        # Field is of the form key1.key2...
-        # where keys (except first) can be string, int, slice or "{field, ...}"
-        FIELD_INNER_RE = r'(?:\w+|%(num)s|%(num)s?(?::%(num)s?){1,2})' % {'num': r'(?:-?\d+)'}  # noqa: UP031
-        FIELD_RE = r'\w*(?:\.(?:%(inner)s|{%(field)s(?:,%(field)s)*}))*' % {  # noqa: UP031
-            'inner': FIELD_INNER_RE,
-            'field': rf'\w*(?:\.{FIELD_INNER_RE})*',
-        }
-        MATH_FIELD_RE = rf'(?:{FIELD_RE}|-?{NUMBER_RE})'
-        MATH_OPERATORS_RE = r'(?:{})'.format('|'.join(map(re.escape, MATH_FUNCTIONS.keys())))
-        INTERNAL_FORMAT_RE = re.compile(rf'''(?xs)
-            (?P<negate>-)?
-            (?P<fields>{FIELD_RE})
-            (?P<maths>(?:{MATH_OPERATORS_RE}{MATH_FIELD_RE})*)
-            (?:>(?P<strf_format>.+?))?
-            (?P<remaining>
-                (?P<alternate>(?<!\\),[^|&)]+)?
-                (?:&(?P<replacement>.*?))?
-                (?:\|(?P<default>.*?))?
-            )$''')
-
-        def _from_user_input(field):
-            if field == ':':
-                return ...
-            elif ':' in field:
-                return slice(*map(int_or_none, field.split(':')))
-            elif int_or_none(field) is not None:
-                return int(field)
-            return field
-
-        def _traverse_infodict(fields):
-            fields = [f for x in re.split(r'\.({.+?})\.?', fields)
-                      for f in ([x] if x.startswith('{') else x.split('.'))]
-            for i in (0, -1):
-                if fields and not fields[i]:
-                    fields.pop(i)
-
-            for i, f in enumerate(fields):
-                if not f.startswith('{'):
-                    fields[i] = _from_user_input(f)
-                    continue
-                assert f.endswith('}'), f'No closing brace for {f} in {fields}'
-                fields[i] = {k: list(map(_from_user_input, k.split('.'))) for k in f[1:-1].split(',')}
-
-            return traverse_obj(info_dict, fields, traverse_string=True)
+        def traverse_infodict(path):
+            return traverse_obj(info_dict, path, traverse_string=True)
 
-        def get_value(mdict):
+        def get_value(alternative):
             # Object traversal
-            value = _traverse_infodict(mdict['fields'])
+            if alternative.name is not None:
+                value = info_dict.get(alternative.name)
+                if value in (None, {}):  # as in traverse_obj
+                    value = None
+            else:
+                value = traverse_infodict(alternative.path)
             # Negative
-            if mdict['negate']:
+            if alternative.negate:
                 value = float_or_none(value)
                 if value is not None:
                     value *= -1
             # Do maths
-            offset_key = mdict['maths']
-            if offset_key:
+            if alternative.maths:
                 value = float_or_none(value)
-                operator = None
-                while offset_key:
-                    item = re.match(
-                        MATH_FIELD_RE if operator else MATH_OPERATORS_RE,
-                        offset_key).group(0)
-                    offset_key = offset_key[len(item):]
-                    if operator is None:
-                        operator = MATH_FUNCTIONS[item]
-                        continue
-                    item, multiplier = (item[1:], -1) if item[0] == '-' else (item, 1)
-                    offset = float_or_none(item)
-                    if offset is None:
-                        offset = float_or_none(_traverse_infodict(item))
+                for operator, multiplier, offset, offset_path in alternative.maths:
+                    if offset_path is not None:
+                        offset = float_or_none(traverse_infodict(offset_path))
                     try:
                         value = operator(value, multiplier * offset)
                     except (TypeError, ZeroDivisionError):
                         return None
-                    operator = None
             # Datetime formatting
-            if mdict['strf_format']:
-                value = strftime_or_none(value, mdict['strf_format'].replace('\\,', ','))
+            if alternative.strf_format:
+                value = strftime_or_none(value, alternative.strf_format)
 
             # XXX: Workaround for https://github.com/yt-dlp/yt-dlp/issues/4485
             if sanitize and value == '':
@@ -1395,28 +1554,16 @@ def _dumpjson_default(obj):
                 return list(obj)
             return repr(obj)
 
-        class _ReplacementFormatter(string.Formatter):
-            def get_field(self, field_name, args, kwargs):
-                if field_name.isdigit():
-                    return args[0], -1
-                raise ValueError('Unsupported field')
-
+        TMPL_DICT = {}
         replacement_formatter = _ReplacementFormatter()
 
-        def create_key(outer_mobj):
-            if not outer_mobj.group('has_key'):
-                return outer_mobj.group(0)
-            key = outer_mobj.group('key')
-            mobj = re.match(INTERNAL_FORMAT_RE, key)
+        def create_key(field):
             value, replacement, default, last_field = None, None, na, ''
-            while mobj:
-                mobj = mobj.groupdict()
-                default = mobj['default'] if mobj['default'] is not None else default
-                value = get_value(mobj)
-                last_field, replacement = mobj['fields'], mobj['replacement']
-                if value is None and mobj['alternate']:
-                    mobj = re.match(INTERNAL_FORMAT_RE, mobj['remaining'][1:])
-                else:
+            for alternative in field.alternatives:
+                default = alternative.default if alternative.default is not None else default
+                value = get_value(alternative)
+                last_field, replacement = alternative.fields, alternative.replacement
+                if value is not None or not alternative.alternate:
                     break
 
             if None not in (value, replacement):
@@ -1425,11 +1572,11 @@ def create_key(outer_mobj):
                 except ValueError:
                     value, default = None, na
 
-            fmt = outer_mobj.group('format')
+            fmt = field.format
             if fmt == 's' and last_field in field_size_compat_map and isinstance(value, int):
                 fmt = f'0{field_size_compat_map[last_field]:d}d'
 
-            flags = outer_mobj.group('conversion') or ''
+            flags = field.flags
             str_fmt = f'{fmt[:-1]}s'
             if value is None:
                 value, fmt = default, 's'
@@ -1479,11 +1626,12 @@ def create_key(outer_mobj):
                 if fmt[-1] in 'csra':
                     value = sanitize(last_field, value)
 
-            key = '{}\0{}'.format(key.replace('%', '%\0'), outer_mobj.group('format'))
-            TMPL_DICT[key] = value
-            return '{prefix}%({key}){fmt}'.format(key=key, fmt=fmt, prefix=outer_mobj.group('prefix'))
+            TMPL_DICT[field.key] = value
+            return f'{field.prefix}%({field.key}){fmt}'
 
-        return EXTERNAL_FORMAT_RE.sub(create_key, outtmpl), TMPL_DICT
+        return ''.join(
+            part if isinstance(part, str) else create_key(part)
+            for part in _compile_outtmpl(outtmpl)), TMPL_DICT
 
     def evaluate_outtmpl(self, outtmpl, info_dict, *args, **kwargs):
         outtmpl, info_dict = self.prepare_outtmpl(outtmpl, info_dict, *args, **kwargs)
@@ -1828,7 +1976,9 @@ def __extract_info(self, url, ie, download, extra_info, process):
         self._apply_header_cookies(url)
 
         try:
-            ie_result = ie.extract(url)
+            with self.timing_span('extract', ie.IE_NAME, url=url) as span:
+                ie_result = ie.extract(url)
+                span['video_id'] = traverse_obj(ie_result, ('id', {str}))
         except UserNotLive as e:
             if process:
                 if self.params.get('wait_for_video'):
@@ -1908,7 +2058,8 @@ def process_ie_result(self, ie_result, download=True, extra_info=None):
 
         if result_type == 'video':
             self.add_extra_info(ie_result, extra_info)
-            ie_result = self.process_video_result(ie_result, download=download)
+            with self.timing_span('process', ie_result.get('extractor'), video_id=ie_result.get('id')):
+                ie_result = self.process_video_result(ie_result, download=download)
             self._raise_pending_errors(ie_result)
             additional_urls = (ie_result or {}).get('additional_urls')
             if additional_urls:
@@ -2146,6 +2297,9 @@ def __process_playlist(self, ie_result, download):
             # Do not set for full playlist
             ie_result.pop('requested_entries')
 
+        # The entries are only complete once their postprocessing has finished
+        self.wait_for_postprocessing()
+
         # Write the updated info to json
         if _infojson_written is True and self._write_info_json(
                 'updated playlist', ie_result,
@@ -3001,7 +3155,8 @@ def is_wellformed(f):
         if self._match_entry(info_dict, incomplete=self._format_fields) is not None:
             return info_dict
 
-        self.post_extract(info_dict)
+        if not (download and self._comments_written_as_jsonl(info_dict)):
+            self.post_extract(info_dict)
         info_dict, _ = self.pre_process(info_dict, 'after_filter')
 
         # The pre-processors may have modified the formats
@@ -3044,7 +3199,10 @@ def is_wellformed(f):
                 self.write_debug(f'Default format spec: {req_format}')
                 format_selector = self.build_format_selector(req_format)
 
-            formats_to_download = self._select_formats(formats, format_selector)
+            with self.timing_span('format_selection', info_dict.get('extractor'), video_id=info_dict.get('id')) as span:
+                formats_to_download = self._select_formats(formats, format_selector)
+                span['formats'] = len(formats)
+                span['selected'] = len(formats_to_download)
             if interactive_format_selection and not formats_to_download:
                 self.report_error('Requested format is not available', tb=False, is_error=False)
                 continue
@@ -3072,6 +3230,14 @@ def to_screen(*msg):
                     to_screen(f'Downloading {len(requested_ranges)} time ranges:',
                               (f'{c["start_time"]:.1f}-{c["end_time"]:.1f}' for c in requested_ranges))
             max_downloads_reached = False
+            postprocess_in_background = bool(self.params.get('postprocessor_workers'))
+
+            def finish_format(new_info):
+                self._raise_pending_errors(new_info)
+                # Remove copied info
+                for key, val in tuple(new_info.items()):
+                    if info_dict.get(key) == val:
+                        new_info.pop(key)
 
             for fmt, chapter in itertools.product(formats_to_download, requested_ranges):
                 new_info = self._copy_infodict(info_dict)
@@ -3093,23 +3259,40 @@ def to_screen(*msg):
                     self.process_info(new_info)
                 except MaxDownloadsReached:
                     max_downloads_reached = True
-                self._raise_pending_errors(new_info)
-                # Remove copied info
-                for key, val in tuple(new_info.items()):
-                    if info_dict.get(key) == val:
-                        new_info.pop(key)
+                if '__post_extractor' in info_dict and '__post_extractor' not in new_info:
+                    # The comments have been written by process_info; do not extract them again for the next formats
+                    info_dict.pop('__post_extractor')
+                    info_dict.update(filter_dict(new_info, lambda k, _: k in ('comments', 'comment_count')))
+                # The info is still being postprocessed in the background
+                if not postprocess_in_background:
+                    finish_format(new_info)
                 if max_downloads_reached:
                     break
 
-            write_archive = {f.get('__write_download_archive', False) for f in downloaded_formats}
-            assert write_archive.issubset({True, False, 'ignore'})
-            if True in write_archive and False not in write_archive:
-                self.record_download_archive(info_dict)
-
-            info_dict['requested_downloads'] = downloaded_formats
-            info_dict = self.run_all_pps('after_video', info_dict)
+            def finish_video():
+                nonlocal info_dict
+                if postprocess_in_background:
+                    for new_info in downloaded_formats:
+                        finish_format(new_info)
+
+                write_archive = {f.get('__write_download_archive', False) for f in downloaded_formats}
+                assert write_archive.issubset({True, False, 'ignore'})
+                if True in write_archive and False not in write_archive:
+                    self.record_download_archive(info_dict)
+
+                info_dict['requested_downloads'] = downloaded_formats
+                info_dict = self.run_all_pps('after_video', info_dict)
+                if postprocess_in_background:
+                    result.update(info_dict, **best_format)
+
+            # Do not modify the info that is used by the background jobs.
+            # The returned info is completed once they have finished
+            result = {**info_dict, **best_format}
+            self._schedule_postprocessing(info_dict, ordered=finish_video)
             if max_downloads_reached:
                 raise MaxDownloadsReached
+            if postprocess_in_background:
+                return result
 
         # We update the info dict with the selected best quality format (backwards compatibility)
         info_dict.update(best_format)
@@ -3244,7 +3427,7 @@ def print_field(field, actual_field=None, optional=False):
         if self.params.get('forcejson'):
             self.to_stdout(json.dumps(self.sanitize_info(info_dict)))
 
-    def dl(self, name, info, subtitle=False, test=False):
+    def dl(self, name, info, subtitle=False, test=False, params=None):
         if not info.get('url'):
             self.raise_no_formats(info, True)
 
@@ -3263,7 +3446,7 @@ def dl(self, name, info, subtitle=False, test=False):
                 '_no_ytdl_file': True,
             }
         else:
-            params = self.params
+            params = params or self.params
 
         fd = get_suitable_downloader(info, params, to_stdout=(name == '-'))(self, params)
         if not test:
@@ -3279,7 +3462,55 @@ def dl(self, name, info, subtitle=False, test=False):
         new_info = self._copy_infodict(info)
         if new_info.get('http_headers') is None:
             new_info['http_headers'] = self._calc_headers(new_info)
-        return fd.download(name, new_info, subtitle)
+        if not self._timing_hooks and not self._profiler:
+            return fd.download(name, new_info, subtitle)
+
+        last_status = {}
+        fd.add_progress_hook(last_status.update)
+        with self.timing_span('download', fd.FD_NAME, video_id=info.get('id'), url=info['url']) as span:
+            ret = fd.download(name, new_info, subtitle)
+            span.update({
+                'bytes': last_status.get('downloaded_bytes') or last_status.get('total_bytes'),
+                'fragments': last_status.get('fragment_count'),
+                'retries': fd._reported_retries,
+            })
+        return ret
+
+    def _stream_merge_formats(self, filename, info_dict, merger):
+        """
+        Download the requested formats directly into the merger's ffmpeg process
+        @returns    True if the merged file was written; False if the formats must be downloaded separately
+        """
+        formats = info_dict['requested_formats']
+        if (not self.params.get('stream_merge') or filename == '-' or not merger.available
+                or self.params.get('allow_unplayable_formats')):
+            return False
+        elif not merger.can_stream_merge(formats) or any(
+                get_suitable_downloader(f, self.params).FD_NAME not in ('http', 'hlsnative', 'dashsegments')
+                for f in formats):
+            self.write_debug('The requested formats cannot be merged while downloading')
+            return False
+        elif not self._ensure_dir_exists(filename):
+            return False
+
+        # The pipes are not regular files and can neither be resumed nor skipped as "already downloaded"
+        params = {**self.params, 'overwrites': True, 'continuedl': False, '_no_ytdl_file': True}
+
+        def download(path, fmt):
+            new_info = {**info_dict, **fmt}
+            del new_info['requested_formats']
+            return self.dl(path, new_info, params=params)[0]
+
+        retcode = self._download_retcode
+        try:
+            if merger.stream_merge(info_dict, filename, download):
+                return True
+        except (OSError, PostProcessingError) as err:
+            self.write_debug(f'Merging while downloading failed: {err}')
+        # Errors of the failed attempt should not affect the exit code if the fallback succeeds
+        self._download_retcode = retcode
+        self.report_warning('Unable to merge the formats while downloading. Downloading them separately instead')
+        return False
 
     def existing_file(self, filepaths, *, default_overwrite=True):
         existing_files = list(filter(os.path.exists, orderedSet(filepaths)))
@@ -3297,6 +3528,9 @@ def process_info(self, info_dict):
 
         assert info_dict.get('_type', 'video') == 'video'
         original_infodict = info_dict
+        # Stop before downloading the next video if the postprocessing of a previous one failed
+        if self._pp_pool:
+            self._pp_pool.raise_error()
 
         if 'format' not in info_dict and 'ext' in info_dict:
             info_dict['format'] = info_dict['ext']
@@ -3306,7 +3540,8 @@ def process_info(self, info_dict):
             return
 
         # Does nothing under normal operation - for backward compatibility of process_info
-        self.post_extract(info_dict)
+        if not self._comments_written_as_jsonl(info_dict):
+            self.post_extract(info_dict)
 
         def replace_info_dict(new_info):
             nonlocal info_dict
@@ -3343,6 +3578,10 @@ def check_max_downloads():
         if not self._ensure_dir_exists(temp_filename):
             return
 
+        if self._write_comments_jsonl(info_dict, self.prepare_filename(info_dict, 'comments')) is None:
+            return
+        self.post_extract(info_dict)
+
         if self._write_description('video', info_dict,
                                    self.prepare_filename(info_dict, 'description')) is None:
             return
@@ -3507,21 +3746,24 @@ def correct_ext(filename, ext=new_ext):
                                 f'You have requested downloading multiple formats to stdout {reason}. '
                                 'The formats will be streamed one after the other')
                             fname = temp_filename
-                        for f in info_dict['requested_formats']:
-                            new_info = dict(info_dict)
-                            del new_info['requested_formats']
-                            new_info.update(f)
-                            if temp_filename != '-':
-                                fname = prepend_extension(
-                                    correct_ext(temp_filename, new_info['ext']),
-                                    'f{}'.format(f['format_id']), new_info['ext'])
-                                if not self._ensure_dir_exists(fname):
-                                    return
-                                f['filepath'] = fname
-                                downloaded.append(fname)
-                            partial_success, real_download = self.dl(fname, new_info)
-                            info_dict['__real_download'] = info_dict['__real_download'] or real_download
-                            success = success and partial_success
+                        if self._stream_merge_formats(temp_filename, info_dict, merger):
+                            info_dict['__real_download'] = True
+                        else:
+                            for f in info_dict['requested_formats']:
+                                new_info = dict(info_dict)
+                                del new_info['requested_formats']
+                                new_info.update(f)
+                                if temp_filename != '-':
+                                    fname = prepend_extension(
+                                        correct_ext(temp_filename, new_info['ext']),
+                                        'f{}'.format(f['format_id']), new_info['ext'])
+                                    if not self._ensure_dir_exists(fname):
+                                        return
+                                    f['filepath'] = fname
+                                    downloaded.append(fname)
+                                partial_success, real_download = self.dl(fname, new_info)
+                                info_dict['__real_download'] = info_dict['__real_download'] or real_download
+                                success = success and partial_success
 
                     if downloaded and merger.available and not self.params.get('allow_unplayable_formats'):
                         info_dict['__postprocessors'].append(merger)
@@ -3614,18 +3856,42 @@ def ffmpeg_fixup(cndn, msg, cls):
                     ffmpeg_fixup(downloader == 'web_socket_fragment', 'Malformed duration detected', FFmpegFixupDurationPP)
 
                 fixup()
-                try:
-                    replace_info_dict(self.post_process(dl_filename, info_dict, files_to_move))
-                except PostProcessingError as err:
-                    self.report_error(f'Postprocessing: {err}')
-                    return
-                try:
-                    for ph in self._post_hooks:
-                        ph(info_dict['filepath'])
-                except Exception as err:
-                    self.report_error(f'post hooks: {err}')
-                    return
-                info_dict['__write_download_archive'] = True
+                postprocessed = False
+
+                def postprocess():
+                    nonlocal postprocessed
+                    try:
+                        replace_info_dict(self._post_process_file(dl_filename, info_dict, files_to_move))
+                    except PostProcessingError as err:
+                        self._report_postprocessing_error(info_dict, f'Postprocessing: {err}')
+                        return
+                    postprocessed = True
+
+                def after_move():
+                    if not postprocessed:
+                        return
+                    try:
+                        replace_info_dict(self.run_all_pps('after_move', info_dict))
+                    except PostProcessingError as err:
+                        self._report_postprocessing_error(info_dict, f'Postprocessing: {err}')
+                        return
+                    try:
+                        for ph in self._post_hooks:
+                            ph(info_dict['filepath'])
+                    except Exception as err:
+                        self.report_error(f'post hooks: {err}')
+                        return
+                    info_dict['__write_download_archive'] = True
+
+                def finish():
+                    try:
+                        after_move()
+                    finally:
+                        # replace_info_dict may run after this is set below when postprocessing in the background
+                        if self.params.get('force_write_download_archive'):
+                            info_dict['__write_download_archive'] = True
+
+                self._schedule_postprocessing(info_dict, postprocess, finish)
 
         assert info_dict is original_infodict  # Make sure the info_dict was modified in-place
         if self.params.get('force_write_download_archive'):
@@ -3648,6 +3914,8 @@ def wrapper(*args, **kwargs):
                 self._num_downloads = 0
             else:
                 if self.params.get('dump_single_json', False):
+                    # The info is completed by the postprocessing running in the background
+                    self.wait_for_postprocessing()
                     self.post_extract(res)
                     self.to_stdout(json.dumps(self.sanitize_info(res)))
         return wrapper
@@ -3666,6 +3934,7 @@ def download(self, url_list):
             self.__download_wrapper(self.extract_info)(
                 url, force_generic_extractor=self.params.get('force_generic_extractor', False))
 
+        self.wait_for_postprocessing()
         return self._download_retcode
 
     def download_with_info_file(self, info_filename):
@@ -3688,6 +3957,7 @@ def download_with_info_file(self, info_filename):
                 self.download([webpage_url])
             except ExtractorError as e:
                 self.report_error(e)
+        self.wait_for_postprocessing()
         return self._download_retcode
 
     @staticmethod
@@ -3761,11 +4031,12 @@ def run_pp(self, pp, infodict):
         if '__files_to_move' not in infodict:
             infodict['__files_to_move'] = {}
         try:
-            files_to_delete, infodict = pp.run(infodict)
+            with self.timing_span('postprocess', pp.PP_NAME, video_id=infodict.get('id')):
+                files_to_delete, infodict = pp.run(infodict)
         except PostProcessingError as e:
             # Must be True and not 'only_download'
             if self.params.get('ignoreerrors') is True:
-                self.report_error(e)
+                self._report_postprocessing_error(infodict, e)
                 return infodict
             raise
 
@@ -3799,12 +4070,56 @@ def pre_process(self, ie_info, key='pre_process', files_to_move=None):
 
     def post_process(self, filename, info, files_to_move=None):
         """Run all the postprocessors on the given file."""
+        info = self._post_process_file(filename, info, files_to_move)
+        return self.run_all_pps('after_move', info)
+
+    def _post_process_file(self, filename, info, files_to_move=None):
         info['filepath'] = filename
         info['__files_to_move'] = files_to_move or {}
         info = self.run_all_pps('post_process', info, additional_pps=info.get('__postprocessors'))
         info = self.run_pp(MoveFilesAfterDownloadPP(self), info)
         del info['__files_to_move']
-        return self.run_all_pps('after_move', info)
+        return info
+
+    def _schedule_postprocessing(self, info_dict, func=None, ordered=None):
+        """
+        Run func and then ordered, either immediately or in the background
+
+        When postprocessing in the background, func may run concurrently with
+        other jobs, but ordered is run in the order in which it was scheduled.
+        Their errors are reported for info_dict when they happen, and unless
+        ignoreerrors is set, re-raised before the next video is processed
+        """
+        workers = self.params.get('postprocessor_workers')
+        if not workers:
+            for stage in (func, ordered):
+                if stage:
+                    stage()
+            return
+
+        def report_errors(stage):
+            try:
+                stage()
+            except DownloadError:  # Already reported
+                raise
+            except Exception as e:
+                self._report_postprocessing_error(
+                    info_dict, f'Postprocessing: {e}', tb=encode_compat_str(traceback.format_exc()))
+
+        if self._pp_pool is None:
+            self._pp_pool = PostProcessingPool(workers)
+        self._pp_pool.submit(*(stage and functools.partial(report_errors, stage) for stage in (func, ordered)))
+
+    def _report_postprocessing_error(self, info_dict, message, **kwargs):
+        # The errors of background postprocessing are not reported right after the download of the video
+        if self.params.get('postprocessor_workers'):
+            message = f'{info_dict.get("id")}: {message}'
+        self.report_error(message, **kwargs)
+
+    def wait_for_postprocessing(self):
+        """Wait until all the postprocessing running in the background has finished"""
+        if self._pp_pool:
+            self._pp_pool.join()
 
     def _make_archive_id(self, info_dict):
         video_id = info_dict.get('id')
@@ -4333,7 +4648,14 @@ def build_request_director(self, handlers, preferences=None):
 
     @functools.cached_property
     def _request_director(self):
-        return self.build_request_director(_REQUEST_HANDLERS.values(), _RH_PREFERENCES)
+        if self.params.get('replay_network'):
+            from .networking._replay import ReplayRH
+            return self.build_request_director([
+                functools.partial(ReplayRH, fixture=expand_path(self.params['replay_network']))])
+        _load_request_handlers()
+        director = self.build_request_director(_REQUEST_HANDLERS.values(), _RH_PREFERENCES)
+        director.recorder = self._network_recorder
+        return director
 
     def encode(self, s):
         if isinstance(s, bytes):
@@ -4374,6 +4696,43 @@ def _write_info_json(self, label, ie_result, infofn, overwrite=None):
             self.report_error(f'Cannot write {label} metadata to JSON file {infofn}')
             return None
 
+    def _comments_written_as_jsonl(self, info_dict):
+        """ Whether the comments are to be written by process_info instead of being extracted beforehand """
+        post_extractor = info_dict.get('__post_extractor')
+        if not self.params.get('comments_jsonl') or self.params.get('simulate') or not post_extractor:
+            return False
+        elif 'on_comment' not in inspect.signature(post_extractor).parameters:
+            self.write_debug('The extractor does not support writing comments while extracting them', only_once=True)
+            return False
+        return True
+
+    def _write_comments_jsonl(self, info_dict, commentsfn):
+        """ Write the comments to a JSON lines file while they are being extracted
+        and returns True = written, 'exists' = Already exists, False = skip, None = error """
+        if not self._comments_written_as_jsonl(info_dict):
+            return False
+        post_extractor = info_dict['__post_extractor']
+        if not commentsfn:
+            self.write_debug('Skipping writing video comments')
+            return False
+        elif not self._ensure_dir_exists(commentsfn):
+            return None
+        elif not self.params.get('overwrites', True) and os.path.exists(commentsfn):
+            self.to_screen('[info] Video comments are already present')
+            info_dict.pop('__post_extractor')
+            return 'exists'
+
+        self.to_screen(f'[info] Writing video comments as JSON lines to: {commentsfn}')
+        info_dict.pop('__post_extractor')
+        try:
+            with open(commentsfn, 'w', encoding='utf-8') as f:
+                info_dict.update(post_extractor(on_comment=lambda comment: f.write(
+                    json.dumps(filter_dict(comment), ensure_ascii=False) + '\n')))
+            return True
+        except OSError:
+            self.report_error(f'Cannot write video comments to {commentsfn}')
+            return None
+
     def _write_description(self, label, ie_result, descfn):
         """ Write description and returns True = written, False = skip, None = error """
         if not self.params.get('writedescription'):
@@ -14,12 +14,13 @@
 import re
 import traceback
 
+from .cache import Cache
 from .cookies import SUPPORTED_BROWSERS, SUPPORTED_KEYRINGS, CookieLoadError
 from .downloader.external import get_external_downloader
 from .extractor import list_extractor_classes
 from .extractor.adobepass import MSO_INFO
 from .networking.impersonate import ImpersonateTarget
-from .globals import IN_CLI, plugin_dirs
+from .globals import IN_CLI, plugin_dirs, plugin_index_dir
 from .options import parseOpts
 from .plugins import load_all_plugins as _load_all_plugins
 from .postprocessor import (
@@ -217,6 +218,11 @@ def validate_minmax(min_val, max_val, min_name, max_name=None):
     validate_positive('autonumber start', opts.autonumber_start)
     validate_positive('autonumber size', opts.autonumber_size, True)
     validate_positive('concurrent fragments', opts.concurrent_fragment_downloads, True)
+    validate_positive('postprocessor workers', opts.postprocessor_workers)
+    validate_positive('daemon jobs', opts.daemon_jobs, True)
+    validate_regex('daemon address', opts.daemon, r'unix:.|(?:[^:]*:|\[[\da-fA-F:]+\]:)?\d+$')
+    validate(not opts.daemon or opts.daemon.startswith('unix:') or opts.daemon_secret_file,
+             'daemon secret file', msg='{name} is required to accept jobs on a TCP port')
     validate_positive('playlist start', opts.playliststart, True)
     if opts.playlistend != -1:
         validate_minmax(opts.playliststart, opts.playlistend, 'playlist start', 'playlist end')
@@ -315,6 +321,8 @@ def validate_bytes(name, value, strict_positive=False):
         return numeric_limit
 
     opts.ratelimit = validate_bytes('rate limit', opts.ratelimit, True)
+    opts.ratelimit_per_host = validate_bytes('rate limit per host', opts.ratelimit_per_host, True)
+    opts.ratelimit_burst = validate_bytes('rate limit burst', opts.ratelimit_burst, True)
     opts.throttledratelimit = validate_bytes('throttled rate limit', opts.throttledratelimit)
     opts.min_filesize = validate_bytes('min filesize', opts.min_filesize)
     opts.max_filesize = validate_bytes('max filesize', opts.max_filesize)
@@ -594,7 +602,9 @@ def report_conflict(arg1, opt1, arg2='--allow-unplayable-formats', opt2='allow_u
         # Do not unnecessarily download audio
         opts.format = 'bestaudio/best'
 
-    if opts.getcomments and opts.writeinfojson is None and not opts.embed_infojson:
+    if opts.comments_jsonl:
+        opts.getcomments = True
+    elif opts.getcomments and opts.writeinfojson is None and not opts.embed_infojson:
         # If JSON is not printed anywhere, but comments are requested, save it to file
         if not opts.dumpjson or opts.print_json or opts.dump_single_json:
             opts.writeinfojson = True
@@ -738,9 +748,9 @@ def get_postprocessors(opts):
 ParsedOptions = collections.namedtuple('ParsedOptions', ('parser', 'options', 'urls', 'ydl_opts'))
 
 
-def parse_options(argv=None):
+def parse_options(argv=None, ignore_config_files='if_override'):
     """@returns ParsedOptions(parser, opts, urls, ydl_opts)"""
-    parser, opts, urls = parseOpts(argv)
+    parser, opts, urls = parseOpts(argv, ignore_config_files)
     urls = get_urls(urls, opts.batchfile, -1 if opts.quiet and not opts.verbose else opts.verbose)
 
     set_compat_opts(opts)
@@ -836,6 +846,8 @@ def parse_options(argv=None):
         'force_generic_extractor': opts.force_generic_extractor,
         'allowed_extractors': opts.allowed_extractors or ['default'],
         'ratelimit': opts.ratelimit,
+        'ratelimit_per_host': opts.ratelimit_per_host,
+        'ratelimit_burst': opts.ratelimit_burst,
         'throttledratelimit': opts.throttledratelimit,
         'overwrites': opts.overwrites,
         'retries': opts.retries,
@@ -854,6 +866,9 @@ def parse_options(argv=None):
         'progress_with_newline': opts.progress_with_newline,
         'progress_template': opts.progress_template,
         'progress_delta': opts.progress_delta,
+        'timings_file': opts.timings_file,
+        'timings_format': opts.timings_format,
+        'profile': opts.profile,
         'playliststart': opts.playliststart,
         'playlistend': opts.playlistend,
         'playlistreverse': opts.playlist_reverse,
@@ -869,6 +884,7 @@ def parse_options(argv=None):
         'allow_playlist_files': opts.allow_playlist_files,
         'clean_infojson': opts.clean_infojson,
         'getcomments': opts.getcomments,
+        'comments_jsonl': opts.comments_jsonl,
         'writethumbnail': opts.writethumbnail is True,
         'write_all_thumbnails': opts.writethumbnail == 'all',
         'writelink': opts.writelink,
@@ -906,6 +922,8 @@ def parse_options(argv=None):
         'skip_playlist_after_errors': opts.skip_playlist_after_errors,
         'cookiefile': opts.cookiefile,
         'cookiesfrombrowser': opts.cookiesfrombrowser,
+        'cookiesfrombrowser_domains': opts.cookiesfrombrowser_domains,
+        'cookiesfrombrowser_cache': opts.cookiesfrombrowser_cache,
         'legacyserverconnect': opts.legacy_server_connect,
         'nocheckcertificate': opts.no_check_certificate,
         'prefer_insecure': opts.prefer_insecure,
@@ -924,9 +942,11 @@ def parse_options(argv=None):
         'wait_for_video': opts.wait_for_video,
         'mark_watched': opts.mark_watched,
         'merge_output_format': opts.merge_output_format,
+        'stream_merge': opts.stream_merge,
         'final_ext': final_ext,
         'postprocessors': postprocessors,
         'fixup': opts.fixup,
+        'postprocessor_workers': opts.postprocessor_workers,
         'source_address': opts.source_address,
         'impersonate': opts.impersonate,
         'sleep_interval_requests': opts.sleep_interval_requests,
@@ -945,6 +965,7 @@ def parse_options(argv=None):
         'hls_use_mpegts': opts.hls_use_mpegts,
         'hls_split_discontinuity': opts.hls_split_discontinuity,
         'external_downloader_args': opts.external_downloader_args,
+        'aria2c_daemon': opts.aria2c_daemon,
         'postprocessor_args': opts.postprocessor_args,
         'geo_verification_proxy': opts.geo_verification_proxy,
         'geo_bypass': opts.geo_bypass,
@@ -976,6 +997,9 @@ def _real_main(argv=None):
     # load all plugins into the global lookup
     plugin_dirs.value = opts.plugin_dirs
     if plugin_dirs.value:
+        # The plugin discovery index is cached so that plugin extractors are only imported when needed
+        if opts.cachedir is not False:
+            plugin_index_dir.value = Cache.get_root_dir(opts.cachedir)
         _load_all_plugins()
 
     with YoutubeDL(ydl_opts) as ydl:
@@ -993,6 +1017,22 @@ def _real_main(argv=None):
             traceback.print_exc()
             ydl._download_retcode = 100
 
+        if opts.daemon:
+            from .daemon import JobServer, read_secret_file
+
+            if actual_use:
+                ydl.report_warning('URLs are ignored due to --daemon')
+            parser.destroy()
+            secret = None
+            if opts.daemon_secret_file:
+                try:
+                    secret = read_secret_file(expand_path(opts.daemon_secret_file), create=True)
+                except (OSError, ValueError) as e:
+                    ydl.report_error(f'Unable to read the daemon secret: {e}')
+                    return 1
+            return JobServer(
+                ydl, opts.daemon, argv, max_jobs=opts.daemon_jobs, secret=secret).serve_forever()
+
         if opts.list_impersonate_targets:
 
             known_targets = [
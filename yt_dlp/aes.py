@@ -4,23 +4,18 @@
 from .compat import compat_ord
 from .dependencies import Cryptodome
 
-if Cryptodome.AES:
-    def aes_cbc_decrypt_bytes(data, key, iv):
-        """ Decrypt bytes with AES-CBC using pycryptodome """
+def aes_cbc_decrypt_bytes(data, key, iv):
+    """ Decrypt bytes with AES-CBC using pycryptodome, or the native implementation if it is unavailable """
+    if Cryptodome.AES:
         return Cryptodome.AES.new(key, Cryptodome.AES.MODE_CBC, iv).decrypt(data)
+    return bytes(aes_cbc_decrypt(*map(list, (data, key, iv))))
 
-    def aes_gcm_decrypt_and_verify_bytes(data, key, tag, nonce):
-        """ Decrypt bytes with AES-GCM using pycryptodome """
-        return Cryptodome.AES.new(key, Cryptodome.AES.MODE_GCM, nonce).decrypt_and_verify(data, tag)
-
-else:
-    def aes_cbc_decrypt_bytes(data, key, iv):
-        """ Decrypt bytes with AES-CBC using native implementation since pycryptodome is unavailable """
-        return bytes(aes_cbc_decrypt(*map(list, (data, key, iv))))
 
-    def aes_gcm_decrypt_and_verify_bytes(data, key, tag, nonce):
-        """ Decrypt bytes with AES-GCM using native implementation since pycryptodome is unavailable """
-        return bytes(aes_gcm_decrypt_and_verify(*map(list, (data, key, tag, nonce))))
+def aes_gcm_decrypt_and_verify_bytes(data, key, tag, nonce):
+    """ Decrypt bytes with AES-GCM using pycryptodome, or the native implementation if it is unavailable """
+    if Cryptodome.AES:
+        return Cryptodome.AES.new(key, Cryptodome.AES.MODE_GCM, nonce).decrypt_and_verify(data, tag)
+    return bytes(aes_gcm_decrypt_and_verify(*map(list, (data, key, tag, nonce))))
 
 
 def aes_cbc_encrypt_bytes(data, key, iv, **kwargs):
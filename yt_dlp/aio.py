@@ -0,0 +1,230 @@
+"""
+asyncio interface to YoutubeDL
+
+    async with AsyncYoutubeDL({'format': 'best'}) as ydl:
+        progress = ydl.progress_stream()
+        task = asyncio.create_task(ydl.extract_info(url, progress=progress))
+        async for status in progress:
+            print(status['status'], status.get('downloaded_bytes'))
+        info = await task
+
+        async for index, entry in ydl.entries(playlist_url):
+            print(index, entry['url'])
+"""
+
+import asyncio
+import concurrent.futures
+import contextlib
+import threading
+
+from .YoutubeDL import YoutubeDL
+from .utils import DownloadCancelled, PlaylistEntries
+
+_END = object()
+
+
+class ProgressStream:
+    """
+    Asynchronous iterator over the statuses passed to the progress hooks of a call
+
+    The call waits while maxsize statuses are not read yet, so the stream must be
+    consumed until it ends, which is when the call returns. Create it from a coroutine
+    """
+
+    def __init__(self, maxsize=100):
+        self._queue = asyncio.Queue(maxsize)
+        self._loop = asyncio.get_running_loop()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        status = await self._queue.get()
+        if status is _END:
+            self._queue.put_nowait(_END)  # in case it is iterated again
+            raise StopAsyncIteration
+        return status
+
+    def _put(self, status, cancelled):
+        future = asyncio.run_coroutine_threadsafe(self._queue.put(status), self._loop)
+        while True:
+            try:
+                return future.result(0.1)
+            except concurrent.futures.TimeoutError:
+                if cancelled.is_set():
+                    future.cancel()
+                    raise DownloadCancelled from None
+
+    def _end(self):
+        with contextlib.suppress(RuntimeError):  # The event loop is closed
+            asyncio.run_coroutine_threadsafe(self._queue.put(_END), self._loop)
+
+
+class _Worker:
+    """A YoutubeDL instance that reports to the call it is running"""
+
+    def __init__(self, params):
+        self.call = None
+        self.ydl = YoutubeDL(params)
+        self.ydl.add_progress_hook(self._progress_hook)
+        # Create the director now so that it can be cancelled from another thread
+        self.ydl._request_director  # noqa: B018
+
+    def _progress_hook(self, status):
+        call = self.call
+        if call is None:
+            return
+        if call.cancelled.is_set():
+            raise DownloadCancelled
+        if call.progress:
+            call.progress._put(status, call.cancelled)
+
+
+class _Call:
+    def __init__(self, progress=None):
+        self.progress = progress
+        self.worker = None
+        self.cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self, worker):
+        with self._lock:
+            self.worker, worker.call = worker, self
+            if self.cancelled.is_set():
+                raise DownloadCancelled
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled.set()
+            if self.worker:
+                self.worker.ydl._request_director.cancel()
+
+    def finish(self):
+        if self.worker:
+            self.worker.call = None
+        if self.progress:
+            self.progress._end()
+
+
+class AsyncYoutubeDL:
+    """
+    asyncio interface to YoutubeDL
+
+    Each call runs on a YoutubeDL instance of its own, created with params,
+    in a thread pool of max_workers threads; so calls can run concurrently
+    without blocking the event loop. The instances are reused by later calls.
+
+    Cancelling a call fails its further and in-flight requests and stops its
+    downloads. The YoutubeDL instance of a cancelled call is discarded.
+    """
+
+    def __init__(self, params=None, max_workers=4):
+        self.params = params or {}
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers, thread_name_prefix='yt-dlp-async')
+        self._max_idle = max_workers
+        self._idle = []
+        self._lock = threading.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.ydl.close()
+
+    def progress_stream(self, maxsize=100):
+        """Create a ProgressStream to pass as progress to a call"""
+        return ProgressStream(maxsize)
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return _Worker(self.params)
+
+    def _release(self, worker, discard=False):
+        if not discard:
+            with self._lock:
+                if len(self._idle) < self._max_idle:
+                    self._idle.append(worker)
+                    return
+        worker.ydl.close()
+
+    def _call(self, call, func, args, kwargs):
+        try:
+            call.start(self._acquire())
+            return func(call.worker.ydl, *args, **kwargs)
+        finally:
+            self._finish(call)
+
+    async def _run(self, func, *args, progress=None, **kwargs):
+        call = _Call(progress)
+        future = self._executor.submit(self._call, call, func, args, kwargs)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            call.cancel()
+            if future.cancelled() and progress:  # The call never started
+                progress._end()
+            raise
+
+    async def extract_info(self, url, download=True, *args, progress=None, **kwargs):
+        """Same as YoutubeDL.extract_info; statuses of the downloads are sent to progress"""
+        return await self._run(YoutubeDL.extract_info, url, download, *args, progress=progress, **kwargs)
+
+    async def process_ie_result(self, ie_result, download=True, *args, progress=None, **kwargs):
+        """Same as YoutubeDL.process_ie_result; statuses of the downloads are sent to progress"""
+        return await self._run(YoutubeDL.process_ie_result, ie_result, download, *args, progress=progress, **kwargs)
+
+    async def download(self, url_list, *, progress=None):
+        """Same as YoutubeDL.download; statuses of the downloads are sent to progress"""
+        def download(ydl, url_list):
+            ydl._download_retcode = 0
+            return ydl.download(url_list)
+
+        return await self._run(download, url_list, progress=progress)
+
+    async def entries(self, url, **kwargs):
+        """
+        Yield (index, entry) for the requested items of a playlist without processing the entries.
+        The pages of the playlist are only extracted as the iteration proceeds.
+        Use contextlib.aclosing to release the YoutubeDL instance when stopping early
+        """
+        call = _Call()
+
+        def get_entries():
+            worker = self._acquire()
+            call.start(worker)
+            ie_result = worker.ydl.extract_info(url, download=False, process=False, **kwargs)
+            while ie_result.get('_type', 'video') in ('url', 'url_transparent'):
+                ie_result = worker.ydl.extract_info(
+                    ie_result['url'], download=False, ie_key=ie_result.get('ie_key'), process=False)
+            return iter(PlaylistEntries(worker.ydl, ie_result).get_requested_items())
+
+        future = self._executor.submit(get_entries)
+        try:
+            items = await asyncio.wrap_future(future)
+            while True:
+                future = self._executor.submit(next, items, _END)
+                item = await asyncio.wrap_future(future)
+                if item is _END:
+                    break
+                if item[1] is not PlaylistEntries.MissingEntry:
+                    yield item
+        except asyncio.CancelledError:
+            call.cancel()
+            raise
+        finally:
+            # The instance is released once its thread is done
+            future.add_done_callback(lambda _: self._finish(call))
+
+    def _finish(self, call):
+        call.finish()
+        if call.worker:
+            self._release(call.worker, discard=call.cancelled.is_set())
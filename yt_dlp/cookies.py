@@ -9,8 +9,10 @@
 import http.cookies
 import io
 import json
+import math
 import os
 import re
+import secrets
 import shutil
 import struct
 import subprocess
@@ -25,11 +27,7 @@
     aes_gcm_decrypt_and_verify_bytes,
     unpad_pkcs7,
 )
-from .dependencies import (
-    _SECRETSTORAGE_UNAVAILABLE_REASON,
-    secretstorage,
-    sqlite3,
-)
+from .dependencies import Cryptodome
 from .minicurses import MultilinePrinter, QuietMultilinePrinter
 from .utils import (
     DownloadError,
@@ -95,8 +93,16 @@ def load_cookies(cookie_file, browser_specification, ydl):
         cookie_jars = []
         if browser_specification is not None:
             browser_name, profile, keyring, container = _parse_browser_specification(*browser_specification)
-            cookie_jars.append(
-                extract_cookies_from_browser(browser_name, profile, YDLLogger(ydl), keyring=keyring, container=container))
+            logger = YDLLogger(ydl)
+            cache = None
+            if ydl.params.get('cookiesfrombrowser_cache') and ydl.cache.enabled:
+                if not Cryptodome.AES:
+                    logger.warning('Cannot cache cookies from browser without pycryptodomex')
+                else:
+                    cache = _BrowserCookieCache(os.path.join(ydl.cache._get_root_dir(), 'browser-cookies'))
+            cookie_jars.append(extract_cookies_from_browser(
+                browser_name, profile, logger, keyring=keyring, container=container,
+                domains=ydl.params.get('cookiesfrombrowser_domains'), cache=cache))
 
         if cookie_file is not None:
             is_filename = is_path_like(cookie_file)
@@ -113,21 +119,31 @@ def load_cookies(cookie_file, browser_specification, ydl):
         raise CookieLoadError('failed to load cookies')
 
 
-def extract_cookies_from_browser(browser_name, profile=None, logger=YDLLogger(), *, keyring=None, container=None):
+def extract_cookies_from_browser(
+        browser_name, profile=None, logger=YDLLogger(), *, keyring=None, container=None, domains=None, cache=None):
+    """
+    @param domains  Only extract the cookies of these domains and their subdomains
+    @param cache    A _BrowserCookieCache to reuse the cookies from while the browser's database is unchanged
+    """
+    if domains:
+        domains = sorted({domain.lower().lstrip('.') for domain in domains})
+    if cache:
+        cache = functools.partial(cache.entry, browser_name, profile, keyring, container, domains)
     if browser_name == 'firefox':
-        return _extract_firefox_cookies(profile, container, logger)
+        return _extract_firefox_cookies(profile, container, logger, domains=domains, cache=cache)
     elif browser_name == 'safari':
-        return _extract_safari_cookies(profile, logger)
+        return _extract_safari_cookies(profile, logger, domains=domains, cache=cache)
     elif browser_name in CHROMIUM_BASED_BROWSERS:
-        return _extract_chrome_cookies(browser_name, profile, keyring, logger)
+        return _extract_chrome_cookies(browser_name, profile, keyring, logger, domains=domains, cache=cache)
     else:
         raise ValueError(f'unknown browser: {browser_name}')
 
 
-def _extract_firefox_cookies(profile, container, logger):
+def _extract_firefox_cookies(profile, container, logger, *, domains=None, cache=None):
     MAX_SUPPORTED_DB_SCHEMA_VERSION = 17
 
     logger.info('Extracting cookies from firefox')
+    from .dependencies import sqlite3
     if not sqlite3:
         logger.warning('Cannot extract cookies from firefox without sqlite3 support. '
                        'Please use a Python interpreter compiled with sqlite3 support')
@@ -160,6 +176,12 @@ def _extract_firefox_cookies(profile, container, logger):
         if not isinstance(container_id, int):
             raise ValueError(f'could not find firefox container "{container}" in containers.json')
 
+    cache_entry = cache and cache(cookie_database_path, logger)
+    jar = cache_entry and cache_entry.load()
+    if jar is not None:
+        logger.info(f'Loaded {len(jar)} cookies from cache')
+        return jar
+
     with tempfile.TemporaryDirectory(prefix='yt_dlp') as tmpdir:
         cursor = _open_database_copy(cookie_database_path, tmpdir)
         with contextlib.closing(cursor.connection):
@@ -168,18 +190,18 @@ def _extract_firefox_cookies(profile, container, logger):
                 logger.warning(f'Possibly unsupported firefox cookies database version: {db_schema_version}')
             else:
                 logger.debug(f'Firefox cookies database version: {db_schema_version}')
+            where, params = _host_filter('host', domains, logger)
             if isinstance(container_id, int):
                 logger.debug(
                     f'Only loading cookies from firefox container "{container}", ID {container_id}')
-                cursor.execute(
-                    'SELECT host, name, value, path, expiry, isSecure FROM moz_cookies WHERE originAttributes LIKE ? OR originAttributes LIKE ?',
-                    (f'%userContextId={container_id}', f'%userContextId={container_id}&%'))
+                where.append('(originAttributes LIKE ? OR originAttributes LIKE ?)')
+                params.extend((f'%userContextId={container_id}', f'%userContextId={container_id}&%'))
             elif container == 'none':
                 logger.debug('Only loading cookies not belonging to any container')
-                cursor.execute(
-                    'SELECT host, name, value, path, expiry, isSecure FROM moz_cookies WHERE NOT INSTR(originAttributes,"userContextId=")')
-            else:
-                cursor.execute('SELECT host, name, value, path, expiry, isSecure FROM moz_cookies')
+                where.append('NOT INSTR(originAttributes,"userContextId=")')
+            cursor.execute(
+                'SELECT host, name, value, path, expiry, isSecure FROM moz_cookies'
+                + (f' WHERE {" AND ".join(where)}' if where else ''), params)
             jar = YoutubeDLCookieJar()
             with _create_progress_bar(logger) as progress_bar:
                 table = cursor.fetchall()
@@ -197,6 +219,8 @@ def _extract_firefox_cookies(profile, container, logger):
                         comment=None, comment_url=None, rest={})
                     jar.set_cookie(cookie)
             logger.info(f'Extracted {len(jar)} cookies from firefox')
+            if cache_entry:
+                cache_entry.store(jar)
             return jar
 
 
@@ -291,9 +315,10 @@ def _get_chromium_based_browser_settings(browser_name):
     }
 
 
-def _extract_chrome_cookies(browser_name, profile, keyring, logger):
+def _extract_chrome_cookies(browser_name, profile, keyring, logger, *, domains=None, cache=None):
     logger.info(f'Extracting cookies from {browser_name}')
 
+    from .dependencies import sqlite3
     if not sqlite3:
         logger.warning(f'Cannot extract cookies from {browser_name} without sqlite3 support. '
                        'Please use a Python interpreter compiled with sqlite3 support')
@@ -318,6 +343,12 @@ def _extract_chrome_cookies(browser_name, profile, keyring, logger):
         raise FileNotFoundError(f'could not find {browser_name} cookies database in "{search_root}"')
     logger.debug(f'Extracting cookies from: "{cookie_database_path}"')
 
+    cache_entry = cache and cache(cookie_database_path, logger)
+    jar = cache_entry and cache_entry.load()
+    if jar is not None:
+        logger.info(f'Loaded {len(jar)} cookies from cache')
+        return jar
+
     with tempfile.TemporaryDirectory(prefix='yt_dlp') as tmpdir:
         cursor = None
         try:
@@ -333,7 +364,10 @@ def _extract_chrome_cookies(browser_name, profile, keyring, logger):
             cursor.connection.text_factory = bytes
             column_names = _get_column_names(cursor, 'cookies')
             secure_column = 'is_secure' if 'is_secure' in column_names else 'secure'
-            cursor.execute(f'SELECT host_key, name, value, encrypted_value, path, expires_utc, {secure_column} FROM cookies')
+            where, params = _host_filter('host_key', domains, logger)
+            cursor.execute(
+                f'SELECT host_key, name, value, encrypted_value, path, expires_utc, {secure_column} FROM cookies'
+                + (f' WHERE {" AND ".join(where)}' if where else ''), params)
             jar = YoutubeDLCookieJar()
             failed_cookies = 0
             unencrypted_cookies = 0
@@ -357,6 +391,8 @@ def _extract_chrome_cookies(browser_name, profile, keyring, logger):
             counts = decryptor._cookie_counts.copy()
             counts['unencrypted'] = unencrypted_cookies
             logger.debug(f'cookie version breakdown: {counts}')
+            if cache_entry:
+                cache_entry.store(jar)
             return jar
         except PermissionError as error:
             if os.name == 'nt' and error.errno == 13:
@@ -565,7 +601,7 @@ def decrypt(self, encrypted_value):
             return _decrypt_windows_dpapi(encrypted_value, self._logger).decode()
 
 
-def _extract_safari_cookies(profile, logger):
+def _extract_safari_cookies(profile, logger, *, domains=None, cache=None):
     if sys.platform not in ('darwin', 'ios'):
         raise ValueError(f'unsupported platform: {sys.platform}')
 
@@ -583,11 +619,26 @@ def _extract_safari_cookies(profile, logger):
             if not os.path.isfile(cookies_path):
                 raise FileNotFoundError('could not find safari cookies database')
 
+    cache_entry = cache and cache(cookies_path, logger)
+    jar = cache_entry and cache_entry.load()
+    if jar is not None:
+        logger.info(f'Loaded {len(jar)} cookies from cache')
+        return jar
+
     with open(cookies_path, 'rb') as f:
         cookies_data = f.read()
 
     jar = parse_safari_cookies(cookies_data, logger=logger)
+    if domains:
+        logger.debug(f'Only loading cookies of {", ".join(domains)}')
+        filtered_jar = YoutubeDLCookieJar()
+        for cookie in jar:
+            if _domain_matches(cookie.domain, domains):
+                filtered_jar.set_cookie(cookie)
+        jar = filtered_jar
     logger.info(f'Extracted {len(jar)} cookies from safari')
+    if cache_entry:
+        cache_entry.store(jar)
     return jar
 
 
@@ -956,6 +1007,7 @@ def _get_kwallet_password(browser_keyring_name, keyring, logger):
 
 
 def _get_gnome_keyring_password(browser_keyring_name, logger):
+    from .dependencies import _SECRETSTORAGE_UNAVAILABLE_REASON, secretstorage
     if not secretstorage:
         logger.error(f'secretstorage not available {_SECRETSTORAGE_UNAVAILABLE_REASON}')
         return b''
@@ -1113,6 +1165,7 @@ def _open_database_copy(database_path, tmpdir):
     # cannot open sqlite databases if they are already in use (e.g. by the browser)
     database_copy_path = os.path.join(tmpdir, 'temporary.sqlite')
     shutil.copy(database_path, database_copy_path)
+    from .dependencies import sqlite3
     conn = sqlite3.connect(database_copy_path)
     return conn.cursor()
 
@@ -1148,6 +1201,116 @@ def _merge_cookie_jars(jars):
     return output_jar
 
 
+def _domain_matches(host, domains):
+    host = host.lower().lstrip('.')
+    return any(host == domain or host.endswith(f'.{domain}') for domain in domains)
+
+
+def _host_filter(column, domains, logger):
+    """SQL conditions to only select the cookies of the given domains and their subdomains"""
+    if not domains:
+        return [], []
+    logger.debug(f'Only loading cookies of {", ".join(domains)}')
+    conditions, params = [], []
+    for domain in domains:
+        escaped = domain.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        conditions.append(f"{column} IN (?, ?) OR {column} LIKE ? ESCAPE '\\'")
+        params.extend((domain, f'.{domain}', f'%.{escaped}'))
+    return [f'({" OR ".join(conditions)})'], params
+
+
+class _BrowserCookieCache:
+    """
+    Encrypted cache of the cookies extracted from browsers
+
+    The cookies are encrypted with AES-GCM using a random key, which is kept in a separate file
+    of the cache directory. An entry is only valid as long as the browser's cookie database
+    has the same path, modification time and size as when the entry was created.
+    """
+    _VERSION = 1
+
+    def __init__(self, cache_dir):
+        self._cache_dir = cache_dir
+
+    @functools.cached_property
+    def _key(self):
+        os.makedirs(self._cache_dir, mode=0o700, exist_ok=True)
+        key_path = os.path.join(self._cache_dir, 'key')
+        with contextlib.suppress(FileExistsError):
+            fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o600)
+            with open(fd, 'wb') as f:
+                f.write(secrets.token_bytes(32))
+        with open(key_path, 'rb') as f:
+            key = f.read()
+        if len(key) != 32:
+            raise ValueError(f'invalid cookie cache key in {key_path}')
+        return key
+
+    def entry(self, browser_name, profile, keyring, container, domains, database_path, logger):
+        # The database must be checked before reading it, so that its later changes invalidate the entry
+        stat = os.stat(database_path)
+        spec = [self._VERSION, browser_name, profile, keyring, container, domains]
+        filename = hashlib.sha256(json.dumps(spec).encode()).hexdigest()[:32]
+        return _BrowserCookieCacheEntry(
+            self, os.path.join(self._cache_dir, f'{filename}.bin'),
+            json.dumps([spec, os.path.abspath(database_path), stat.st_mtime_ns, stat.st_size]).encode(), logger)
+
+
+class _BrowserCookieCacheEntry:
+    _COOKIE_FIELDS = (
+        'version', 'name', 'value', 'port', 'port_specified', 'domain', 'domain_specified',
+        'domain_initial_dot', 'path', 'path_specified', 'secure', 'expires', 'discard',
+        'comment', 'comment_url', '_rest', 'rfc2109')
+
+    def __init__(self, cache, path, header, logger):
+        self._cache, self._path, self._header, self._logger = cache, path, header, logger
+
+    def _cipher(self, nonce):
+        cipher = Cryptodome.AES.new(self._cache._key, Cryptodome.AES.MODE_GCM, nonce)
+        cipher.update(self._header)
+        return cipher
+
+    def load(self):
+        try:
+            with open(self._path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            self._logger.warning(f'Unable to read cookie cache: {error_to_str(e)}')
+            return None
+        try:
+            # The authentication fails if the header, and so the database, has changed
+            cookies = json.loads(self._cipher(data[:12]).decrypt_and_verify(data[28:], data[12:28]))
+        except (OSError, ValueError) as e:
+            self._logger.debug(f'Discarding cookie cache: {error_to_str(e)}')
+            return None
+        jar = YoutubeDLCookieJar()
+        for fields in cookies:
+            jar.set_cookie(http.cookiejar.Cookie(*fields))
+        return jar
+
+    def store(self, jar):
+        try:
+            nonce = secrets.token_bytes(12)
+            ciphertext, tag = self._cipher(nonce).encrypt_and_digest(json.dumps([
+                [getattr(cookie, field) for field in self._COOKIE_FIELDS] for cookie in jar]).encode())
+            # mkstemp creates the file readable only by the current user
+            fd, temp_path = tempfile.mkstemp(dir=self._cache._cache_dir, suffix='.tmp')
+            try:
+                with open(fd, 'wb') as f:
+                    f.write(nonce + tag + ciphertext)
+                os.replace(temp_path, self._path)
+            except BaseException:
+                with contextlib.suppress(OSError):
+                    os.remove(temp_path)
+                raise
+        except (OSError, ValueError) as e:
+            self._logger.warning(f'Unable to write cookie cache: {error_to_str(e)}')
+        else:
+            self._logger.debug('Cached the cookies extracted from the browser')
+
+
 def _is_path(value):
     return any(sep in value for sep in (os.path.sep, os.path.altsep) if sep)
 
@@ -1274,6 +1437,97 @@ def __init__(self, filename=None, *args, **kwargs):
         if is_path_like(filename):
             filename = os.fspath(filename)
         self.filename = filename
+        self._invalidate_index()
+
+    def _invalidate_index(self):
+        # Must be called whenever the cookies are changed. Cookie objects are expected to
+        # not be modified in place after they have been set, just like `http.cookiejar` expects
+        self._index = None
+        self._header_cache = {}
+
+    def _get_index(self):
+        """
+        Index the cookie domains by the host suffix they match (see `DefaultCookiePolicy.domain_return_ok`)
+        and find the earliest time at which a cookie expires
+        """
+        with self._cookies_lock:
+            if self._index is None:
+                domains_by_suffix = collections.defaultdict(list)
+                for position, domain in enumerate(self._cookies):
+                    suffix = domain if not domain or domain.startswith('.') else f'.{domain}'
+                    domains_by_suffix[suffix].append((position, domain))
+                next_expiry = min((
+                    cookie.expires for cookie in self if cookie.expires is not None), default=math.inf)
+                self._index = dict(domains_by_suffix), next_expiry
+            return self._index
+
+    def _uses_index(self):
+        return type(self._policy) is http.cookiejar.DefaultCookiePolicy and not self._policy.rfc2965
+
+    def _candidate_domains(self, request):
+        """The cookie domains that can match the request host, in the order `CookieJar` would check them"""
+        domains_by_suffix, _ = self._get_index()
+        candidates = list(domains_by_suffix.get('', ()))
+        for host in set(http.cookiejar.eff_request_host(request)):
+            host = host if host.startswith('.') else f'.{host}'
+            start = 0
+            while start != -1:
+                candidates.extend(domains_by_suffix.get(host[start:], ()))
+                start = host.find('.', start + 1)
+        return [domain for _, domain in sorted(set(candidates))]
+
+    def _cookies_for_request(self, request):
+        if not self._uses_index():
+            return super()._cookies_for_request(request)
+        cookies = []
+        for domain in self._candidate_domains(request):
+            cookies.extend(self._cookies_for_domain(domain, request))
+        return cookies
+
+    def _cookie_header_for_request(self, request):
+        domains = self._candidate_domains(request)
+        paths = [(path, cookies) for domain in domains for path, cookies in self._cookies[domain].items()]
+        cache_key = None
+        if not request.unverifiable:
+            # The other attributes of the request are only checked by the policy for cookies that are not cached
+            cache_key = (
+                request.type, http.cookiejar.eff_request_host(request),
+                tuple(self._policy.path_return_ok(path, request) for path, _ in paths))
+            header, valid_until = self._header_cache.get(cache_key, (None, -math.inf))
+            if self._now < valid_until:
+                return header
+
+        cookies = []
+        for domain in domains:
+            cookies.extend(self._cookies_for_domain(domain, request))
+        header = '; '.join(self._cookie_attrs(cookies)) or None
+
+        candidates = [cookie for _, cookies_by_name in paths for cookie in cookies_by_name.values()]
+        if cache_key and all(cookie.version == 0 and not cookie.port for cookie in candidates):
+            self._header_cache[cache_key] = header, min((
+                cookie.expires for cookie in candidates
+                if cookie.expires is not None and cookie.expires > self._now), default=math.inf)
+        return header
+
+    def add_cookie_header(self, request):
+        if not self._uses_index():
+            return super().add_cookie_header(request)
+        with self._cookies_lock:
+            self._policy._now = self._now = int(time.time())
+            header = self._cookie_header_for_request(request)
+            if header and not request.has_header('Cookie'):
+                request.add_unredirected_header('Cookie', header)
+        self.clear_expired_cookies()
+
+    def clear_expired_cookies(self):
+        _, next_expiry = self._get_index()
+        if time.time() >= next_expiry:
+            super().clear_expired_cookies()
+
+    def set_cookie(self, cookie):
+        with self._cookies_lock:
+            super().set_cookie(cookie)
+            self._invalidate_index()
 
     @staticmethod
     def _true_or_false(cndn):
@@ -1326,6 +1580,7 @@ def save(self, filename=None, ignore_discard=True, ignore_expires=True):
         for cookie in self:
             if cookie.expires is None:
                 cookie.expires = 0
+        self._invalidate_index()
 
         with self.open(filename, write=True) as f:
             f.write(self._HEADER)
@@ -1381,6 +1636,7 @@ def prepare_line(line):
             if cookie.expires == 0:
                 cookie.expires = None
                 cookie.discard = True
+        self._invalidate_index()
 
     def get_cookie_header(self, url):
         """Generate a Cookie HTTP header for a given url"""
@@ -1396,5 +1652,8 @@ def get_cookies_for_url(self, url):
         return self._cookies_for_request(urllib.request.Request(normalize_url(sanitize_url(url))))
 
     def clear(self, *args, **kwargs):
-        with contextlib.suppress(KeyError):
-            return super().clear(*args, **kwargs)
+        try:
+            with contextlib.suppress(KeyError):
+                return super().clear(*args, **kwargs)
+        finally:
+            self._invalidate_index()
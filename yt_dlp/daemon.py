@@ -0,0 +1,432 @@
+"""
+A long-running service that downloads jobs with warm YoutubeDL instances
+
+Clients connect to a Unix socket or a local TCP port and send a single request
+as a line of JSON. The responses are sent back as lines of JSON until the
+server closes the connection. If the server has a secret, which it must have on
+a TCP port, every request must have it in its "secret" field. The secret is kept
+in a file that only its owner can read (see read_secret_file). Supported requests are:
+
+    {"action": "download", "urls": [...], "args": [...], "wait": true}
+        Queue a job downloading "urls" with the command-line options "args"
+        added to those of the server. The server replies with a "queued"
+        event and, unless "wait" is false, streams the "started", "log",
+        "info" and "progress" events of the job until it is "finished".
+        Closing the connection before the job is finished cancels it
+    {"action": "cancel", "job": ID}
+    {"action": "status"}
+    {"action": "shutdown"}
+
+YoutubeDL instances are kept for reuse by jobs with the same options, so that
+their extractors, connections, cookies and caches outlive the job.
+Since jobs can run arbitrary commands (e.g. with --exec), the server must only
+be reachable by trusted users: Unix sockets are only accessible by their owner,
+and TCP ports only accept the requests that have the secret
+"""
+
+import collections
+import concurrent.futures
+import hmac
+import itertools
+import json
+import optparse
+import os
+import queue
+import secrets
+import socket
+import socketserver
+import stat
+import sys
+import threading
+
+from .YoutubeDL import YoutubeDL
+from .postprocessor.common import PostProcessor
+from .utils import DownloadCancelled, DownloadError, SameFileError
+
+
+class JobCancelled(DownloadCancelled):
+    msg = 'The job was cancelled'
+
+
+def parse_address(address):
+    """@returns (address_family, address) from "unix:PATH" or "[HOST:]PORT" """
+    if address.startswith('unix:'):
+        if not hasattr(socket, 'AF_UNIX'):
+            raise ValueError('Unix sockets are not supported on this platform')
+        return socket.AF_UNIX, address[5:]
+    host, _, port = address.rpartition(':')
+    host = host.strip('[]') or '127.0.0.1'
+    try:
+        port = int(port)
+    except ValueError:
+        raise ValueError(f'invalid daemon address {address!r}') from None
+    return socket.AF_INET6 if ':' in host else socket.AF_INET, (host, port)
+
+
+def read_secret_file(path, create=False):
+    """@returns the secret in the file at path, which must only be accessible by its owner.
+    If create is True and the file does not exist, it is created with a new secret"""
+    if create:
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass
+        else:
+            secret = secrets.token_urlsafe(32)
+            with os.fdopen(fd, 'w') as f:
+                f.write(secret)
+            return secret
+    if os.name != 'nt' and os.stat(path).st_mode & 0o077:
+        raise ValueError(f'the secret file {path!r} must only be accessible by its owner')
+    with open(path, encoding='utf-8') as f:
+        secret = f.read().strip()
+    if not secret:
+        raise ValueError(f'the secret file {path!r} is empty')
+    return secret
+
+
+def _remove_option(argv, option):
+    """Remove the option and its value from argv, up to the first "--" """
+    index = argv.index('--') if '--' in argv else len(argv)
+    args, skip = [], False
+    for arg in argv[:index]:
+        if skip:
+            skip = False
+        elif arg == option:
+            skip = True
+        elif not arg.startswith(f'{option}='):
+            args.append(arg)
+    return [*args, *argv[index:]]
+
+
+def send_request(address, request, timeout=None, secret=None):
+    """Send a request to a running JobServer and yield the responses"""
+    if secret is not None:
+        request = {**request, 'secret': secret}
+    family, address = parse_address(address)
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(address)
+        sock.sendall(json.dumps(request).encode() + b'\n')
+        with sock.makefile('rb') as f:
+            for line in f:
+                yield json.loads(line)
+
+
+class Job:
+    _PROGRESS_FIELDS = (
+        'status', 'filename', 'tmpfilename', 'downloaded_bytes', 'total_bytes', 'total_bytes_estimate',
+        'elapsed', 'eta', 'speed', 'fragment_index', 'fragment_count')
+
+    def __init__(self, job_id, urls, args, wait=True):
+        self.id, self.urls, self.args = job_id, urls, args
+        self.status = 'queued'
+        self.future = None
+        self.events = queue.Queue() if wait else None
+        self._cancelled = threading.Event()
+
+    def emit(self, type_, **kwargs):
+        if self.events is not None:
+            self.events.put({'job': self.id, 'type': type_, **kwargs})
+
+    def cancel(self):
+        self._cancelled.set()
+        return self.future.cancel() if self.future else False
+
+    def check_cancelled(self):
+        if self._cancelled.is_set():
+            raise JobCancelled
+
+    def finish(self, status, **kwargs):
+        self.status = status
+        self.emit('finished', status=status, **kwargs)
+        if self.events is not None:
+            self.events.put(None)
+
+    @property
+    def as_json(self):
+        return {'job': self.id, 'urls': self.urls, 'args': self.args, 'status': self.status}
+
+
+class _JobHookPP(PostProcessor):
+    """Report the info of each video to the job and stop the job if it was cancelled"""
+
+    def __init__(self, runner, emit_info):
+        super().__init__()
+        self._runner, self._emit_info = runner, emit_info
+
+    def run(self, info):
+        job = self._runner.job
+        job.check_cancelled()
+        if self._emit_info:
+            job.emit('info', info=self._downloader.sanitize_info(info, remove_private_keys=True))
+        return [], info
+
+
+class _Runner:
+    """A warm YoutubeDL instance that runs one job at a time"""
+
+    def __init__(self, ydl_opts):
+        self.job = None
+        self.ydl = YoutubeDL({**ydl_opts, 'logger': self})
+        self.ydl.add_progress_hook(self._progress_hook)
+        self.ydl.add_post_processor(_JobHookPP(self, False), when='pre_process')
+        self.ydl.add_post_processor(_JobHookPP(self, True), when='video')
+
+    def _log(self, level, message):
+        if self.job:
+            self.job.emit('log', level=level, message=message)
+
+    def debug(self, message):
+        self._log('debug', message)
+
+    def info(self, message):
+        self._log('info', message)
+
+    def warning(self, message):
+        self._log('warning', message)
+
+    def error(self, message):
+        self._log('error', message)
+
+    def _progress_hook(self, status):
+        self.job.check_cancelled()
+        self.job.emit(
+            'progress', id=status.get('info_dict', {}).get('id'),
+            **{k: status[k] for k in Job._PROGRESS_FIELDS if status.get(k) is not None})
+
+    def run(self, job):
+        self.job = job
+        # Start every job as a fresh invocation would
+        self.ydl._download_retcode = self.ydl._num_downloads = self.ydl._num_videos = 0
+        try:
+            job.check_cancelled()
+            return self.ydl.download(job.urls)
+        finally:
+            self.job = None
+
+    def close(self):
+        self.ydl.close()
+
+
+class _StreamRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            if not isinstance(request, dict):
+                raise ValueError('the request must be a JSON object')
+            if not self.server.job_server.check_secret(request.get('secret')):
+                raise ValueError('invalid secret')
+            action = request.get('action')
+            handler = getattr(self, f'_handle_{action}', None) if isinstance(action, str) else None
+            if not handler:
+                raise ValueError(f'unknown action {action!r}')
+            handler(request)
+        except (ValueError, TypeError, AttributeError) as e:
+            self._send({'type': 'error', 'error': str(e)})
+        except OSError:  # The client has gone away
+            pass
+
+    def _send(self, response):
+        self.wfile.write(json.dumps(response, default=repr).encode() + b'\n')
+        self.wfile.flush()
+
+    def _handle_download(self, request):
+        urls, args = request.get('urls'), request.get('args', [])
+        if (not isinstance(urls, list) or not isinstance(args, list)
+                or not all(isinstance(x, str) for x in (*urls, *args))):
+            raise ValueError('"urls" and "args" must be lists of strings')
+        job = self.server.job_server.submit(urls, args, wait=request.get('wait', True))
+        self._send({'job': job.id, 'type': 'queued'})
+        if job.events is None:
+            return
+        try:
+            for event in iter(job.events.get, None):
+                self._send(event)
+        except OSError:
+            self.server.job_server.cancel(job.id)
+            raise
+
+    def _handle_cancel(self, request):
+        self._send({'job': request.get('job'), 'type': 'cancel', 'ok': self.server.job_server.cancel(request.get('job'))})
+
+    def _handle_status(self, request):
+        self._send({'type': 'status', 'jobs': self.server.job_server.status()})
+
+    def _handle_shutdown(self, request):
+        self._send({'type': 'shutdown'})
+        threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _TCP6Server(_TCPServer):
+    address_family = socket.AF_INET6
+
+
+if hasattr(socketserver, 'ThreadingUnixStreamServer'):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+
+class JobServer:
+    """
+    Serve download jobs on address ("unix:PATH" or "[HOST:]PORT")
+
+    Each job is parsed from the command-line options of the server (argv)
+    followed by those of the job, and at most max_jobs jobs run at a time.
+    Up to max_idle YoutubeDL instances are kept for reuse by later jobs.
+    If secret is given, only the requests with it are accepted.
+    It is required on TCP ports, which any local user can connect to
+    """
+
+    _MAX_FINISHED_JOBS = 100
+
+    def __init__(self, ydl, address, argv=None, max_jobs=2, max_idle=None, secret=None):
+        if not secret and parse_address(address)[0] != getattr(socket, 'AF_UNIX', None):
+            raise ValueError('a secret is required to accept jobs on a TCP port')
+        self.ydl = ydl
+        self.address = address
+        self._secret = secret
+        # Like the command line, the options of the server include the config files unless argv is given
+        self._argv, self._ignore_config_files = sys.argv[1:] if argv is None else list(argv), argv is not None
+        # The jobs do not need to know where the secret is kept
+        self._argv = _remove_option(self._argv, '--daemon-secret-file')
+        self._max_idle = max_idle or max_jobs * 2
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_jobs, thread_name_prefix='yt-dlp-job')
+        self._lock = threading.Lock()
+        self._idle = []  # [(args, _Runner)], least recently used first
+        self._jobs, self._finished = {}, collections.deque()
+        self._job_ids = itertools.count(1)
+        self._server = self._create_server(address)
+        self._server.job_server = self
+        if self._server.address_family != getattr(socket, 'AF_UNIX', None):
+            host, port = self._server.server_address[:2]
+            self.address = f'[{host}]:{port}' if ':' in host else f'{host}:{port}'
+
+    @staticmethod
+    def _create_server(address):
+        family, address = parse_address(address)
+        if family != socket.AF_UNIX:
+            return (_TCP6Server if family == socket.AF_INET6 else _TCPServer)(address, _StreamRequestHandler)
+
+        # Remove the socket left behind by a previous server
+        if os.path.exists(address) and stat.S_ISSOCK(os.stat(address).st_mode):
+            os.remove(address)
+        old_umask = os.umask(0o177)
+        try:
+            return _UnixServer(address, _StreamRequestHandler)
+        finally:
+            os.umask(old_umask)
+
+    def check_secret(self, secret):
+        if not self._secret:
+            return True
+        return isinstance(secret, str) and hmac.compare_digest(secret.encode(), self._secret.encode())
+
+    def _job_argv(self, args):
+        # Options of the job must come before any URLs of the server after "--"
+        index = self._argv.index('--') if '--' in self._argv else len(self._argv)
+        return [*self._argv[:index], *args, *self._argv[index:]]
+
+    def _get_runner(self, args):
+        with self._lock:
+            for i in reversed(range(len(self._idle))):
+                if self._idle[i][0] == args:
+                    return self._idle.pop(i)[1]
+
+        from . import parse_options
+        return _Runner(parse_options(self._job_argv(args), self._ignore_config_files).ydl_opts)
+
+    def _release_runner(self, args, runner):
+        with self._lock:
+            self._idle.append((args, runner))
+            evicted = self._idle[:-self._max_idle]
+            del self._idle[:-self._max_idle]
+        for _, runner in evicted:
+            runner.close()
+
+    def _run(self, job):
+        job.status = 'running'
+        job.emit('started')
+        runner = None
+        try:
+            runner = self._get_runner(tuple(job.args))
+            retcode = runner.run(job)
+        except (optparse.OptParseError, SystemExit) as e:
+            job.finish('error', error=f'Invalid options: {e}')
+        except JobCancelled:
+            job.finish('cancelled')
+        except (DownloadError, DownloadCancelled, SameFileError) as e:
+            job.finish('error', retcode=1, error=str(e))
+        except Exception as e:
+            # The state of the instance is unknown, so it is not reused
+            if runner:
+                runner.close()
+                runner = None
+            self.ydl.report_warning(f'Job {job.id} failed: {e}')
+            job.finish('error', retcode=1, error=str(e))
+        else:
+            job.finish('finished', retcode=retcode)
+        finally:
+            if runner:
+                self._release_runner(tuple(job.args), runner)
+            self._job_finished(job)
+
+    def _job_finished(self, job):
+        with self._lock:
+            self._finished.append(job.id)
+            while len(self._finished) > self._MAX_FINISHED_JOBS:
+                self._jobs.pop(self._finished.popleft(), None)
+
+    def submit(self, urls, args=(), wait=True):
+        job = Job(next(self._job_ids), list(urls), list(args), wait=wait)
+        with self._lock:
+            self._jobs[job.id] = job
+        job.future = self._executor.submit(self._run, job)
+        return job
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if not job or job.status not in ('queued', 'running'):
+            return False
+        if job.cancel():  # The job had not started yet
+            job.finish('cancelled')
+            self._job_finished(job)
+        return True
+
+    def status(self):
+        with self._lock:
+            return [job.as_json for job in self._jobs.values()]
+
+    def serve_forever(self):
+        self.ydl.to_screen(f'[daemon] Accepting jobs on {self.address}')
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            self.ydl.to_screen('[daemon] Interrupted by user')
+        finally:
+            self.close()
+        return 0
+
+    def shutdown(self):
+        self._server.shutdown()
+
+    def close(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            if job.status in ('queued', 'running'):
+                self.cancel(job.id)
+        self._executor.shutdown(wait=True)
+        self._server.server_close()
+        if self._server.address_family == getattr(socket, 'AF_UNIX', None):
+            os.remove(self._server.server_address)
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for _, runner in idle:
+            runner.close()
@@ -1,3 +1,6 @@
+import importlib
+import threading
+
 from ..compat.compat_utils import passthrough_module
 
 try:
@@ -11,28 +14,50 @@
 
 del passthrough_module
 
-__version__ = ''
-AES = PKCS1_v1_5 = Blowfish = PKCS1_OAEP = SHA1 = CMAC = RSA = None
-try:
-    if _parent.__name__ == 'Cryptodome':
-        from Cryptodome import __version__
-        from Cryptodome.Cipher import AES, PKCS1_OAEP, Blowfish, PKCS1_v1_5
-        from Cryptodome.Hash import CMAC, SHA1
-        from Cryptodome.PublicKey import RSA
-    elif _parent.__name__ == 'Crypto':
-        from Crypto import __version__
-        from Crypto.Cipher import AES, PKCS1_OAEP, Blowfish, PKCS1_v1_5  # noqa: F401
-        from Crypto.Hash import CMAC, SHA1  # noqa: F401
-        from Crypto.PublicKey import RSA  # noqa: F401
-except (ImportError, OSError):
-    __version__ = f'broken {__version__}'.strip()
-
-
-_yt_dlp__identifier = _parent.__name__
-if AES and _yt_dlp__identifier == 'Crypto':
-    try:
-        # In pycrypto, mode defaults to ECB. See:
-        # https://www.pycryptodome.org/en/latest/src/vs_pycrypto.html#:~:text=not%20have%20ECB%20as%20default%20mode
-        AES.new(b'abcdefghijklmnop')
-    except TypeError:
-        _yt_dlp__identifier = 'pycrypto'
+_SUBMODULES = {
+    'AES': 'Cipher',
+    'PKCS1_OAEP': 'Cipher',
+    'Blowfish': 'Cipher',
+    'PKCS1_v1_5': 'Cipher',
+    'CMAC': 'Hash',
+    'SHA1': 'Hash',
+    'RSA': 'PublicKey',
+}
+_lock = threading.Lock()
+
+
+def _import_submodules():
+    # The names are only set once everything is imported, since other threads may access them meanwhile
+    with _lock:
+        if '_yt_dlp__identifier' in globals():
+            return
+        submodules, version = dict.fromkeys(_SUBMODULES), ''
+        try:
+            if _parent.__name__ in ('Cryptodome', 'Crypto'):
+                version = _parent.__version__
+                for name, package in _SUBMODULES.items():
+                    submodules[name] = importlib.import_module(f'{_parent.__name__}.{package}.{name}')
+        except (ImportError, OSError, AttributeError):
+            version = f'broken {version}'.strip()
+
+        identifier = _parent.__name__
+        if submodules['AES'] and identifier == 'Crypto':
+            try:
+                # In pycrypto, mode defaults to ECB. See:
+                # https://www.pycryptodome.org/en/latest/src/vs_pycrypto.html#:~:text=not%20have%20ECB%20as%20default%20mode
+                submodules['AES'].new(b'abcdefghijklmnop')
+            except TypeError:
+                identifier = 'pycrypto'
+        globals().update(submodules, __version__=version, _yt_dlp__identifier=identifier)
+
+
+def __getattr__(name):
+    # The submodules are slow to import, so they are only imported when first accessed
+    if name in (*_SUBMODULES, '__version__', '_yt_dlp__identifier'):
+        _import_submodules()
+        return globals()[name]
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+if _parent.__name__ == __name__:  # There is nothing to import
+    _import_submodules()
@@ -1,102 +1,165 @@
 # flake8: noqa: F401
 """Imports all optional dependencies for the project.
-An attribute "_yt_dlp__identifier" may be inserted into the module if it uses an ambiguous namespace"""
+An attribute "_yt_dlp__identifier" may be inserted into the module if it uses an ambiguous namespace.
+Since some of them are slow to import, each dependency is only imported when it is first accessed"""
 
-try:
-    import brotlicffi as brotli
-except ImportError:
+_IMPORTERS = {}
+
+
+def _dependency(func):
+    _IMPORTERS[func.__name__.removeprefix('_import_')] = func
+    return func
+
+
+@_dependency
+def _import_brotli():
     try:
-        import brotli
+        import brotlicffi as brotli
     except ImportError:
-        brotli = None
+        try:
+            import brotli
+        except ImportError:
+            brotli = None
+    return brotli
+
 
+@_dependency
+def _import_certifi():
+    try:
+        import certifi
+    except ImportError:
+        return None
 
-try:
-    import certifi
-except ImportError:
-    certifi = None
-else:
-    from os.path import exists as _path_exists
+    from os.path import exists
 
     # The certificate may not be bundled in executable
-    if not _path_exists(certifi.where()):
-        certifi = None
+    return certifi if exists(certifi.where()) else None
 
 
-try:
-    import mutagen
-except ImportError:
-    mutagen = None
+@_dependency
+def _import_mutagen():
+    try:
+        import mutagen
+    except ImportError:
+        mutagen = None
+    return mutagen
 
 
-secretstorage = None
-try:
-    import secretstorage
-    _SECRETSTORAGE_UNAVAILABLE_REASON = None
-except ImportError:
-    _SECRETSTORAGE_UNAVAILABLE_REASON = (
-        'as the `secretstorage` module is not installed. '
-        'Please install by running `python3 -m pip install secretstorage`')
-except Exception as _err:
-    _SECRETSTORAGE_UNAVAILABLE_REASON = f'as the `secretstorage` module could not be initialized. {_err}'
+@_dependency
+def _import_secretstorage():
+    global _SECRETSTORAGE_UNAVAILABLE_REASON
+    try:
+        import secretstorage
+        _SECRETSTORAGE_UNAVAILABLE_REASON = None
+        return secretstorage
+    except ImportError:
+        _SECRETSTORAGE_UNAVAILABLE_REASON = (
+            'as the `secretstorage` module is not installed. '
+            'Please install by running `python3 -m pip install secretstorage`')
+    except Exception as err:
+        _SECRETSTORAGE_UNAVAILABLE_REASON = f'as the `secretstorage` module could not be initialized. {err}'
+    return None
 
 
-try:
-    import sqlite3
+@_dependency
+def _import_sqlite3():
+    try:
+        import sqlite3
+    except ImportError:
+        # although sqlite3 is part of the standard library, it is possible to compile Python without
+        # sqlite support. See: https://github.com/yt-dlp/yt-dlp/issues/544
+        return None
     # We need to get the underlying `sqlite` version, see https://github.com/yt-dlp/yt-dlp/issues/8152
     sqlite3._yt_dlp__version = sqlite3.sqlite_version
-except ImportError:
-    # although sqlite3 is part of the standard library, it is possible to compile Python without
-    # sqlite support. See: https://github.com/yt-dlp/yt-dlp/issues/544
-    sqlite3 = None
-
-
-try:
-    import websockets
-except ImportError:
-    websockets = None
-
-try:
-    import urllib3
-except ImportError:
-    urllib3 = None
-
-try:
-    import requests
-except ImportError:
-    requests = None
-
-try:
-    import xattr  # xattr or pyxattr
-except ImportError:
-    xattr = None
-else:
+    return sqlite3
+
+
+@_dependency
+def _import_websockets():
+    try:
+        import websockets
+    except ImportError:
+        websockets = None
+    return websockets
+
+
+@_dependency
+def _import_urllib3():
+    try:
+        import urllib3
+    except ImportError:
+        urllib3 = None
+    return urllib3
+
+
+@_dependency
+def _import_requests():
+    try:
+        import requests
+    except ImportError:
+        requests = None
+    return requests
+
+
+@_dependency
+def _import_xattr():
+    try:
+        import xattr  # xattr or pyxattr
+    except ImportError:
+        return None
     if hasattr(xattr, 'set'):  # pyxattr
         xattr._yt_dlp__identifier = 'pyxattr'
+    return xattr
+
+
+@_dependency
+def _import_curl_cffi():
+    try:
+        import curl_cffi
+    except ImportError:
+        curl_cffi = None
+    return curl_cffi
 
-try:
-    import curl_cffi
-except ImportError:
-    curl_cffi = None
 
-from . import Cryptodome
+@_dependency
+def _import_Cryptodome():
+    # Its submodules are in turn only imported when first accessed
+    import importlib
+    return importlib.import_module('.Cryptodome', __name__)
+
+
+@_dependency
+def _import_yt_dlp_ejs():
+    try:
+        import yt_dlp_ejs
+    except ImportError:
+        yt_dlp_ejs = None
+    return yt_dlp_ejs
 
-try:
-    import yt_dlp_ejs
-except ImportError:
-    yt_dlp_ejs = None
 
+def __getattr__(name):
+    if name in _IMPORTERS:
+        value = globals()[name] = _IMPORTERS[name]()
+        return value
+    elif name == '_SECRETSTORAGE_UNAVAILABLE_REASON':
+        __getattr__('secretstorage')
+        return _SECRETSTORAGE_UNAVAILABLE_REASON
+    elif name == 'all_dependencies':
+        return {name: _get(name) for name in _IMPORTERS}
+    elif name == 'available_dependencies':
+        return {name: module for name, module in __getattr__('all_dependencies').items() if module}
+    elif name == 'Cryptodome_AES':  # Deprecated
+        return _get('Cryptodome').AES
 
-all_dependencies = {k: v for k, v in globals().items() if not k.startswith('_')}
-available_dependencies = {k: v for k, v in all_dependencies.items() if v}
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
-# Deprecated
-Cryptodome_AES = Cryptodome.AES
+def _get(name):
+    return globals()[name] if name in globals() else __getattr__(name)
 
 
 __all__ = [
     'all_dependencies',
     'available_dependencies',
-    *all_dependencies.keys(),
+    *_IMPORTERS.keys(),
 ]
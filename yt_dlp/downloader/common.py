@@ -32,6 +32,7 @@
     try_call,
 )
 from ..utils._utils import _ProgressState
+from ..utils.ratelimit import RateLimiter
 
 
 class FileDownloader:
@@ -48,7 +49,11 @@ class FileDownloader:
 
     verbose:            Print additional info to stdout.
     quiet:              Do not print messages to stdout.
-    ratelimit:          Download speed limit, in bytes/sec.
+    ratelimit:          Download speed limit, in bytes/sec. It is shared by all the
+                        downloads of the process with the same limits
+    ratelimit_per_host: Download speed limit of each host, in bytes/sec
+    ratelimit_burst:    Number of bytes that can be downloaded above the speed limits
+                        after being idle. Defaults to a second of each limit
     throttledratelimit: Assume the download is being throttled below this speed (bytes/sec)
     retries:            Number of times to retry for expected network errors.
                         Default is 0 for API, but 10 for CLI
@@ -85,6 +90,7 @@ def __init__(self, ydl, params):
         """Create a FileDownloader object with the given options."""
         self._set_ydl(ydl)
         self._progress_hooks = []
+        self._reported_retries = 0
         self.params = params
         self._prepare_multiline_status()
         self.add_progress_hook(self.report_progress)
@@ -198,8 +204,15 @@ def parse_bytes(bytestr):
                             'may be removed in the future. Use yt_dlp.utils.parse_bytes instead')
         return parse_bytes(bytestr)
 
+    @functools.cached_property
+    def _rate_limiter(self):
+        """The RateLimiter (see utils.ratelimit) of the downloads, or None if they are unlimited"""
+        return RateLimiter.get(
+            self.params.get('ratelimit'), self.params.get('ratelimit_per_host'), self.params.get('ratelimit_burst'))
+
     def slow_down(self, start_time, now, byte_counter):
-        """Sleep if the download speed is over the rate limit."""
+        """Sleep if the download speed is over the rate limit of this download alone.
+        The downloaders use _rate_limiter instead"""
         rate_limit = self.params.get('ratelimit')
         if rate_limit is None or byte_counter == 0:
             return
@@ -409,6 +422,7 @@ def report_resuming_byte(self, resume_len):
 
     def report_retry(self, err, count, retries, frag_index=NO_DEFAULT, fatal=True):
         """Report retry"""
+        self._reported_retries += 1
         is_frag = False if frag_index is NO_DEFAULT else 'fragment'
         RetryManager.report_retry(
             err, count, retries, info=self.__to_screen,
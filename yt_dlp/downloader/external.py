@@ -1,3 +1,5 @@
+import collections
+import contextlib
 import enum
 import functools
 import json
@@ -6,15 +8,20 @@
 import subprocess
 import sys
 import tempfile
+import threading
 import time
+import urllib.parse
 import uuid
 
 from .fragment import FragmentFD
-from ..networking import Request
+from ..networking import Request, RequestDirector
+from ..networking._urllib import UrllibRH
+from ..networking.exceptions import HTTPError, RequestError
 from ..postprocessor.ffmpeg import EXT_TO_OUT_FORMATS, FFmpegPostProcessor
 from ..utils import (
     Popen,
     RetryManager,
+    YoutubeDLError,
     _configuration_args,
     check_executable,
     classproperty,
@@ -24,9 +31,11 @@
     determine_ext,
     encodeArgument,
     find_available_port,
+    join_nonempty,
     remove_end,
     traverse_obj,
 )
+from ..utils._utils import _YDLLogger
 
 
 class Features(enum.Enum):
@@ -38,9 +47,16 @@ class ExternalFD(FragmentFD):
     SUPPORTED_PROTOCOLS = ('http', 'https', 'ftp', 'ftps')
     SUPPORTED_FEATURES = ()
     _CAPTURE_STDERR = True
+    _RATE_LIMIT_OPTIONS = {'ratelimit_per_host': '--limit-rate-per-host', 'ratelimit_burst': '--limit-rate-burst'}
+    _SUPPORTED_RATE_LIMITS = ()
 
     def real_download(self, filename, info_dict):
         self.report_destination(filename)
+        unsupported = [option for param, option in self._RATE_LIMIT_OPTIONS.items()
+                       if self.params.get(param) and param not in self._SUPPORTED_RATE_LIMITS]
+        if unsupported:
+            self.report_warning(
+                f'{self.get_basename()} does not support {" and ".join(unsupported)}; ignoring', only_once=True)
         tmpfilename = self.temp_name(filename)
         self._cookies_tempfile = None
 
@@ -145,8 +161,13 @@ def _call_downloader(self, tmpfilename, info_dict):
 
         self._debug_cmd(cmd)
 
+        return self._run_downloader(functools.partial(self._call_process, cmd, info_dict), tmpfilename, info_dict)
+
+    def _run_downloader(self, call_process, tmpfilename, info_dict):
+        """Download with call_process, retrying and merging the fragments of fragmented downloads
+        @param call_process     Callable returning (stdout, stderr, returncode) of the download"""
         if 'fragments' not in info_dict:
-            _, stderr, returncode = self._call_process(cmd, info_dict)
+            _, stderr, returncode = call_process()
             if returncode and stderr:
                 self.to_stderr(stderr)
             return returncode
@@ -156,7 +177,7 @@ def _call_downloader(self, tmpfilename, info_dict):
         retry_manager = RetryManager(self.params.get('fragment_retries'), self.report_retry,
                                      frag_index=None, fatal=not skip_unavailable_fragments)
         for retry in retry_manager:
-            _, stderr, returncode = self._call_process(cmd, info_dict)
+            _, stderr, returncode = call_process()
             if not returncode:
                 break
             # TODO: Decide whether to retry based on error code
@@ -266,9 +287,160 @@ def _make_cmd(self, tmpfilename, info_dict):
         return cmd
 
 
+def aria2c_rpc_director(logger):
+    """@returns a request director for the RPC of aria2c on localhost, which does not
+    use the proxies, cookies, headers, impersonation or recording of the session"""
+    director = RequestDirector(logger)
+    director.add_handler(UrllibRH(logger=logger))
+    return director
+
+
+def aria2c_rpc(urlopen, rpc_port, rpc_secret, method, params=()):
+    # Does not actually need to be UUID, just unique
+    sanitycheck = str(uuid.uuid4())
+    d = json.dumps({
+        'jsonrpc': '2.0',
+        'id': sanitycheck,
+        'method': method,
+        # The calls of system.multicall have their own token
+        'params': list(params) if method.startswith('system.') else [f'token:{rpc_secret}', *params],
+    }).encode()
+    request = Request(
+        f'http://localhost:{rpc_port}/jsonrpc',
+        data=d, headers={
+            'Content-Type': 'application/json',
+            'Content-Length': f'{len(d)}',
+        }, proxies={'all': None})
+    with urlopen(request) as r:
+        resp = json.load(r)
+    assert resp.get('id') == sanitycheck, 'Something went wrong with RPC server'
+    return resp['result']
+
+
+class Aria2cDaemonError(YoutubeDLError):
+    pass
+
+
+class Aria2cDaemon:
+    """An aria2c process that downloads the jobs of a YoutubeDL session, controlled through RPC
+
+    The process exits along with this one, even if it does not close the daemon
+    @param cmd      The command line of aria2c, without the RPC options
+    @param logger   The logger of the RPC requests
+    """
+    STARTUP_TIMEOUT = 10
+    _BATCH_SIZE = 500
+    _STATUS_KEYS = ['status', 'totalLength', 'completedLength', 'downloadSpeed', 'errorCode', 'errorMessage']
+
+    def __init__(self, cmd, logger):
+        self._port, self._secret = find_available_port() or 19190, str(uuid.uuid4())
+        self._director = aria2c_rpc_director(logger)
+        self._rpc = functools.partial(aria2c_rpc, self._director.send, self._port, self._secret)
+        self._stderr = collections.deque(maxlen=20)
+        self._process = Popen([
+            *cmd, '--enable-rpc', f'--rpc-listen-port={self._port}', f'--rpc-secret={self._secret}',
+            '--rpc-max-request-size=64M', f'--stop-with-process={os.getpid()}',
+        ], text=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        # The pipe is drained so that aria2c never blocks on it, keeping the end for the error messages
+        self._stderr_thread = threading.Thread(target=self._stderr.extend, args=(self._process.stderr,), daemon=True)
+        self._stderr_thread.start()
+
+        deadline = time.monotonic() + self.STARTUP_TIMEOUT
+        while True:
+            self._check_alive()
+            try:
+                self._rpc('aria2.getVersion')
+                break
+            except RequestError:
+                if time.monotonic() > deadline:
+                    self._process.kill(timeout=None)
+                    self._director.close()
+                    raise Aria2cDaemonError('aria2c daemon did not start in time')
+                time.sleep(0.05)
+
+    @property
+    def alive(self):
+        return self._process.poll() is None
+
+    def _check_alive(self):
+        if self.alive:
+            return
+        self._stderr_thread.join(1)
+        raise Aria2cDaemonError(join_nonempty(
+            f'aria2c daemon exited with code {self._process.returncode}',
+            ' '.join(line.strip() for line in self._stderr if line.strip()), delim=': '))
+
+    def call(self, method, *params):
+        self._check_alive()
+        try:
+            return self._rpc(method, params)
+        except HTTPError as e:
+            raise Aria2cDaemonError(f'aria2c RPC {method} failed: {e}')
+        except RequestError as e:
+            try:
+                self._process.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                # It is running but not responding, so replace it
+                self._process.kill(timeout=None)
+                raise Aria2cDaemonError(f'aria2c daemon is not responding: {e}')
+            self._check_alive()
+
+    def multicall(self, method, params_list):
+        """Call the method with each of the params in as few requests as possible
+        @returns the results, or the {faultCode, faultString} of the failed calls"""
+        results = []
+        for start in range(0, len(params_list), self._BATCH_SIZE):
+            results.extend(
+                result[0] if isinstance(result, list) else result
+                for result in self.call('system.multicall', [
+                    {'methodName': method, 'params': [f'token:{self._secret}', *params]}
+                    for params in params_list[start:start + self._BATCH_SIZE]]))
+        return results
+
+    def add(self, jobs):
+        """Add the (URL, options) jobs to the download queue
+        @returns the GIDs of the downloads"""
+        gids = self.multicall('aria2.addUri', [[[url], options] for url, options in jobs])
+        faults = [gid for gid in gids if isinstance(gid, dict)]
+        if faults:
+            self.remove([gid for gid in gids if not isinstance(gid, dict)])
+            raise Aria2cDaemonError(f'Unable to add the download: {faults[0].get("faultString")}')
+        return gids
+
+    def status(self, gids):
+        """@returns the status of each of the downloads"""
+        return [
+            # The download is unknown to aria2c, e.g. if another RPC client removed it
+            {'status': 'error', 'errorMessage': stat.get('faultString'),
+             'totalLength': '0', 'completedLength': '0', 'downloadSpeed': '0'}
+            if 'faultCode' in stat else stat
+            for stat in self.multicall('aria2.tellStatus', [[gid, self._STATUS_KEYS] for gid in gids])]
+
+    def remove(self, gids):
+        """Stop the downloads and forget their results"""
+        if not self.alive:
+            return
+        with contextlib.suppress(Aria2cDaemonError, RequestError):
+            # The calls for the downloads that are already stopped just fail
+            self.multicall('aria2.forceRemove', [[gid] for gid in gids])
+            self.multicall('aria2.removeDownloadResult', [[gid] for gid in gids])
+
+    def close(self):
+        if self.alive:
+            with contextlib.suppress(RequestError):
+                self._rpc('aria2.shutdown')
+            try:
+                self._process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._process.kill(timeout=None)
+        self._director.close()
+        self._stderr_thread.join(1)
+
+
 class Aria2cFD(ExternalFD):
     AVAILABLE_OPT = '-v'
     SUPPORTED_PROTOCOLS = ('http', 'https', 'ftp', 'ftps', 'dash_frag_urls', 'm3u8_frag_urls')
+    _SUPPORTED_RATE_LIMITS = ('ratelimit_per_host',)
 
     @staticmethod
     def supports_manifest(manifest):
@@ -283,7 +455,24 @@ def supports_manifest(manifest):
     def _aria2c_filename(fn):
         return fn if os.path.isabs(fn) else f'.{os.path.sep}{fn}'
 
+    def _download_limits(self, urls):
+        """@returns the max-download-limit of the download of each URL, so that the downloads
+        from each host, which aria2c runs up to 16 at a time, are within the rate limit per host"""
+        host_rate = self.params.get('ratelimit_per_host')
+        if not host_rate:
+            return [None] * len(urls)
+        hosts = [urllib.parse.urlparse(url).hostname for url in urls]
+        counts = collections.Counter(hosts)
+        return [max(1, int(host_rate // min(counts[host], 16))) for host in hosts]
+
+    _DAEMON_POLL_INTERVAL = 0.1
+    _daemon_lock = threading.Lock()
+
     def _call_downloader(self, tmpfilename, info_dict):
+        if self.params.get('aria2c_daemon'):
+            return self._run_downloader(
+                functools.partial(self._call_daemon, tmpfilename, info_dict), tmpfilename, info_dict)
+
         # FIXME: Disabled due to https://github.com/yt-dlp/yt-dlp/issues/5931
         if False and 'no-external-downloader-progress' not in self.params.get('compat_opts', []):
             info_dict['__rpc'] = {
@@ -307,6 +496,8 @@ def _make_cmd(self, tmpfilename, info_dict):
             for key, val in info_dict['http_headers'].items():
                 cmd += ['--header', f'{key}: {val}']
         cmd += self._option('--max-overall-download-limit', 'ratelimit')
+        if 'fragments' not in info_dict and self.params.get('ratelimit_per_host'):
+            cmd += [f'--max-download-limit={self._download_limits([info_dict["url"]])[0]}']
         cmd += self._option('--interface', 'source_address')
         cmd += self._option('--all-proxy', 'proxy')
         cmd += self._bool_option('--check-certificate', 'nocheckcertificate', 'false', 'true', '=')
@@ -337,9 +528,12 @@ def _make_cmd(self, tmpfilename, info_dict):
             cmd += ['--uri-selector=inorder']
             url_list_file = f'{tmpfilename}.frag.urls'
             url_list = []
-            for frag_index, fragment in enumerate(info_dict['fragments']):
+            limits = self._download_limits([fragment['url'] for fragment in info_dict['fragments']])
+            for frag_index, (fragment, limit) in enumerate(zip(info_dict['fragments'], limits)):
                 fragment_filename = f'{os.path.basename(tmpfilename)}-Frag{frag_index}'
                 url_list.append('{}\n\tout={}'.format(fragment['url'], self._aria2c_filename(fragment_filename)))
+                if limit:
+                    url_list[-1] += f'\n\tmax-download-limit={limit}'
             stream, _ = self.sanitize_open(url_list_file, 'wb')
             stream.write('\n'.join(url_list).encode())
             stream.close()
@@ -348,31 +542,141 @@ def _make_cmd(self, tmpfilename, info_dict):
             cmd += ['--', info_dict['url']]
         return cmd
 
+    def _make_daemon_cmd(self):
+        cmd = [self.exe, '--no-conf', '--console-log-level=warn', '--summary-interval=0',
+               '--download-result=hide', '-j16']
+        cmd += self._option('--max-overall-download-limit', 'ratelimit')
+        cmd += self._configuration_args()
+        return cmd
+
+    def _make_jobs(self, tmpfilename, info_dict):
+        """@returns the (URL, options) of the downloads to add to the daemon, which has
+        the options of the command line that are the same for all the downloads"""
+        options = {
+            'continue': 'true',
+            'http-accept-gzip': 'true',
+            'file-allocation': 'none',
+            'max-connection-per-server': '16',
+            'split': '16',
+            'auto-file-renaming': 'false',
+            # The daemon may not have the same working directory
+            'dir': os.path.abspath(os.path.dirname(tmpfilename) or '.') + os.path.sep,
+        }
+        if 'fragments' in info_dict:
+            options.update({'allow-overwrite': 'true', 'allow-piece-length-change': 'true'})
+        else:
+            options['min-split-size'] = '1M'
+        for option, param in (('all-proxy', 'proxy'), ('interface', 'source_address')):
+            if self.params.get(param) is not None:
+                options[option] = str(self.params[param])
+        if self.params.get('nocheckcertificate') is not None:
+            options['check-certificate'] = 'false' if self.params['nocheckcertificate'] else 'true'
+        if self.params.get('updatetime') is not None:
+            options['remote-time'] = 'true' if self.params['updatetime'] else 'false'
+        headers = [f'{key}: {val}' for key, val in (info_dict.get('http_headers') or {}).items()]
+
+        def make_job(url, filename, limit):
+            # Cookies are sent as a header, since the daemon can only load a cookies file on startup
+            cookie_header = self.ydl.cookiejar.get_cookie_header(url)
+            job_options = {
+                **options,
+                'out': self._aria2c_filename(filename),
+                'header': [*headers, f'Cookie: {cookie_header}'] if cookie_header else headers,
+            }
+            if limit:
+                job_options['max-download-limit'] = str(limit)
+            return url, job_options
+
+        basename = os.path.basename(tmpfilename)
+        if 'fragments' not in info_dict:
+            urls, filenames = [info_dict['url']], [basename]
+        else:
+            urls = [fragment['url'] for fragment in info_dict['fragments']]
+            filenames = [f'{basename}-Frag{frag_index}' for frag_index in range(len(urls))]
+        return list(map(make_job, urls, filenames, self._download_limits(urls)))
+
+    def _get_daemon(self):
+        with self._daemon_lock:
+            daemon = self.ydl._aria2c_daemon
+            if daemon is None or not daemon.alive:
+                if daemon is not None:
+                    daemon.close()
+                self.ydl._aria2c_daemon = None
+                cmd = [encodeArgument(a) for a in self._make_daemon_cmd()]
+                self._debug_cmd(cmd)
+                daemon = self.ydl._aria2c_daemon = Aria2cDaemon(cmd, _YDLLogger(self.ydl))
+            return daemon
+
+    def _call_daemon(self, tmpfilename, info_dict):
+        jobs = self._make_jobs(tmpfilename, info_dict)
+        for restarted in (False, True):
+            try:
+                daemon = self._get_daemon()
+            except Aria2cDaemonError as e:
+                return '', str(e), 1
+            try:
+                return self._wait_daemon_jobs(daemon, daemon.add(jobs), info_dict)
+            except Aria2cDaemonError as e:
+                if restarted or daemon.alive:
+                    return '', str(e), 1
+                # The downloads are continued by the new daemon
+                self.report_warning(f'{e}; restarting it')
+
+    def _wait_daemon_jobs(self, daemon, gids, info_dict):
+        fragmented = 'fragments' in info_dict
+        started = time.time()
+        status = {
+            'filename': info_dict.get('_filename'),
+            'status': 'downloading',
+            'elapsed': 0,
+            'downloaded_bytes': 0,
+            'fragment_count': len(gids) if fragmented else None,
+            'fragment_index': 0 if fragmented else None,
+        }
+        report_progress = 'no-external-downloader-progress' not in self.params.get('compat_opts', [])
+        stats, pending = {}, gids
+        try:
+            while pending:
+                stats.update(zip(pending, daemon.status(pending)))
+                pending = [gid for gid in pending if stats[gid]['status'] not in ('complete', 'error', 'removed')]
+                if report_progress:
+                    downloaded = sum(int(stat['completedLength']) for stat in stats.values())
+                    lengths = [int(stat['totalLength']) for stat in stats.values() if int(stat['totalLength'])]
+                    total = sum(lengths) / len(lengths) * len(gids) if lengths else None
+                    if total and total < downloaded:
+                        total = None
+                    speed = sum(int(stat['downloadSpeed']) for stat in stats.values())
+                    status.update({
+                        'downloaded_bytes': downloaded,
+                        'speed': speed,
+                        'total_bytes': None if fragmented else total,
+                        'total_bytes_estimate': total,
+                        'eta': (total - downloaded) / (speed or 1) if total else None,
+                        'fragment_index': min(len(gids), len(gids) - len(pending) + 1) if fragmented else None,
+                        'elapsed': time.time() - started,
+                    })
+                    self._hook_progress(status, info_dict)
+                if pending:
+                    time.sleep(self._DAEMON_POLL_INTERVAL)
+        finally:
+            daemon.remove(gids)
+
+        failed = [stats[gid] for gid in gids if stats[gid]['status'] != 'complete']
+        if not failed:
+            return '', '', 0
+        return '', '\n'.join(dict.fromkeys(
+            stat.get('errorMessage') or f'Download was {stat["status"]}' for stat in failed)), int(failed[0].get('errorCode') or 1)
+
     def aria2c_rpc(self, rpc_port, rpc_secret, method, params=()):
-        # Does not actually need to be UUID, just unique
-        sanitycheck = str(uuid.uuid4())
-        d = json.dumps({
-            'jsonrpc': '2.0',
-            'id': sanitycheck,
-            'method': method,
-            'params': [f'token:{rpc_secret}', *params],
-        }).encode()
-        request = Request(
-            f'http://localhost:{rpc_port}/jsonrpc',
-            data=d, headers={
-                'Content-Type': 'application/json',
-                'Content-Length': f'{len(d)}',
-            }, proxies={'all': None})
-        with self.ydl.urlopen(request) as r:
-            resp = json.load(r)
-        assert resp.get('id') == sanitycheck, 'Something went wrong with RPC server'
-        return resp['result']
+        with contextlib.closing(aria2c_rpc_director(_YDLLogger(self.ydl))) as director:
+            return aria2c_rpc(director.send, rpc_port, rpc_secret, method, params)
 
     def _call_process(self, cmd, info_dict):
         if '__rpc' not in info_dict:
             return super()._call_process(cmd, info_dict)
 
-        send_rpc = functools.partial(self.aria2c_rpc, info_dict['__rpc']['port'], info_dict['__rpc']['secret'])
+        director = aria2c_rpc_director(_YDLLogger(self.ydl))
+        send_rpc = functools.partial(aria2c_rpc, director.send, info_dict['__rpc']['port'], info_dict['__rpc']['secret'])
         started = time.time()
 
         fragmented = 'fragments' in info_dict
@@ -391,7 +695,7 @@ def get_stat(key, *obj, average=False):
             val = tuple(filter(None, map(float, traverse_obj(obj, (..., ..., key))))) or [0]
             return sum(val) / (len(val) if average else 1)
 
-        with Popen(cmd, text=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE) as p:
+        with contextlib.closing(director), Popen(cmd, text=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE) as p:
             # Add a small sleep so that RPC client can receive response,
             # or the connection stalls infinitely
             time.sleep(0.2)
@@ -17,11 +17,19 @@
 
 
 class HttpQuietDownloader(HttpFD):
+    # The fragment downloader that the retries are also reported to
+    parent = None
+
     def to_screen(self, *args, **kargs):
         pass
 
     to_console_title = to_screen
 
+    def report_retry(self, *args, **kwargs):
+        super().report_retry(*args, **kwargs)
+        if self.parent:
+            self.parent._reported_retries += 1
+
 
 class FragmentFD(FileDownloader):
     """
@@ -172,6 +180,7 @@ def _prepare_frag_download(self, ctx):
             'max_sleep_interval': 0,
             'sleep_interval_subtitles': 0,
         })
+        dl.parent = self
         tmpfilename = self.temp_name(ctx['filename'])
         open_mode = 'wb'
 
@@ -288,7 +297,9 @@ def _finish_frag_download(self, ctx, info_dict):
             self.try_remove(self.ytdl_filename(ctx['filename']))
         elapsed = time.time() - ctx['started']
 
-        to_file = ctx['tmpfilename'] != '-'
+        # Non-regular files, e.g. the named pipes used when merging while downloading, have no size
+        to_file = ctx['tmpfilename'] != '-' and not (
+            os.path.exists(ctx['tmpfilename']) and not os.path.isfile(ctx['tmpfilename']))
         if to_file:
             downloaded_bytes = self.filesize_or_none(ctx['tmpfilename'])
         else:
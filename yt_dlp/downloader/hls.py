@@ -311,6 +311,9 @@ def is_ad_fragment_end(s):
             return fd.real_download(filename, info_dict)
 
         if is_webvtt:
+            # The window is kept in extra_state so that it is saved with the download's progress
+            cue_window = webvtt.CueWindow(extra_state.setdefault('webvtt_dedup_window', []))
+
             def pack_fragment(frag_content, frag_index):
                 output = io.StringIO()
                 adjust = 0
@@ -324,34 +327,8 @@ def pack_fragment(frag_content, frag_index):
                             overflow = False
                         block.start += adjust
                         block.end += adjust
-
-                        dedup_window = extra_state.setdefault('webvtt_dedup_window', [])
-
-                        ready = []
-
-                        i = 0
-                        is_new = True
-                        while i < len(dedup_window):
-                            wcue = dedup_window[i]
-                            wblock = webvtt.CueBlock.from_json(wcue)
-                            i += 1
-                            if wblock.hinges(block):
-                                wcue['end'] = block.end
-                                is_new = False
-                                continue
-                            if wblock == block:
-                                is_new = False
-                                continue
-                            if wblock.end > block.start:
-                                continue
-                            ready.append(wblock)
-                            i -= 1
-                            del dedup_window[i]
-
-                        if is_new:
-                            dedup_window.append(block.as_json)
-                        for block in ready:
-                            block.write_into(output)
+                        for ready_block in cue_window.push(block):
+                            ready_block.write_into(output)
 
                         # we only emit cues once they fall out of the duplicate window
                         continue
@@ -390,13 +367,13 @@ def pack_fragment(frag_content, frag_index):
                 return output.getvalue().encode()
 
             def fin_fragments():
-                dedup_window = extra_state.get('webvtt_dedup_window')
-                if not dedup_window:
+                ready = cue_window.flush()
+                if not ready:
                     return b''
 
                 output = io.StringIO()
-                for cue in dedup_window:
-                    webvtt.CueBlock.from_json(cue).write_into(output)
+                for block in ready:
+                    block.write_into(output)
 
                 return output.getvalue().encode()
 
@@ -227,11 +227,14 @@ def download():
                     return False
 
             byte_counter = 0 + ctx.resume_len
-            block_size = ctx.block_size
+            rate_limiter = self._rate_limiter
+            # Smaller reads keep the rate smooth instead of alternating between bursts and sleeps
+            max_block_size = rate_limiter.block_size if rate_limiter else float('inf')
+            block_size = min(ctx.block_size, max_block_size)
             start = time.time()
 
-            # measure time over whole while-loop, so slow_down() and best_block_size() work together properly
-            now = None  # needed for slow_down() in the first loop run
+            # measure time over whole while-loop, so that the rate limit and best_block_size() work together properly
+            now = None
             before = start  # start measuring
 
             def retry(e):
@@ -278,7 +281,8 @@ def retry(e):
                     return False
 
                 # Apply rate limit
-                self.slow_down(start, now, byte_counter - ctx.resume_len)
+                if rate_limiter:
+                    rate_limiter.consume(len(data_block), url)
 
                 # end measuring of one loop run
                 now = time.time()
@@ -286,7 +290,7 @@ def retry(e):
 
                 # Adjust block size
                 if not self.params.get('noresizebuffer', False):
-                    block_size = self.best_block_size(after - before, len(data_block))
+                    block_size = min(self.best_block_size(after - before, len(data_block)), max_block_size)
 
                 before = after
 
@@ -1,4 +1,3 @@
-import asyncio
 import contextlib
 import os
 import signal
@@ -6,13 +5,14 @@
 
 from .common import FileDownloader
 from .external import FFmpegFD
-from ..dependencies import websockets
 
 
 class FFmpegSinkFD(FileDownloader):
     """ A sink to ffmpeg for downloading fragments in any form """
 
     def real_download(self, filename, info_dict):
+        import asyncio
+
         info_copy = info_dict.copy()
         info_copy['url'] = '-'
 
@@ -45,9 +45,16 @@ async def real_connection(self, sink, info_dict):
 
 class WebSocketFragmentFD(FFmpegSinkFD):
     async def real_connection(self, sink, info_dict):
+        import asyncio
+
+        from ..dependencies import websockets
+
+        rate_limiter = self._rate_limiter
         async with websockets.connect(info_dict['url'], extra_headers=info_dict.get('http_headers', {})) as ws:
             while True:
                 recv = await ws.recv()
                 if isinstance(recv, str):
                     recv = recv.encode('utf8')
                 sink.write(recv)
+                if rate_limiter:
+                    await asyncio.sleep(rate_limiter.reserve(len(recv), info_dict['url']))
@@ -6,11 +6,18 @@
 passthrough_module(__name__, '.extractors')
 del passthrough_module
 
+
+def _lazy_plugin_loader():
+    from .common import LazyPluginExtractor
+    return LazyPluginExtractor
+
+
 register_plugin_spec(PluginSpec(
     module_name='extractor',
     suffix='IE',
     destination=_extractors_context,
     plugin_destination=_plugin_ies_context,
+    lazy_loader=_lazy_plugin_loader,
 ))
 
 
@@ -1,11 +1,13 @@
 import base64
 import collections
 import contextlib
+import contextvars
 import functools
 import getpass
 import http.client
 import http.cookiejar
 import http.cookies
+import importlib
 import inspect
 import itertools
 import json
@@ -102,6 +104,7 @@
 )
 from ..utils._utils import _request_dump_filename
 from ..utils.jslib import devalue
+from ..utils.timing import NULL_SPAN
 
 
 class InfoExtractor:
@@ -905,8 +908,10 @@ def _request_webpage(self, url_or_request, video_id, note=None, errnote=None, fa
             self.report_warning(
                 self._downloader._unavailable_targets_message(requested_targets, note=msg), only_once=True)
 
+        request = self._create_request(url_or_request, data, headers, query, extensions)
         try:
-            return self._downloader.urlopen(self._create_request(url_or_request, data, headers, query, extensions))
+            with self._webpage_span(video_id, request.url):
+                return self._downloader.urlopen(request)
         except network_exceptions as err:
             if isinstance(err, HTTPError):
                 if self.__can_accept_status_code(err, expected_status):
@@ -969,20 +974,43 @@ def _download_webpage_handle(self, url_or_request, video_id, note=None, errnote=
         # Strip hashes from the URL (#1038)
         if isinstance(url_or_request, str):
             url_or_request = url_or_request.partition('#')[0]
-
-        urlh = self._request_webpage(url_or_request, video_id, note, errnote, fatal, data=data,
-                                     headers=headers, query=query, expected_status=expected_status,
-                                     impersonate=impersonate, require_impersonation=require_impersonation)
-        if urlh is False:
-            assert not fatal
-            return False
-        content = self._webpage_read_content(urlh, url_or_request, video_id, note, errnote, fatal,
-                                             encoding=encoding, data=data)
-        if content is False:
-            assert not fatal
-            return False
+            url = url_or_request
+        else:
+            url = getattr(url_or_request, 'url', None) or url_or_request.full_url
+
+        # The span includes reading the content, so that it is the whole time spent on the page
+        with self._webpage_span(video_id, url) as span:
+            urlh = self._request_webpage(url_or_request, video_id, note, errnote, fatal, data=data,
+                                         headers=headers, query=query, expected_status=expected_status,
+                                         impersonate=impersonate, require_impersonation=require_impersonation)
+            if urlh is False:
+                assert not fatal
+                span['status'] = 'error'
+                return False
+            content = self._webpage_read_content(urlh, url_or_request, video_id, note, errnote, fatal,
+                                                 encoding=encoding, data=data)
+            if content is False:
+                assert not fatal
+                span['status'] = 'error'
+                return False
         return (content, urlh)
 
+    _in_webpage_span = contextvars.ContextVar('in_webpage_span', default=False)
+
+    @contextlib.contextmanager
+    def _webpage_span(self, video_id, url):
+        """Time the request of a webpage, unless it is already timed by the caller"""
+        if self._in_webpage_span.get():
+            with NULL_SPAN as span:
+                yield span
+            return
+        token = self._in_webpage_span.set(True)
+        try:
+            with self._downloader.timing_span('webpage', self.IE_NAME, video_id=video_id, url=url) as span:
+                yield span
+        finally:
+            self._in_webpage_span.reset(token)
+
     @staticmethod
     def _guess_encoding_from_content(content_type, webpage_bytes):
         m = re.match(r'[a-zA-Z0-9_.-]+/[a-zA-Z0-9_.-]+\s*;\s*charset=(.+)', content_type)
@@ -3890,12 +3918,19 @@ def extract_comments(self, *args, **kwargs):
             return None
         generator = self._get_comments(*args, **kwargs)
 
-        def extractor():
+        def extractor(on_comment=None):
+            """@param on_comment  Function to pass each comment to instead of collecting them"""
             comments = []
+            comment_count = 0
             interrupted = True
             try:
                 while True:
-                    comments.append(next(generator))
+                    comment = next(generator)
+                    if on_comment:
+                        on_comment(comment)
+                    else:
+                        comments.append(comment)
+                    comment_count += 1
             except StopIteration:
                 interrupted = False
             except KeyboardInterrupt:
@@ -3906,10 +3941,9 @@ def extractor():
                 if self.get_param('ignoreerrors') is not True:
                     raise
                 self._downloader.report_error(e)
-            comment_count = len(comments)
             self.to_screen(f'Extracted {comment_count} comments')
             return {
-                'comments': comments,
+                **({} if on_comment else {'comments': comments}),
                 'comment_count': None if interrupted else comment_count,
             }
         return extractor
@@ -4180,3 +4214,60 @@ class UnsupportedURLIE(InfoExtractor):
 
     def _real_extract(self, url):
         raise UnsupportedError(url)
+
+
+class _LazyPluginMetaClass(type):
+    def __getattr__(cls, name):
+        if name.startswith('__') or not cls._module:
+            raise AttributeError(f'type object {cls.__name__!r} has no attribute {name!r}')
+        return getattr(cls.real_class, name)
+
+
+class LazyPluginExtractor(InfoExtractor, metaclass=_LazyPluginMetaClass):
+    """
+    Stand-in for a plugin extractor, created from the plugin index without importing its module
+
+    It has the attributes of the plugin that are needed to match URLs. The plugin module is
+    imported when the extractor is instantiated or any other attribute of it is accessed
+    """
+
+    _module = None
+    _INDEXED_ATTRIBUTES = (
+        'IE_NAME', '_ENABLED', '_VALID_URL', '_WORKING', 'IE_DESC', '_NETRC_MACHINE', 'SEARCH_KEY',
+        'age_limit', '_RETURN_TYPE')
+    # Plugins overriding these cannot be loaded lazily
+    _CLASS_METHODS = (
+        'ie_key', 'suitable', '_match_valid_url', 'working', 'get_temp_id', '_match_id', 'description',
+        'is_suitable', 'supports_login', 'is_single_video',
+        'extract_from_webpage', '_extract_from_webpage', '_extract_embed_urls')
+
+    @classproperty
+    def real_class(cls):
+        if '_real_class' not in cls.__dict__:
+            cls._real_class = getattr(importlib.import_module(cls._module), cls.__name__)
+        return cls._real_class
+
+    def __new__(cls, *args, **kwargs):
+        instance = cls.real_class.__new__(cls.real_class)
+        instance.__init__(*args, **kwargs)
+        return instance
+
+    @classmethod
+    def index_module(cls, module, classes):
+        """@returns {name: attributes} of the extractors of a plugin module, or None if it must be imported"""
+        for obj in vars(module).values():
+            # Overrides of other extractors only take effect when their module is imported
+            if inspect.isclass(obj) and getattr(obj, 'PLUGIN_NAME', None):
+                return None
+        indexed = {}
+        for name, ie in classes.items():
+            if not issubclass(ie, InfoExtractor) or ie._EMBED_REGEX or any(
+                    getattr(getattr(ie, method), '__func__', None) is not getattr(InfoExtractor, method).__func__
+                    for method in cls._CLASS_METHODS):
+                return None
+            indexed[name] = {attr: getattr(ie, attr) for attr in cls._INDEXED_ATTRIBUTES}
+        return indexed
+
+    @classmethod
+    def create(cls, module_name, name, attributes):
+        return type(cls)(name, (cls,), {'__module__': module_name, '_module': module_name, **attributes})
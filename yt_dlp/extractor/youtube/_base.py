@@ -990,6 +990,49 @@ def _download_webpage_with_retries(self, *args, retry_fatal=False, retry_on_stat
                 self._error_or_warning(e, fatal=retry_fatal)
                 break
 
+    # Downloaded client configs are reused across runs for this long
+    _YTCFG_CACHE_TTL = 6 * 60 * 60
+    # Values of the client configs that are tied to the session they were downloaded in
+    _YTCFG_SESSION_KEYS = (
+        'XSRF_TOKEN', 'XSRF_FIELD_NAME', 'ID_TOKEN', 'DATASYNC_ID', 'DELEGATED_SESSION_ID',
+        'USER_SESSION_ID', 'SESSION_INDEX', 'LOGGED_IN', 'SERIALIZED_CLIENT_CONFIG_DATA')
+
+    def _ytcfg_cache_key(self, client):
+        if not self.is_authenticated:
+            return f'{client}_anon'
+        # Configs of different accounts must not be mixed up
+        account = self._get_sid_cookies()[0] or ''
+        return f'{client}_{hashlib.sha256(account.encode()).hexdigest()[:16]}'
+
+    def _load_cached_ytcfg(self, client):
+        cache_key = self._ytcfg_cache_key(client)
+        cached = self.cache.load('youtube-ytcfg', cache_key)
+        if not isinstance(cached, dict) or not isinstance(cached.get('ytcfg'), dict):
+            return None
+        elif cached.get('timestamp', 0) + self._YTCFG_CACHE_TTL < time.time():
+            self.write_debug(f'Cached {client} client config has expired')
+            return None
+        # The cached config is from an older client version if yt-dlp's default has been updated since
+        elif cached.get('default_client_version') != self._extract_client_version(self._get_default_ytcfg(client), client):
+            self.write_debug(f'Cached {client} client config is for a different client version')
+            return None
+        ytcfg = cached['ytcfg']
+        if cached.get('visitor_data'):
+            ytcfg.setdefault('VISITOR_DATA', cached['visitor_data'])
+        return ytcfg
+
+    def _store_cached_ytcfg(self, client, ytcfg):
+        ytcfg = {k: v for k, v in copy.deepcopy(ytcfg).items() if k not in self._YTCFG_SESSION_KEYS}
+        # The IP address the config was requested from
+        traverse_obj(ytcfg, ('INNERTUBE_CONTEXT', 'client', {dict}), default={}).pop('remoteHost', None)
+        self.cache.store('youtube-ytcfg', self._ytcfg_cache_key(client), {
+            'timestamp': time.time(),
+            'default_client_version': self._extract_client_version(self._get_default_ytcfg(client), client),
+            'visitor_data': traverse_obj(
+                ytcfg, ('VISITOR_DATA', {str}), ('INNERTUBE_CONTEXT', 'client', 'visitorData', {str})),
+            'ytcfg': ytcfg,
+        })
+
     def _download_ytcfg(self, client, video_id):
         url = {
             'mweb': 'https://m.youtube.com',
@@ -1000,6 +1043,12 @@ def _download_ytcfg(self, client, video_id):
         }.get(client)
         if not url:
             return {}
+        # The embed page is specific to the video
+        cacheable = client != 'web_embedded'
+        if cacheable and (ytcfg := self._load_cached_ytcfg(client)):
+            self.write_debug(f'{video_id}: Using cached {client} client config')
+            return ytcfg
+
         webpage = self._download_webpage_with_retries(
             url, video_id, note=f'Downloading {client.replace("_", " ").strip()} client config',
             headers=traverse_obj(self._get_default_ytcfg(client), {
@@ -1019,6 +1068,8 @@ def _download_ytcfg(self, client, video_id):
                 'INNERTUBE_CONTEXT', 'client', 'configInfo', {dict})) or {}
             config_info.pop('appInstallData', None)
 
+        if cacheable and ytcfg:
+            self._store_cached_ytcfg(client, ytcfg)
         return ytcfg
 
     @staticmethod
@@ -1,7 +1,9 @@
 import functools
 import itertools
+import queue
 import re
 import shlex
+import threading
 import urllib.parse
 
 from ._base import BadgeType, YoutubeBaseInfoExtractor
@@ -31,6 +33,53 @@
 )
 
 
+def _prefetch(iterable, depth):
+    """
+    Iterate over iterable in a background thread, staying up to depth items ahead of the consumer
+
+    Closing the returned generator stops the iteration before the next item is requested
+    """
+    if not depth:
+        yield from iterable
+        return
+
+    slots, results = threading.Semaphore(depth), queue.Queue()
+    stopped = threading.Event()
+
+    def worker():
+        iterator = iter(iterable)
+        try:
+            while True:
+                slots.acquire()
+                if stopped.is_set():
+                    break
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    results.put((False, None))
+                    break
+                results.put((True, item))
+        except BaseException as e:
+            results.put((None, e))
+        finally:
+            if hasattr(iterator, 'close'):
+                iterator.close()
+
+    threading.Thread(target=worker, daemon=True).start()
+    try:
+        while True:
+            status, item = results.get()
+            if status is None:
+                raise item
+            elif not status:
+                return
+            slots.release()
+            yield item
+    finally:
+        stopped.set()
+        slots.release()
+
+
 class YoutubeTabBaseInfoExtractor(YoutubeBaseInfoExtractor):
     @staticmethod
     def passthrough_smuggled_data(func):
@@ -520,6 +569,14 @@ def _extract_entries(self, parent_renderer, continuation_list):
             continuation_list[0] = self._extract_continuation(parent_renderer)
 
     def _entries(self, tab, item_id, ytcfg, delegated_session_id, visitor_data):
+        # Request the next pages while the entries of the current one are being processed
+        depth = int_or_none(self._configuration_arg('prefetch', ['1'], ie_key=YoutubeTabIE)[0], default=1)
+        pages = self._entry_pages(tab, item_id, ytcfg, delegated_session_id, visitor_data)
+        for page in _prefetch(pages, min(max(depth, 0), 2)):
+            yield from page
+
+    def _entry_pages(self, tab, item_id, ytcfg, delegated_session_id, visitor_data):
+        """Yield the list of entries of each page; the next page is only requested when the generator is resumed"""
         continuation_list = [None]
         extract_entries = lambda x: self._extract_entries(x, continuation_list)
         tab_content = try_get(tab, lambda x: x['content'], dict)
@@ -528,7 +585,7 @@ def _entries(self, tab, item_id, ytcfg, delegated_session_id, visitor_data):
         parent_renderer = (
             try_get(tab_content, lambda x: x['sectionListRenderer'], dict)
             or try_get(tab_content, lambda x: x['richGridRenderer'], dict) or {})
-        yield from extract_entries(parent_renderer)
+        yield list(extract_entries(parent_renderer))
         continuation = continuation_list[0]
         seen_continuations = set()
         for page_num in itertools.count(1):
@@ -582,14 +639,16 @@ def _entries(self, tab, item_id, ytcfg, delegated_session_id, visitor_data):
             continuation_item = traverse_obj(continuation_items, 0, None, expected_type=dict, default={})
 
             video_items_renderer = None
+            entries = []
             for key in continuation_item:
                 if key not in known_renderers:
                     continue
                 func, parent_key = known_renderers[key]
                 video_items_renderer = {parent_key: continuation_items} if parent_key else continuation_items
                 continuation_list = [None]
-                yield from func(video_items_renderer)
+                entries.extend(func(video_items_renderer))
                 continuation = continuation_list[0] or self._extract_continuation(video_items_renderer)
+            yield entries
 
             # In the case only a continuation is returned, try to follow it.
             # We extract this after trying to extract non-continuation items as otherwise this
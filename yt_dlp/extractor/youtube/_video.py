@@ -1,6 +1,7 @@
 import base64
 import binascii
 import collections
+import concurrent.futures
 import datetime as dt
 import functools
 import itertools
@@ -150,6 +151,8 @@ class YoutubeIE(YoutubeBaseInfoExtractor):
     _DEFAULT_AUTHED_CLIENTS = ('tv_downgraded', 'web_safari', 'web')
     # Premium does not require POT (except for subtitles)
     _DEFAULT_PREMIUM_CLIENTS = ('tv_downgraded', 'web_creator', 'web')
+    # Maximum number of clients whose configs and player responses are requested concurrently
+    _PLAYER_RESPONSE_WORKERS = 3
 
     _GEO_BYPASS = False
 
@@ -1837,6 +1840,9 @@ def __init__(self, *args, **kwargs):
         self._code_cache = {}
         self._player_cache = {}
         self._pot_director = None
+        # The player responses are requested concurrently, but the PO Token providers and
+        # the player JS caches are not thread-safe, so they are used by one thread at a time
+        self._player_lock = threading.RLock()
 
     def _real_initialize(self):
         super()._real_initialize()
@@ -2402,7 +2408,7 @@ def _extract_comment_old(self, comment_renderer, parent=None):
 
         return info
 
-    def _comment_entries(self, root_continuation_data, ytcfg, video_id, parent=None, tracker=None):
+    def _comment_entries(self, root_continuation_data, ytcfg, video_id, parent=None, tracker=None, reply_pool=None, thread_num=None):
 
         get_single_config_arg = lambda c: self._configuration_arg(c, [''])[0]
 
@@ -2467,24 +2473,25 @@ def extract_thread(contents, entity_payloads):
                     continue
                 comment_id = comment['id']
 
-                if comment.get('is_pinned'):
-                    tracker['pinned_comment_ids'].add(comment_id)
-                # Sometimes YouTube may break and give us infinite looping comments.
-                # See: https://github.com/yt-dlp/yt-dlp/issues/6290
-                if comment_id in tracker['seen_comment_ids']:
-                    if comment_id in tracker['pinned_comment_ids'] and not comment.get('is_pinned'):
+                # The reply threads may be extracted concurrently
+                with tracker['lock']:
+                    if comment.get('is_pinned'):
+                        tracker['pinned_comment_ids'].add(comment_id)
+                    # Sometimes YouTube may break and give us infinite looping comments.
+                    # See: https://github.com/yt-dlp/yt-dlp/issues/6290
+                    is_looping = comment_id in tracker['seen_comment_ids']
+                    if is_looping and comment_id in tracker['pinned_comment_ids'] and not comment.get('is_pinned'):
                         # Pinned comments may appear a second time in newest first sort
                         # See: https://github.com/yt-dlp/yt-dlp/issues/6712
                         continue
+                    tracker['seen_comment_ids'].add(comment_id)
+                    tracker['running_total'] += 1
+                    tracker['total_reply_comments' if parent else 'total_parent_comments'] += 1
+                if is_looping:
                     self.report_warning(
                         'Detected YouTube comments looping. Stopping comment extraction '
                         f'{"for this thread" if parent else ""} as we probably cannot get any more.')
                     yield
-                else:
-                    tracker['seen_comment_ids'].add(comment['id'])
-
-                tracker['running_total'] += 1
-                tracker['total_reply_comments' if parent else 'total_parent_comments'] += 1
                 yield comment
 
                 # Attempt to get the replies
@@ -2493,12 +2500,41 @@ def extract_thread(contents, entity_payloads):
 
                 if comment_replies_renderer:
                     tracker['current_page_thread'] += 1
+                    if reply_pool:
+                        # The replies are fetched by prefetch_replies and put in place of this by the caller
+                        yield functools.partial(
+                            fetch_replies, comment_replies_renderer, comment.get('id'), tracker['current_page_thread'])
+                        continue
                     comment_entries_iter = self._comment_entries(
                         comment_replies_renderer, ytcfg, video_id,
                         parent=comment.get('id'), tracker=tracker)
                     yield from itertools.islice(comment_entries_iter, min(
                         max_replies_per_thread, max(0, max_replies - tracker['total_reply_comments'])))
 
+        def fetch_replies(comment_replies_renderer, parent_id, thread_num):
+            return list(itertools.islice(self._comment_entries(
+                comment_replies_renderer, ytcfg, video_id, parent=parent_id, tracker=tracker, thread_num=thread_num),
+                max_replies_per_thread))
+
+        def prefetch_replies(entries):
+            """Fetch the reply threads of the next comments, at most one per worker, while the comments are consumed"""
+            queued, pending = collections.deque(), 0
+            for entry in entries:
+                if callable(entry):
+                    # Wait for the replies of a previous thread before requesting more
+                    while pending >= workers:
+                        if isinstance(queued[0], concurrent.futures.Future):
+                            pending -= 1
+                        yield queued.popleft()
+                    entry = reply_pool.submit(entry)
+                    pending += 1
+                queued.append(entry)
+                if not entry:
+                    break
+                while queued and not isinstance(queued[0], concurrent.futures.Future):
+                    yield queued.popleft()
+            yield from queued
+
         # Keeps track of counts across recursive calls
         if not tracker:
             tracker = {
@@ -2509,6 +2545,7 @@ def extract_thread(contents, entity_payloads):
                 'total_reply_comments': 0,
                 'seen_comment_ids': set(),
                 'pinned_comment_ids': set(),
+                'lock': threading.Lock(),
             }
 
         # TODO: Deprecated
@@ -2522,6 +2559,10 @@ def extract_thread(contents, entity_payloads):
 
         _max_comments, max_parents, max_replies, max_replies_per_thread, *_ = (
             int_or_none(p, default=sys.maxsize) for p in self._configuration_arg('max_comments') + [''] * 4)
+        # How many replies each thread may have depends on the previous threads when the total is limited
+        if parent or max_replies != sys.maxsize:
+            reply_pool = None
+        workers = int_or_none(get_single_config_arg('comment_workers'), default=4)
 
         continuation = self._extract_continuation(root_continuation_data)
 
@@ -2548,7 +2589,7 @@ def extract_thread(contents, entity_payloads):
                     note_prefix = 'Downloading comment section API JSON'
                 else:
                     note_prefix = '    Downloading comment API JSON reply thread %d %s' % (
-                        tracker['current_page_thread'], comment_prog_str)
+                        thread_num or tracker['current_page_thread'], comment_prog_str)
             else:
                 note_prefix = '{}Downloading comment{} API JSON page {} {}'.format(
                     '       ' if parent else '', ' replies' if parent else '',
@@ -2592,9 +2633,15 @@ def extract_thread(contents, entity_payloads):
                         break
                     continue
 
-                for entry in extract_thread(continuation_items, mutations):
+                entries = extract_thread(continuation_items, mutations)
+                if reply_pool:
+                    entries = prefetch_replies(entries)
+                for entry in entries:
                     if not entry:
                         return
+                    elif isinstance(entry, concurrent.futures.Future):
+                        yield from entry.result()
+                        continue
                     yield entry
                 continuation = self._extract_continuation({'contents': continuation_items})
                 if continuation:
@@ -2619,7 +2666,14 @@ def _real_comment_extract(contents):
             renderer = next((
                 item for item in traverse_obj(contents, (..., 'itemSectionRenderer'), default={})
                 if item.get('sectionIdentifier') == 'comment-item-section'), None)
-            yield from self._comment_entries(renderer, ytcfg, video_id)
+            workers = int_or_none(self._configuration_arg('comment_workers', [''])[0], default=4)
+            reply_pool = concurrent.futures.ThreadPoolExecutor(
+                workers, thread_name_prefix=f'{self.IE_NAME}-comments') if workers > 1 else None
+            try:
+                yield from self._comment_entries(renderer, ytcfg, video_id, reply_pool=reply_pool)
+            finally:
+                if reply_pool:
+                    reply_pool.shutdown(wait=False, cancel_futures=True)
 
         max_comments = int_or_none(self._configuration_arg('max_comments', [''])[0])
         return itertools.islice(_real_comment_extract(contents), 0, max_comments)
@@ -2826,7 +2880,9 @@ def _fetch_po_token(self, client, **kwargs):
             bypass_cache=False,
         )
 
-        return self._pot_director.get_po_token(pot_request)
+        with self._downloader.timing_span(
+                'pot', self.IE_NAME, video_id=kwargs.get('video_id'), client=client, context=context):
+            return self._pot_director.get_po_token(pot_request)
 
     @staticmethod
     def _is_agegated(player_response):
@@ -2872,7 +2928,8 @@ def _extract_player_response(self, client, video_id, webpage_ytcfg, player_ytcfg
         if po_token:
             yt_query['serviceIntegrityDimensions'] = {'poToken': po_token}
 
-        sts = self._extract_signature_timestamp(video_id, player_url, webpage_ytcfg, fatal=False) if player_url else None
+        with self._player_lock:
+            sts = self._extract_signature_timestamp(video_id, player_url, webpage_ytcfg, fatal=False) if player_url else None
 
         use_ad_playback_context = (
             self._configuration_arg('use_ad_playback_context', ['false'])[0] != 'false'
@@ -2954,7 +3011,7 @@ def _extract_player_responses(self, clients, video_id, webpage, webpage_client,
                 f'{webpage_client} client initial player response', video_id, fatal=False)
 
         prs = []
-        deprioritized_prs = []
+        client_prs, deprioritized_prs = [], []
 
         if initial_pr and not self._invalid_player_response(initial_pr, video_id):
             # Android player_response does not have microFormats which are needed for
@@ -2964,68 +3021,33 @@ def _extract_player_responses(self, clients, video_id, webpage, webpage_client,
             prs.append({**initial_pr, 'streamingData': None})
 
         all_clients = set(clients)
-        clients = clients[::-1]
+        # Clients are keyed by the position they would have if they were tried one after another:
+        # a fallback client comes right after the client whose player response required it
+        pending = [((idx,), client) for idx, client in enumerate(clients)]
+        fallback_counts = collections.Counter()
 
-        def append_client(*client_names):
+        def append_client(key, *client_names):
             """ Append the first client name that exists but not already used """
             for client_name in client_names:
                 actual_client = _split_innertube_client(client_name)[0]
                 if actual_client in INNERTUBE_CLIENTS:
                     if actual_client not in all_clients:
-                        clients.append(client_name)
+                        pending.append(((*key, fallback_counts[key]), client_name))
+                        fallback_counts[key] += 1
                         all_clients.add(actual_client)
                         return
 
-        tried_iframe_fallback = False
-        player_url = visitor_data = data_sync_id = None
-        skipped_clients = {}
-        while clients:
-            deprioritize_pr = False
-            client, base_client, variant = _split_innertube_client(clients.pop())
-            player_ytcfg = webpage_ytcfg if client == webpage_client else {}
+        def download_ytcfg(client):
             if 'configs' not in self._configuration_arg('player_skip') and client != webpage_client:
-                player_ytcfg = self._download_ytcfg(client, video_id) or player_ytcfg
-
-            player_url = player_url or self._extract_player_url(webpage_ytcfg, player_ytcfg, webpage=webpage)
-            require_js_player = self._get_default_ytcfg(client).get('REQUIRE_JS_PLAYER')
-            if 'js' in self._configuration_arg('player_skip'):
-                require_js_player = False
-                player_url = None
-
-            if not player_url and not tried_iframe_fallback and require_js_player:
-                player_url = self._download_player_url(video_id)
-                tried_iframe_fallback = True
-
-            pr = None
-            if client == webpage_client and 'player_response' not in self._configuration_arg('webpage_skip'):
-                pr = initial_pr
-
-            visitor_data = visitor_data or self._extract_visitor_data(webpage_ytcfg, initial_pr, player_ytcfg)
-            data_sync_id = data_sync_id or self._extract_data_sync_id(webpage_ytcfg, initial_pr, player_ytcfg)
-
-            fetch_po_token_args = {
-                'client': client,
-                'visitor_data': visitor_data,
-                'video_id': video_id,
-                'data_sync_id': data_sync_id if self.is_authenticated else None,
-                'player_url': player_url if require_js_player else None,
-                'webpage': webpage,
-                'session_index': self._extract_session_index(webpage_ytcfg, player_ytcfg),
-                'ytcfg': player_ytcfg or self._get_default_ytcfg(client),
-            }
+                return self._download_ytcfg(client, video_id)
 
+        def fetch_player_response(client, pr, player_ytcfg, player_url, visitor_data, data_sync_id,
+                                  fetch_po_token_args, player_pot_policy):
             # Don't need a player PO token for WEB if using player response from webpage
-            player_pot_policy: PlayerPoTokenPolicy = self._get_default_ytcfg(client)['PLAYER_PO_TOKEN_POLICY']
-            player_po_token = None if pr else self.fetch_po_token(
-                context=_PoTokenContext.PLAYER, **fetch_po_token_args,
-                required=player_pot_policy.required or player_pot_policy.recommended)
-
-            fetch_gvs_po_token_func = functools.partial(
-                self.fetch_po_token, context=_PoTokenContext.GVS, **fetch_po_token_args)
-
-            fetch_subs_po_token_func = functools.partial(
-                self.fetch_po_token, context=_PoTokenContext.SUBS, **fetch_po_token_args)
-
+            with self._player_lock:
+                player_po_token = None if pr else self.fetch_po_token(
+                    context=_PoTokenContext.PLAYER, **fetch_po_token_args,
+                    required=player_pot_policy.required or player_pot_policy.recommended)
             try:
                 pr = pr or self._extract_player_response(
                     client, video_id,
@@ -3037,57 +3059,120 @@ def append_client(*client_names):
                     data_sync_id=data_sync_id,
                     po_token=player_po_token)
             except ExtractorError as e:
-                self.report_warning(e)
-                continue
-
-            if pr_id := self._invalid_player_response(pr, video_id):
-                skipped_clients[client] = pr_id
-            elif pr:
-                # Save client details for introspection later
-                innertube_context = traverse_obj(player_ytcfg or self._get_default_ytcfg(client), 'INNERTUBE_CONTEXT')
-                sd = pr.setdefault('streamingData', {})
-                sd[STREAMING_DATA_CLIENT_NAME] = client
-                sd[STREAMING_DATA_FETCH_GVS_PO_TOKEN] = fetch_gvs_po_token_func
-                sd[STREAMING_DATA_PLAYER_TOKEN_PROVIDED] = bool(player_po_token)
-                sd[STREAMING_DATA_INNERTUBE_CONTEXT] = innertube_context
-                sd[STREAMING_DATA_FETCH_SUBS_PO_TOKEN] = fetch_subs_po_token_func
-                sd[STREAMING_DATA_IS_PREMIUM_SUBSCRIBER] = is_premium_subscriber
-                sd[STREAMING_DATA_AVAILABLE_AT_TIMESTAMP] = self._get_available_at_timestamp(pr, video_id, client)
-                for f in traverse_obj(sd, (('formats', 'adaptiveFormats'), ..., {dict})):
-                    f[STREAMING_DATA_CLIENT_NAME] = client
-                    f[STREAMING_DATA_FETCH_GVS_PO_TOKEN] = fetch_gvs_po_token_func
-                    f[STREAMING_DATA_IS_PREMIUM_SUBSCRIBER] = is_premium_subscriber
-                    f[STREAMING_DATA_PLAYER_TOKEN_PROVIDED] = bool(player_po_token)
-                if deprioritize_pr:
-                    deprioritized_prs.append(pr)
-                else:
-                    prs.append(pr)
+                return None, player_po_token, e
+            return pr, player_po_token, None
 
-            # web_embedded can work around age-gate and age-verification for some embeddable videos
-            if self._is_agegated(pr) and variant != 'web_embedded':
-                append_client(f'web_embedded.{base_client}')
-            # Unauthenticated users will only get web_embedded client formats if age-gated
-            if self._is_agegated(pr) and not self.is_authenticated:
-                self.to_screen(
-                    f'{video_id}: This video is age-restricted; some formats may be missing '
-                    f'without authentication. {self._youtube_login_hint}', only_once=True)
+        tried_iframe_fallback = False
+        player_url = visitor_data = data_sync_id = None
+        skipped_clients = {}
+        with concurrent.futures.ThreadPoolExecutor(
+                self._PLAYER_RESPONSE_WORKERS, thread_name_prefix=f'{self.IE_NAME}-player') as pool:
+            # Fallback clients are only known once the player responses are seen,
+            # so all the clients known at a time are requested together
+            while pending:
+                wave = [(key, *_split_innertube_client(client)) for key, client in sorted(pending)]
+                pending.clear()
+                ytcfg_futures = [pool.submit(download_ytcfg, client) for _, client, _, _ in wave]
+
+                requests = []
+                for (key, client, base_client, variant), ytcfg_future in zip(wave, ytcfg_futures):
+                    player_ytcfg = ytcfg_future.result() or (webpage_ytcfg if client == webpage_client else {})
+
+                    player_url = player_url or self._extract_player_url(webpage_ytcfg, player_ytcfg, webpage=webpage)
+                    require_js_player = self._get_default_ytcfg(client).get('REQUIRE_JS_PLAYER')
+                    if 'js' in self._configuration_arg('player_skip'):
+                        require_js_player = False
+                        player_url = None
+
+                    if not player_url and not tried_iframe_fallback and require_js_player:
+                        player_url = self._download_player_url(video_id)
+                        tried_iframe_fallback = True
+
+                    pr = None
+                    if client == webpage_client and 'player_response' not in self._configuration_arg('webpage_skip'):
+                        pr = initial_pr
+
+                    visitor_data = visitor_data or self._extract_visitor_data(webpage_ytcfg, initial_pr, player_ytcfg)
+                    data_sync_id = data_sync_id or self._extract_data_sync_id(webpage_ytcfg, initial_pr, player_ytcfg)
+
+                    fetch_po_token_args = {
+                        'client': client,
+                        'visitor_data': visitor_data,
+                        'video_id': video_id,
+                        'data_sync_id': data_sync_id if self.is_authenticated else None,
+                        'player_url': player_url if require_js_player else None,
+                        'webpage': webpage,
+                        'session_index': self._extract_session_index(webpage_ytcfg, player_ytcfg),
+                        'ytcfg': player_ytcfg or self._get_default_ytcfg(client),
+                    }
+                    player_pot_policy: PlayerPoTokenPolicy = self._get_default_ytcfg(client)['PLAYER_PO_TOKEN_POLICY']
 
-            # EU countries require age-verification for accounts to access age-restricted videos
-            # If account is not age-verified, _is_agegated() will be truthy for non-embedded clients
-            embedding_is_disabled = variant == 'web_embedded' and self._is_unplayable(pr)
-            if self.is_authenticated and (self._is_agegated(pr) or embedding_is_disabled):
-                self.to_screen(
-                    f'{video_id}: This video is age-restricted and YouTube is requiring '
-                    'account age-verification; some formats may be missing', only_once=True)
-                # tv_embedded can work around the age-verification requirement for embeddable videos
-                # web_creator may work around age-verification for all videos but requires PO token
-                append_client('tv_embedded', 'web_creator')
+                    requests.append((key, client, base_client, variant, player_ytcfg, fetch_po_token_args, pool.submit(
+                        fetch_player_response, client, pr, player_ytcfg, player_url, visitor_data, data_sync_id,
+                        fetch_po_token_args, player_pot_policy)))
 
-            status = traverse_obj(pr, ('playabilityStatus', 'status', {str}))
-            if status not in ('OK', 'LIVE_STREAM_OFFLINE', 'AGE_CHECK_REQUIRED', 'AGE_VERIFICATION_REQUIRED'):
-                self.write_debug(f'{video_id}: {client} player response playability status: {status}')
+                for key, client, base_client, variant, player_ytcfg, fetch_po_token_args, future in requests:
+                    deprioritize_pr = False
+                    pr, player_po_token, error = future.result()
+                    if error:
+                        self.report_warning(error)
+                        continue
 
-        prs.extend(deprioritized_prs)
+                    fetch_gvs_po_token_func = functools.partial(
+                        self.fetch_po_token, context=_PoTokenContext.GVS, **fetch_po_token_args)
+
+                    fetch_subs_po_token_func = functools.partial(
+                        self.fetch_po_token, context=_PoTokenContext.SUBS, **fetch_po_token_args)
+
+                    if pr_id := self._invalid_player_response(pr, video_id):
+                        skipped_clients[client] = pr_id
+                    elif pr:
+                        # Save client details for introspection later
+                        innertube_context = traverse_obj(player_ytcfg or self._get_default_ytcfg(client), 'INNERTUBE_CONTEXT')
+                        sd = pr.setdefault('streamingData', {})
+                        sd[STREAMING_DATA_CLIENT_NAME] = client
+                        sd[STREAMING_DATA_FETCH_GVS_PO_TOKEN] = fetch_gvs_po_token_func
+                        sd[STREAMING_DATA_PLAYER_TOKEN_PROVIDED] = bool(player_po_token)
+                        sd[STREAMING_DATA_INNERTUBE_CONTEXT] = innertube_context
+                        sd[STREAMING_DATA_FETCH_SUBS_PO_TOKEN] = fetch_subs_po_token_func
+                        sd[STREAMING_DATA_IS_PREMIUM_SUBSCRIBER] = is_premium_subscriber
+                        sd[STREAMING_DATA_AVAILABLE_AT_TIMESTAMP] = self._get_available_at_timestamp(pr, video_id, client)
+                        for f in traverse_obj(sd, (('formats', 'adaptiveFormats'), ..., {dict})):
+                            f[STREAMING_DATA_CLIENT_NAME] = client
+                            f[STREAMING_DATA_FETCH_GVS_PO_TOKEN] = fetch_gvs_po_token_func
+                            f[STREAMING_DATA_IS_PREMIUM_SUBSCRIBER] = is_premium_subscriber
+                            f[STREAMING_DATA_PLAYER_TOKEN_PROVIDED] = bool(player_po_token)
+                        if deprioritize_pr:
+                            deprioritized_prs.append((key, pr))
+                        else:
+                            client_prs.append((key, pr))
+
+                    # web_embedded can work around age-gate and age-verification for some embeddable videos
+                    if self._is_agegated(pr) and variant != 'web_embedded':
+                        append_client(key, f'web_embedded.{base_client}')
+                    # Unauthenticated users will only get web_embedded client formats if age-gated
+                    if self._is_agegated(pr) and not self.is_authenticated:
+                        self.to_screen(
+                            f'{video_id}: This video is age-restricted; some formats may be missing '
+                            f'without authentication. {self._youtube_login_hint}', only_once=True)
+
+                    # EU countries require age-verification for accounts to access age-restricted videos
+                    # If account is not age-verified, _is_agegated() will be truthy for non-embedded clients
+                    embedding_is_disabled = variant == 'web_embedded' and self._is_unplayable(pr)
+                    if self.is_authenticated and (self._is_agegated(pr) or embedding_is_disabled):
+                        self.to_screen(
+                            f'{video_id}: This video is age-restricted and YouTube is requiring '
+                            'account age-verification; some formats may be missing', only_once=True)
+                        # tv_embedded can work around the age-verification requirement for embeddable videos
+                        # web_creator may work around age-verification for all videos but requires PO token
+                        append_client(key, 'tv_embedded', 'web_creator')
+
+                    status = traverse_obj(pr, ('playabilityStatus', 'status', {str}))
+                    if status not in ('OK', 'LIVE_STREAM_OFFLINE', 'AGE_CHECK_REQUIRED', 'AGE_VERIFICATION_REQUIRED'):
+                        self.write_debug(f'{video_id}: {client} player response playability status: {status}')
+
+        prs.extend(pr for _, pr in sorted(client_prs, key=lambda x: x[0]))
+        prs.extend(pr for _, pr in sorted(deprioritized_prs, key=lambda x: x[0]))
 
         if skipped_clients:
             self.report_warning(
@@ -3427,7 +3512,11 @@ def process_https_formats():
                         input=SigChallengeInput(challenges=[''.join(map(chr, range(spec_id))) for spec_id in s_challenges], player_url=player_url)))
 
                 if challenge_requests:
-                    for _challenge_request, challenge_response in self._jsc_director.bulk_solve(challenge_requests):
+                    with self._downloader.timing_span(
+                            'jsc', self.IE_NAME, video_id=video_id,
+                            challenges=len(n_challenges) + len(s_challenges)):
+                        challenge_responses = self._jsc_director.bulk_solve(challenge_requests)
+                    for _challenge_request, challenge_response in challenge_responses:
                         if challenge_response.type == JsChallengeType.SIG:
                             for challenge, result in challenge_response.output.results.items():
                                 spec_id = len(challenge)
@@ -1,3 +1,4 @@
 # Trigger import of built-in providers
+from ._builtin.disk_cache import DiskLRUPCP as _DiskLRUPCP  # noqa: F401
 from ._builtin.memory_cache import MemoryLRUPCP as _MemoryLRUPCP  # noqa: F401
 from ._builtin.webpo_cachespec import WebPoPCSP as _WebPoPCSP  # noqa: F401
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import contextlib
+import datetime as dt
+import json
+import os
+from threading import Lock
+
+from yt_dlp.extractor.youtube.pot._provider import BuiltinIEContentProvider
+from yt_dlp.extractor.youtube.pot.cache import (
+    PoTokenCacheProvider,
+    PoTokenCacheProviderError,
+    register_preference,
+    register_provider,
+)
+from yt_dlp.utils import int_or_none, locked_file, write_json_file
+from yt_dlp.version import __version__
+
+
+@register_provider
+class DiskLRUPCP(PoTokenCacheProvider, BuiltinIEContentProvider):
+    PROVIDER_NAME = 'disk'
+    DEFAULT_CACHE_SIZE = 100
+    CACHE_SECTION = 'youtube-pot'
+
+    # Serializes access between threads; the lock file only does so between processes
+    _lock = Lock()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        max_size = self._configuration_arg('max_size', [self.DEFAULT_CACHE_SIZE])[0]
+        self.max_size = int_or_none(max_size)
+        if self.max_size is None or self.max_size < 0:
+            self.logger.warning(
+                f'Invalid max_size {max_size!r} for the PO Token disk cache; using {self.DEFAULT_CACHE_SIZE}')
+            self.max_size = self.DEFAULT_CACHE_SIZE
+        # The keys read since the last write, from least to most recently used.
+        # They are only moved to the end of the cache on the next write, so that reads do not write
+        self._recently_used = {}
+
+    def is_available(self) -> bool:
+        return self.ie.cache.enabled and self.max_size > 0
+
+    @property
+    def _cache_fn(self):
+        return self.ie.cache._get_cache_fn(self.CACHE_SECTION, 'cache', 'json')
+
+    @staticmethod
+    def _now():
+        return int(dt.datetime.now(dt.timezone.utc).timestamp())
+
+    @contextlib.contextmanager
+    def _open(self):
+        """Yield the unexpired cache entries, ordered from least to most recently used,
+        and save any changes made to them"""
+        fn = self._cache_fn
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(fn), exist_ok=True)
+                with locked_file(f'{fn}.lock', 'a'):
+                    entries = self._load(fn)
+                    original = list(entries.items())
+                    yield entries
+                    if list(entries.items()) != original:
+                        # The file is replaced atomically so that readers never see a partial write
+                        write_json_file({'yt-dlp_version': __version__, 'data': entries}, fn)
+            except OSError as e:
+                raise PoTokenCacheProviderError(f'Unable to access {fn}: {e}', expected=True) from e
+
+    def _load(self, fn):
+        try:
+            with open(fn, encoding='utf-8') as f:
+                entries = json.load(f)['data']
+        except FileNotFoundError:
+            return {}
+        except (ValueError, KeyError, TypeError):
+            self.logger.warning(f'Discarding invalid PO Token disk cache {fn}')
+            return {}
+        now = self._now()
+        return {
+            key: entry for key, entry in entries.items()
+            if isinstance(entry, dict) and isinstance(entry.get('value'), str)
+            and isinstance(entry.get('expires_at'), int) and entry['expires_at'] >= now}
+
+    def _apply_recently_used(self, entries):
+        for key in self._recently_used:
+            if key in entries:
+                entries[key] = entries.pop(key)
+        self._recently_used.clear()
+
+    def get(self, key: str) -> str | None:
+        with self._open() as entries:
+            entry = entries.get(key)
+            if entry is None:
+                return None
+            self._recently_used.pop(key, None)
+            self._recently_used[key] = None
+            return entry['value']
+
+    def store(self, key: str, value: str, expires_at: int):
+        if expires_at < self._now():
+            return
+        with self._open() as entries:
+            self._apply_recently_used(entries)
+            entries.pop(key, None)
+            entries[key] = {'value': value, 'expires_at': expires_at}
+            for oldest_key in list(entries)[:-self.max_size]:
+                entries.pop(oldest_key)
+
+    def delete(self, key: str):
+        with self._open() as entries:
+            self._apply_recently_used(entries)
+            entries.pop(key, None)
+
+
+@register_preference(DiskLRUPCP)
+def disklru_preference(*_, **__):
+    # Disk cache is slower than the memory cache, so it should be looked up after it
+    return 5000
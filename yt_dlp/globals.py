@@ -22,6 +22,7 @@ def __repr__(self, /):
 all_plugins_loaded = Indirect(False)
 plugin_specs = Indirect({})
 plugin_dirs = Indirect(['default'])
+plugin_index_dir = Indirect(None)  # Where the plugin discovery index is cached; `None`=disabled
 
 plugin_ies = Indirect({})
 plugin_pps = Indirect({})
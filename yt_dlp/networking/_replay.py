@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import base64
+import collections
+import contextlib
+import gzip
+import hashlib
+import io
+import json
+import threading
+import types
+import urllib.parse
+import urllib.request
+
+from .common import RequestHandler, Response
+from .exceptions import HTTPError, TransportError
+
+FIXTURE_VERSION = 1
+
+
+def load_fixture(filename):
+    """Load a network fixture, gzip-compressed if the filename ends with .gz"""
+    with (gzip.open if filename.endswith('.gz') else open)(filename, 'rt', encoding='utf-8') as f:
+        fixture = json.load(f)
+    if fixture.get('version') != FIXTURE_VERSION:
+        raise ValueError(f'Unsupported network fixture version: {fixture.get("version")}')
+    return fixture
+
+
+def save_fixture(filename, exchanges, meta=None):
+    """Save a network fixture, gzip-compressed if the filename ends with .gz"""
+    fixture = {'version': FIXTURE_VERSION, 'meta': meta or {}, 'exchanges': exchanges}
+    with (gzip.open if filename.endswith('.gz') else open)(filename, 'wt', encoding='utf-8') as f:
+        json.dump(fixture, f, indent=1)
+
+
+def _request_keys(method, url, data_digest):
+    """@returns the keys to match a request with: exact, and without the query and data"""
+    url_parts = urllib.parse.urlsplit(url)
+    return (
+        f'{method} {url} {data_digest}',
+        f'{method} {url_parts._replace(query="", fragment="").geturl()}',
+    )
+
+
+def _data_digest(request):
+    return hashlib.sha256(request.data).hexdigest() if isinstance(request.data, bytes) else None
+
+
+def _make_response(recorded):
+    response = Response(
+        io.BytesIO(base64.b64decode(recorded['body'])), url=recorded['url'], headers={},
+        status=recorded['status'], reason=recorded['reason'])
+    for name, value in recorded['headers']:
+        response.headers.add_header(name, value)
+    return response
+
+
+class NetworkRecorder:
+    """Record the requests sent by a RequestDirector with their responses, as a network fixture
+
+    The responses are read completely when they are recorded,
+    so this is meant for extraction rather than for downloading media
+    """
+
+    def __init__(self):
+        self.exchanges = []
+        self._lock = threading.Lock()
+
+    def record(self, request, response=None, error=None):
+        """Record the response of the request, or the error that it failed with
+        @returns a response with the same content to be used instead of the recorded one"""
+        exchange = {'method': request.method, 'url': request.url, 'data': _data_digest(request)}
+        if response is not None:
+            with contextlib.closing(response):
+                body = response.read()
+            exchange['response'] = {
+                'url': response.url,
+                'status': response.status,
+                'reason': response.reason,
+                'headers': list(response.headers.items()),
+                'body': base64.b64encode(body).decode(),
+            }
+            response = _make_response(exchange['response'])
+        else:
+            exchange['error'] = str(error)
+        with self._lock:
+            self.exchanges.append(exchange)
+        return response
+
+    def save(self, filename, meta=None):
+        with self._lock:
+            save_fixture(filename, self.exchanges, meta)
+
+
+class ReplayRH(RequestHandler):
+    """Serve the responses of a network fixture instead of sending the requests
+
+    A request is matched with the recorded requests of the same method, URL and data, and else
+    with those of the same method and URL without the query, in the order they were recorded.
+    Once all the matching requests were served, the last one is served again.
+    Requests that were not recorded fail with a TransportError
+
+    @param fixture: The network fixture, or its filename
+    """
+    RH_NAME = 'replay'
+    _SUPPORTED_URL_SCHEMES = ('http', 'https')
+    _SUPPORTED_PROXY_SCHEMES = None
+    _SUPPORTED_FEATURES = None
+
+    def __init__(self, *, fixture, **kwargs):
+        super().__init__(**kwargs)
+        self.fixture = load_fixture(fixture) if isinstance(fixture, str) else fixture
+        self.requests = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._served = set()
+        self._index = collections.defaultdict(list)
+        for index, exchange in enumerate(self.fixture['exchanges']):
+            for key in _request_keys(exchange['method'], exchange['url'], exchange['data']):
+                self._index[key].append(index)
+
+    def _check_extensions(self, extensions):
+        super()._check_extensions(extensions)
+        # Nothing is sent, so all the extensions are supported
+        extensions.clear()
+
+    def _find_exchange(self, request):
+        keys = _request_keys(request.method, request.url, _data_digest(request))
+        with self._lock:
+            self.requests += 1
+            for key in keys:
+                index = next((i for i in self._index[key] if i not in self._served), None)
+                if index is not None:
+                    self._served.add(index)
+                    return self.fixture['exchanges'][index]
+            for key in keys:
+                if self._index[key]:
+                    return self.fixture['exchanges'][self._index[key][-1]]
+        return None
+
+    def _send(self, request):
+        exchange = self._find_exchange(request)
+        if exchange is None:
+            raise TransportError(f'No recorded response for {request.method} {request.url}')
+        elif 'error' in exchange:
+            raise TransportError(exchange['error'])
+
+        response = _make_response(exchange['response'])
+        with self._lock:
+            self.bytes += len(response.fp.getbuffer())
+        # CookieJar reads the headers with the deprecated Response.info()
+        self._get_cookiejar(request).extract_cookies(
+            types.SimpleNamespace(info=lambda: response.headers), urllib.request.Request(response.url))
+        if not 200 <= response.status < 300:
+            raise HTTPError(response)
+        return response
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import abc
+import contextlib
 import copy
 import enum
 import functools
@@ -9,6 +10,7 @@
 import urllib.parse
 import urllib.request
 import urllib.response
+import weakref
 from collections.abc import Iterable, Mapping
 from email.message import Message
 from http import HTTPStatus
@@ -16,7 +18,9 @@
 
 from ._helper import make_ssl_context, wrap_request_errors
 from .exceptions import (
+    HTTPError,
     NoSupportingHandlers,
+    RequestCancelled,
     RequestError,
     TransportError,
     UnsupportedRequest,
@@ -57,6 +61,9 @@ class RequestDirector:
     can be registered into the `preferences` set. These are used to sort handlers
     in order of preference.
 
+    If a recorder (see networking._replay.NetworkRecorder) is set,
+    the requests are recorded along with their responses or errors.
+
     @param logger: Logger instance.
     @param verbose: Print debug request information to stdout.
     """
@@ -66,12 +73,26 @@ def __init__(self, logger, verbose=False):
         self.preferences: set[Preference] = set()
         self.logger = logger  # TODO(Grub4k): default logger
         self.verbose = verbose
+        self.cancelled = False
+        self.recorder = None
+        self._responses = weakref.WeakSet()
 
     def close(self):
         for handler in self.handlers.values():
             handler.close()
         self.handlers.clear()
 
+    def cancel(self):
+        """
+        Make any further requests fail with RequestCancelled and
+        close the responses that may still be being read.
+        Unlike close, this can be called from another thread
+        """
+        self.cancelled = True
+        for response in list(self._responses):
+            with contextlib.suppress(Exception):
+                response.close()
+
     def add_handler(self, handler: RequestHandler):
         """Add a handler. If a handler of the same RH_KEY exists, it will overwrite it"""
         assert isinstance(handler, RequestHandler), 'handler must be a RequestHandler'
@@ -95,6 +116,8 @@ def send(self, request: Request) -> Response:
         """
         Passes a request onto a suitable RequestHandler
         """
+        if self.cancelled:
+            raise RequestCancelled
         if not self.handlers:
             raise RequestError('No request handlers configured')
 
@@ -115,6 +138,14 @@ def send(self, request: Request) -> Response:
             self._print_verbose(f'Sending request via "{handler.RH_NAME}"')
             try:
                 response = handler.send(request)
+            except HTTPError as e:
+                if self.recorder:
+                    e.response = self.recorder.record(request, e.response)
+                raise
+            except TransportError as e:
+                if self.recorder:
+                    self.recorder.record(request, error=e)
+                raise
             except RequestError:
                 raise
             except Exception as e:
@@ -125,6 +156,12 @@ def send(self, request: Request) -> Response:
                 continue
 
             assert isinstance(response, Response)
+            if self.recorder:
+                response = self.recorder.record(request, response)
+            self._responses.add(response)
+            if self.cancelled:  # cancelled while the request was being sent
+                response.close()
+                raise RequestCancelled
             return response
 
         raise NoSupportingHandlers(unsupported_errors, unexpected_errors)
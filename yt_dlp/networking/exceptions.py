@@ -54,6 +54,13 @@ class TransportError(RequestError):
     """Network related errors"""
 
 
+class RequestCancelled(RequestError):
+    """raised when a request is sent after the RequestDirector has been cancelled"""
+
+    def __init__(self, msg='The request was cancelled', **kwargs):
+        super().__init__(msg, **kwargs)
+
+
 class HTTPError(RequestError):
     def __init__(self, response: Response, redirect_loop=False):
         self.response = response
@@ -498,6 +498,25 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '--no-remote-components',
         dest='remote_components', action='store_const', const=[],
         help='Disallow fetching of all remote components, including any previously allowed by --remote-components or defaults.')
+    general.add_option(
+        '--daemon',
+        metavar='ADDRESS', dest='daemon', default=None,
+        help=(
+            'Run as a service that accepts download jobs as lines of JSON on a Unix socket ("unix:PATH") '
+            'or local TCP port ("[HOST:]PORT") instead of downloading any URLs. '
+            'Jobs are run with the other given options and reuse the loaded extractors, connections, cookies and caches. '
+            'Jobs can run commands as you, so a TCP port requires --daemon-secret-file. See "yt_dlp/daemon.py" for the protocol'))
+    general.add_option(
+        '--daemon-secret-file',
+        metavar='FILE', dest='daemon_secret_file', default=None,
+        help=(
+            'File with the secret that the requests to --daemon must have in their "secret" field. '
+            'It must only be readable by you, and is created with a new secret if it does not exist. '
+            'Required with a TCP port'))
+    general.add_option(
+        '--daemon-jobs',
+        metavar='N', dest='daemon_jobs', default=2, type=int,
+        help='Number of jobs to run at once with --daemon (default is %default)')
     general.add_option(
         '--flat-playlist',
         action='store_const', dest='extract_flat', const='in_playlist', default=False,
@@ -953,6 +972,17 @@ def _preset_alias_callback(option, opt_str, value, parser):
             'Containers that may be used when merging formats, separated by "/", e.g. "mp4/mkv". '
             'Ignored if no merge is required. '
             f'(currently supported: {", ".join(sorted(FFmpegMergerPP.SUPPORTED_EXTS))})'))
+    video_format.add_option(
+        '--stream-merge',
+        action='store_true', dest='stream_merge', default=False,
+        help=(
+            'Download the formats to be merged simultaneously and mux them with ffmpeg while downloading, '
+            'without writing intermediate files. Falls back to merging after download if this fails. '
+            'Only supported on Unix for formats that are downloaded natively'))
+    video_format.add_option(
+        '--no-stream-merge',
+        action='store_false', dest='stream_merge',
+        help='Download the formats to be merged separately and merge them afterwards (default)')
     video_format.add_option(
         '--allow-unplayable-formats',
         action='store_true', dest='allow_unplayable_formats', default=False,
@@ -1009,7 +1039,19 @@ def _preset_alias_callback(option, opt_str, value, parser):
     downloader.add_option(
         '-r', '--limit-rate', '--rate-limit',
         dest='ratelimit', metavar='RATE',
-        help='Maximum download rate in bytes per second, e.g. 50K or 4.2M')
+        help=(
+            'Maximum download rate in bytes per second, e.g. 50K or 4.2M. '
+            'It is shared by all the fragments and downloads that run at the same time'))
+    downloader.add_option(
+        '--limit-rate-per-host',
+        dest='ratelimit_per_host', metavar='RATE',
+        help='Maximum download rate from each host in bytes per second, e.g. 50K or 4.2M')
+    downloader.add_option(
+        '--limit-rate-burst',
+        dest='ratelimit_burst', metavar='SIZE',
+        help=(
+            'Number of bytes that can be downloaded at once above the rate limits after being idle, '
+            'e.g. 100K or 2M (default is a second of each rate limit)'))
     downloader.add_option(
         '--throttled-rate',
         dest='throttledratelimit', metavar='RATE',
@@ -1158,6 +1200,16 @@ def _preset_alias_callback(option, opt_str, value, parser):
             'For ffmpeg, arguments can be passed to different positions using the same syntax as --postprocessor-args. '
             'You can use this option multiple times to give different arguments to different downloaders '
             '(Alias: --external-downloader-args)'))
+    downloader.add_option(
+        '--aria2c-daemon',
+        action='store_true', dest='aria2c_daemon', default=False,
+        help=(
+            'Download with a single aria2c process that is kept running for all the downloads, '
+            'instead of starting one for each download. It is restarted if it exits unexpectedly'))
+    downloader.add_option(
+        '--no-aria2c-daemon',
+        action='store_false', dest='aria2c_daemon',
+        help='Start an aria2c process for each download (default)')
 
     workarounds = optparse.OptionGroup(parser, 'Workarounds')
     workarounds.add_option(
@@ -1372,6 +1424,24 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '--print-traffic',
         dest='debug_printtraffic', action='store_true', default=False,
         help='Display sent and read HTTP traffic')
+    verbosity.add_option(
+        '--timings-file',
+        metavar='FILE', dest='timings_file', default=None,
+        help=(
+            'Write the time spent in each phase of the processing of the videos to FILE, '
+            'e.g. extraction, webpage requests, format selection, downloads and postprocessing'))
+    verbosity.add_option(
+        '--timings-format',
+        metavar='FORMAT', dest='timings_format', default='jsonl', choices=('jsonl', 'prometheus'),
+        help=(
+            'Format of the timings file. One of "jsonl" (default) to append each timing as a line of JSON, '
+            'or "prometheus" to write aggregated counters as a Prometheus textfile'))
+    verbosity.add_option(
+        '--profile',
+        metavar='DIR', dest='profile', default=None,
+        help=(
+            'Profile each phase of the processing of the videos (see --timings-file) and write '
+            'a .pstats file per phase and video, and a summary of the slowest functions to DIR'))
 
     filesystem = optparse.OptionGroup(parser, 'Filesystem Options')
     filesystem.add_option(
@@ -1525,6 +1595,16 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '--no-write-comments', '--no-get-comments',
         action='store_false', dest='getcomments',
         help='Do not retrieve video comments unless the extraction is known to be quick (Alias: --no-get-comments)')
+    filesystem.add_option(
+        '--write-comments-jsonl',
+        action='store_true', dest='comments_jsonl', default=False,
+        help=(
+            'Write video comments to a JSON lines file while they are being retrieved, '
+            'instead of keeping them in memory and placing them in the infojson. Implies --write-comments'))
+    filesystem.add_option(
+        '--no-write-comments-jsonl',
+        action='store_false', dest='comments_jsonl',
+        help='Place retrieved comments in the infojson (default)')
     filesystem.add_option(
         '--load-info-json',
         dest='load_info_filename', metavar='FILE',
@@ -1553,6 +1633,25 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '--no-cookies-from-browser',
         action='store_const', const=None, dest='cookiesfrombrowser',
         help='Do not load cookies from browser (default)')
+    filesystem.add_option(
+        '--cookies-from-browser-domains',
+        metavar='DOMAINS', dest='cookiesfrombrowser_domains',
+        action='callback', type='str', default=[], callback=_list_from_options_callback,
+        help=(
+            'Only load the cookies of these domains and their subdomains from the browser, separated by commas, '
+            'e.g. --cookies-from-browser-domains "youtube.com,google.com". '
+            'Can be used multiple times. By default, all cookies are loaded'))
+    filesystem.add_option(
+        '--cookies-from-browser-cache',
+        action='store_true', dest='cookiesfrombrowser_cache', default=False,
+        help=(
+            'Cache the cookies loaded from the browser in the cache directory, and reuse them '
+            'until the browser\'s cookie database changes. The cache is encrypted with a random key '
+            'stored in the cache directory. Requires pycryptodomex'))
+    filesystem.add_option(
+        '--no-cookies-from-browser-cache',
+        action='store_false', dest='cookiesfrombrowser_cache',
+        help='Load the cookies from the browser on every run (default)')
     filesystem.add_option(
         '--cache-dir', dest='cachedir', default=None, metavar='DIR',
         help=(
@@ -1758,6 +1857,13 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '--ffmpeg-location', metavar='PATH',
         dest='ffmpeg_location',
         help='Location of the ffmpeg binary; either the path to the binary or its containing directory')
+    postproc.add_option(
+        '--postprocessor-workers',
+        metavar='N', dest='postprocessor_workers', default=0, type=int,
+        help=(
+            'Number of videos that may be post-processed in the background while the next ones are downloaded '
+            '(default is 0, i.e. post-process each video before downloading the next). '
+            'The "after_move" postprocessors (e.g. --exec) and the download archive are still processed in download order'))
     postproc.add_option(
         '--exec',
         metavar='[WHEN:]CMD', dest='exec_cmd', **when_prefix('after_move'),
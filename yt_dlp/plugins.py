@@ -1,3 +1,4 @@
+import collections.abc
 import contextlib
 import dataclasses
 import functools
@@ -7,6 +8,7 @@
 import importlib.util
 import inspect
 import itertools
+import json
 import os
 import pkgutil
 import sys
@@ -17,6 +19,7 @@
 from .globals import (
     Indirect,
     plugin_dirs,
+    plugin_index_dir,
     all_plugins_loaded,
     plugin_specs,
 )
@@ -27,8 +30,10 @@
     get_user_config_dirs,
     merge_dicts,
     orderedSet,
+    write_json_file,
     write_string,
 )
+from .version import __version__
 
 PACKAGE_NAME = 'yt_dlp_plugins'
 COMPAT_PACKAGE_NAME = 'ytdlp_plugins'
@@ -56,6 +61,10 @@ class PluginSpec:
     suffix: str
     destination: Indirect
     plugin_destination: Indirect
+    # Returns a class with the classmethods `index_module(module, classes)`, returning the JSON-serializable
+    # attributes of the classes or None if the module must always be imported, and
+    # `create(module_name, name, attributes)`, returning a class that imports the module only when needed
+    lazy_loader: collections.abc.Callable[[], type] | None = None
 
 
 class PluginLoader(importlib.abc.Loader):
@@ -78,30 +87,35 @@ def dirs_in_zip(archive):
     return ()
 
 
-def default_plugin_paths():
-    def _get_package_paths(*root_paths, containing_folder):
+def default_plugin_containers():
+    """Yield the default folders whose subfolders are plugin paths"""
+    def _get_containers(*root_paths, containing_folder):
         for config_dir in orderedSet(map(Path, root_paths), lazy=True):
             # We need to filter the base path added when running __main__.py directly
-            if config_dir == _BASE_PACKAGE_PATH:
-                continue
-            with contextlib.suppress(OSError):
-                yield from (config_dir / containing_folder).iterdir()
+            if config_dir != _BASE_PACKAGE_PATH:
+                yield config_dir / containing_folder
 
     # Load from yt-dlp config folders
-    yield from _get_package_paths(
+    yield from _get_containers(
         *get_user_config_dirs('yt-dlp'),
         *get_system_config_dirs('yt-dlp'),
         containing_folder='plugins',
     )
 
     # Load from yt-dlp-plugins folders
-    yield from _get_package_paths(
+    yield from _get_containers(
         get_executable_path(),
         *get_user_config_dirs(''),
         *get_system_config_dirs(''),
         containing_folder='yt-dlp-plugins',
     )
 
+
+def default_plugin_paths():
+    for container in default_plugin_containers():
+        with contextlib.suppress(OSError):
+            yield from container.iterdir()
+
     # Load from PYTHONPATH directories
     yield from (path for path in map(Path, sys.path) if path != _BASE_PACKAGE_PATH)
 
@@ -191,26 +205,127 @@ def get_regular_classes(module, module_name, suffix):
     ))
 
 
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _discovery_paths():
+    """Yield the paths whose contents determine which plugin packages are found"""
+    for candidate in plugin_dirs.value:
+        if candidate == 'default':
+            containers = default_plugin_containers()
+            roots = (path for path in map(Path, sys.path) if path != _BASE_PACKAGE_PATH)
+        else:
+            containers, roots = [Path(candidate)], []
+        for container in containers:
+            yield container
+            with contextlib.suppress(OSError):
+                yield from container.iterdir()
+        yield from roots
+
+
+class PluginIndex:
+    """
+    Discovery index of the plugins of a PluginSpec, cached in plugin_index_dir
+
+    It stores the classes of every plugin module, as indexed by the lazy loader of the spec,
+    and is valid as long as the modification times of the plugin folders and modules are unchanged
+    """
+
+    def __init__(self, plugin_spec):
+        self.lazy_loader = plugin_spec.lazy_loader()
+        self.filename = os.path.join(plugin_index_dir.value, 'plugins', f'{plugin_spec.module_name}.json')
+        self.modules = {}
+
+    @staticmethod
+    def _key(paths):
+        return {str(path): _mtime(path) for path in itertools.chain(_discovery_paths(), paths)}
+
+    def load(self):
+        """@returns {module_name: {name: attributes} or None} if the index is valid, else None"""
+        try:
+            with open(self.filename, encoding='utf-8') as f:
+                index = json.load(f)
+            if (index['yt-dlp_version'] == __version__
+                    and list(index['key'].items()) == list(self._key(index['paths']).items())):
+                return index['modules']
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def add(self, spec, module, classes):
+        indexed = module and self.lazy_loader.index_module(module, classes)
+        try:
+            json.dumps(indexed)
+        except (TypeError, ValueError):
+            indexed = None
+        # Modules that failed to import are indexed too, so that the error is not hidden
+        self.modules[spec.name] = indexed, spec.origin
+
+    def save(self, locations):
+        paths = [*locations, *(filename for _, filename in self.modules.values() if filename)]
+        try:
+            os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+            write_json_file({
+                'yt-dlp_version': __version__,
+                'key': self._key(paths),
+                'paths': paths,
+                'modules': {name: indexed for name, (indexed, _) in self.modules.items()},
+            }, self.filename)
+        except OSError as e:
+            write_string(f'WARNING: Could not write plugin index {self.filename}: {e}\n')
+
+    def get_classes(self, module_name, indexed):
+        return {name: self.lazy_loader.create(module_name, name, attributes) for name, attributes in indexed.items()}
+
+
+def _exec_module(spec, module_name):
+    try:
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    except Exception:
+        write_string(
+            f'Error while importing module {module_name!r}\n{traceback.format_exc(limit=-1)}',
+        )
+        return None
+    return module
+
+
 def load_plugins(plugin_spec: PluginSpec):
     name, suffix = plugin_spec.module_name, plugin_spec.suffix
     regular_classes = {}
     if os.environ.get('YTDLP_NO_PLUGINS') or not plugin_dirs.value:
         return regular_classes
 
-    for finder, module_name, _ in iter_modules(name):
-        if any(x.startswith('_') for x in module_name.split('.')):
-            continue
-        try:
+    index = PluginIndex(plugin_spec) if plugin_index_dir.value and plugin_spec.lazy_loader else None
+    indexed_modules = index and index.load()
+    if indexed_modules is not None:
+        # Only the modules that cannot be loaded lazily are imported
+        for module_name, indexed in indexed_modules.items():
+            if indexed is not None:
+                regular_classes.update(index.get_classes(module_name, indexed))
+                continue
+            spec = None
+            with contextlib.suppress(ModuleNotFoundError):
+                spec = importlib.util.find_spec(module_name)
+            if spec and (module := _exec_module(spec, module_name)):
+                regular_classes.update(get_regular_classes(module, module_name, suffix))
+    else:
+        for finder, module_name, _ in iter_modules(name):
+            if any(x.startswith('_') for x in module_name.split('.')):
+                continue
             spec = finder.find_spec(module_name)
-            module = importlib.util.module_from_spec(spec)
-            sys.modules[module_name] = module
-            spec.loader.exec_module(module)
-        except Exception:
-            write_string(
-                f'Error while importing module {module_name!r}\n{traceback.format_exc(limit=-1)}',
-            )
-            continue
-        regular_classes.update(get_regular_classes(module, module_name, suffix))
+            module = _exec_module(spec, module_name)
+            classes = dict(get_regular_classes(module, module_name, suffix)) if module else {}
+            regular_classes.update(classes)
+            if index:
+                index.add(spec, module, classes)
+        if index:
+            index.save(getattr(sys.modules.get(f'{PACKAGE_NAME}.{name}'), '__path__', []))
 
     # Compat: old plugin system using __init__.py
     # Note: plugins imported this way do not show up in directories()
@@ -0,0 +1,464 @@
+"""
+Native fixups of ISO base media (MP4) files
+
+These only rewrite the metadata boxes that need to change, either in place or by
+appending a new box and turning the obsolete ones into "free" boxes, so that the
+media data is never copied. Every fixup returns False if it cannot handle the
+file, in which case the caller should fall back to remuxing it with ffmpeg
+"""
+
+import os
+import struct
+
+from ..downloader.ism import box, full_box, s32, u32, u64
+
+# Movie (mvhd) and media (mdhd) headers have the duration at the same offset,
+# the track header (tkhd) has an additional track ID and reserved field before it
+_DURATION_OFFSETS = {
+    # box: (offset in version 0, offset in version 1)
+    b'mvhd': (16, 24),
+    b'mdhd': (16, 24),
+    b'tkhd': (20, 28),
+}
+_TIMESCALE_OFFSETS = (12, 20)
+_TRACK_ID_OFFSETS = (12, 20)
+
+# Boxes that are only meaningful in fragmented files
+_FRAGMENT_BOXES = (b'moof', b'sidx', b'styp', b'mfra')
+_MAX_HEADER_SIZE = 64 * 1024 * 1024
+
+TFHD_BASE_DATA_OFFSET = 0x1
+TFHD_SAMPLE_DESCRIPTION_INDEX = 0x2
+TFHD_DEFAULT_SAMPLE_DURATION = 0x8
+TFHD_DEFAULT_SAMPLE_SIZE = 0x10
+TFHD_DEFAULT_SAMPLE_FLAGS = 0x20
+TFHD_DEFAULT_BASE_IS_MOOF = 0x20000
+
+TRUN_DATA_OFFSET = 0x1
+TRUN_FIRST_SAMPLE_FLAGS = 0x4
+TRUN_SAMPLE_DURATION = 0x100
+TRUN_SAMPLE_SIZE = 0x200
+TRUN_SAMPLE_FLAGS = 0x400
+TRUN_SAMPLE_COMPOSITION_TIME_OFFSET = 0x800
+
+SAMPLE_IS_NON_SYNC = 0x10000
+
+
+def iter_boxes(data, start=0, end=None):
+    """Yield (type, payload start, payload end) of the boxes in data[start:end]"""
+    end = len(data) if end is None else end
+    while start < end:
+        if end - start < 8:
+            raise ValueError('Truncated box header')
+        size, box_type = struct.unpack_from('>I4s', data, start)
+        header_size = 8
+        if size == 1:
+            size, header_size = u64.unpack_from(data, start + 8)[0], 16
+        elif size == 0:
+            size = end - start
+        if size < header_size or start + size > end:
+            raise ValueError(f'Invalid size of {box_type!r} box')
+        yield box_type, start + header_size, start + size
+        start += size
+
+
+def find_box(data, start, end, *path):
+    """Get (payload start, payload end) of the first box at path, or None"""
+    for box_type in path:
+        start, end = next(((s, e) for t, s, e in iter_boxes(data, start, end) if t == box_type), (None, None))
+        if start is None:
+            return None
+    return start, end
+
+
+def _read_top_level_boxes(f):
+    """Get [(type, offset, header size, size)] of the top level boxes of the file"""
+    boxes, file_size = [], f.seek(0, os.SEEK_END)
+    offset = 0
+    while offset < file_size:
+        f.seek(offset)
+        header = f.read(16)
+        if len(header) < 8:
+            raise ValueError('Truncated box header')
+        size, box_type = struct.unpack_from('>I4s', header)
+        header_size = 8
+        if size == 1:
+            size, header_size = u64.unpack_from(header, 8)[0], 16
+        elif size == 0:
+            # Extends to the end of the file; cannot append anything after it
+            size, header_size = file_size - offset, None
+        if (header_size and size < header_size) or offset + size > file_size:
+            raise ValueError(f'Invalid size of {box_type!r} box')
+        boxes.append((box_type, offset, header_size, size))
+        offset += size
+    if not boxes or boxes[0][0] not in (b'ftyp', b'styp', b'moov', b'free', b'skip', b'sidx'):
+        raise ValueError('Not an MP4 file')
+    return boxes
+
+
+def _read_payload(f, box_info):
+    _, offset, header_size, size = box_info
+    if not header_size or size > _MAX_HEADER_SIZE:
+        raise ValueError('Unsupported box size')
+    f.seek(offset + header_size)
+    return f.read(size - header_size)
+
+
+def _free_box(f, box_info):
+    f.seek(box_info[1] + 4)
+    f.write(b'free')
+
+
+def _full_box_header(data, start):
+    return data[start], int.from_bytes(data[start + 1:start + 4], 'big')
+
+
+def _set_duration(data, box_type, start, duration):
+    """Set the duration field of a mvhd/mdhd/tkhd box payload in place"""
+    version = data[start]
+    offset = start + _DURATION_OFFSETS[box_type][version]
+    if version == 1:
+        u64.pack_into(data, offset, duration)
+    elif duration < 2 ** 32:
+        u32.pack_into(data, offset, duration)
+    else:
+        raise ValueError(f'Duration does not fit into version 0 {box_type!r} box')
+
+
+def _get_u32(data, start, offsets):
+    return u32.unpack_from(data, start + offsets[data[start]])[0]
+
+
+def fix_duplicate_moov(path):
+    """
+    Turn the repeated initialization segments of a fragmented file into free boxes
+
+    This is only done if all moov boxes are identical and the decode times keep increasing
+    """
+    with open(path, 'r+b') as f:
+        boxes = _read_top_level_boxes(f)
+        moovs = [b for b in boxes if b[0] == b'moov']
+        if len(moovs) < 2:
+            return True
+        moov = _read_payload(f, moovs[0])
+        if any(_read_payload(f, b) != moov for b in moovs[1:]):
+            return False
+
+        decode_times = {}
+        for moof in filter(lambda b: b[0] == b'moof', boxes):
+            data = _read_payload(f, moof)
+            for _, start, end in filter(lambda b: b[0] == b'traf', iter_boxes(data)):
+                tfhd, tfdt = find_box(data, start, end, b'tfhd'), find_box(data, start, end, b'tfdt')
+                if not tfhd or not tfdt:
+                    continue
+                track_id = u32.unpack_from(data, tfhd[0] + 4)[0]
+                version, _ = _full_box_header(data, tfdt[0])
+                decode_time = (u64 if version == 1 else u32).unpack_from(data, tfdt[0] + 4)[0]
+                if decode_time < decode_times.get(track_id, 0):
+                    return False
+                decode_times[track_id] = decode_time
+
+        ftyps = [b for b in boxes if b[0] == b'ftyp']
+        for duplicate in moovs[1:] + ftyps[1:]:
+            _free_box(f, duplicate)
+    return True
+
+
+def fix_duration(path):
+    """Recalculate the durations in the headers of a non-fragmented file from its sample tables"""
+    with open(path, 'r+b') as f:
+        boxes = _read_top_level_boxes(f)
+        moovs = [b for b in boxes if b[0] == b'moov']
+        if len(moovs) != 1 or any(b[0] == b'moof' for b in boxes):
+            return False
+        moov = bytearray(_read_payload(f, moovs[0]))
+        mvhd = find_box(moov, 0, len(moov), b'mvhd')
+        if not mvhd:
+            return False
+        movie_timescale = _get_u32(moov, mvhd[0], _TIMESCALE_OFFSETS)
+
+        movie_duration = 0
+        for _, start, end in filter(lambda b: b[0] == b'trak', iter_boxes(moov)):
+            tkhd = find_box(moov, start, end, b'tkhd')
+            mdhd = find_box(moov, start, end, b'mdia', b'mdhd')
+            stts = find_box(moov, start, end, b'mdia', b'minf', b'stbl', b'stts')
+            if not tkhd or not mdhd or not stts:
+                return False
+            entry_count = u32.unpack_from(moov, stts[0] + 4)[0]
+            media_duration = sum(
+                count * delta for count, delta in struct.iter_unpack('>II', moov[stts[0] + 8:stts[0] + 8 + entry_count * 8]))
+            timescale = _get_u32(moov, mdhd[0], _TIMESCALE_OFFSETS)
+            if not timescale:
+                return False
+            duration = media_duration * movie_timescale // timescale
+            _set_duration(moov, b'mdhd', mdhd[0], media_duration)
+            _set_duration(moov, b'tkhd', tkhd[0], duration)
+            movie_duration = max(movie_duration, duration)
+        _set_duration(moov, b'mvhd', mvhd[0], movie_duration)
+
+        _, offset, header_size, _ = moovs[0]
+        f.seek(offset + header_size)
+        f.write(moov)
+    return True
+
+
+class _Track:
+    def __init__(self, timescale):
+        self.timescale = timescale
+        self.defaults = (1, 0, 0, 0)  # sample description index, duration, size, flags
+        self.durations, self.sizes, self.composition_offsets, self.sync_samples = [], [], [], []
+        self.chunks = []  # (offset, sample count, sample description index)
+        self.start_time = self.decode_time = None
+
+    def set_decode_time(self, decode_time):
+        if self.decode_time is None:
+            self.start_time = self.decode_time = decode_time
+        elif decode_time < self.decode_time:
+            raise ValueError('Overlapping fragments')
+        elif decode_time > self.decode_time and self.durations:
+            # Fill gaps between the fragments by extending the last sample
+            self.durations[-1] += decode_time - self.decode_time
+            self.decode_time = decode_time
+
+    def add_sample(self, duration, size, flags, composition_offset):
+        self.durations.append(duration)
+        self.sizes.append(size)
+        self.sync_samples.append(not flags & SAMPLE_IS_NON_SYNC)
+        self.composition_offsets.append(composition_offset)
+        if self.decode_time is None:
+            self.start_time = self.decode_time = 0
+        self.decode_time += duration
+
+
+def _parse_moov(moov):
+    mvhd = find_box(moov, 0, len(moov), b'mvhd')
+    if not mvhd:
+        raise ValueError('Missing mvhd box')
+    tracks = {}
+    for _, start, end in filter(lambda b: b[0] == b'trak', iter_boxes(moov)):
+        tkhd = find_box(moov, start, end, b'tkhd')
+        mdhd = find_box(moov, start, end, b'mdia', b'mdhd')
+        stsz = find_box(moov, start, end, b'mdia', b'minf', b'stbl', b'stsz')
+        if not tkhd or not mdhd:
+            raise ValueError('Incomplete trak box')
+        if stsz and u32.unpack_from(moov, stsz[0] + 8)[0]:
+            raise ValueError('Samples in both moov and moof boxes are not supported')
+        tracks[_get_u32(moov, tkhd[0], _TRACK_ID_OFFSETS)] = _Track(_get_u32(moov, mdhd[0], _TIMESCALE_OFFSETS))
+    mvex = find_box(moov, 0, len(moov), b'mvex')
+    for _, start, _ in filter(lambda b: b[0] == b'trex', iter_boxes(moov, *mvex) if mvex else []):
+        track_id, *defaults = struct.unpack_from('>5I', moov, start + 4)
+        if track_id in tracks:
+            tracks[track_id].defaults = tuple(defaults)
+    return _get_u32(moov, mvhd[0], _TIMESCALE_OFFSETS), tracks
+
+
+def _parse_moof(data, moof_offset, tracks):
+    previous_data_end = None
+    for _, start, end in filter(lambda b: b[0] == b'traf', iter_boxes(data)):
+        tfhd = find_box(data, start, end, b'tfhd')
+        if not tfhd:
+            raise ValueError('Missing tfhd box')
+        _, flags = _full_box_header(data, tfhd[0])
+        track = tracks[u32.unpack_from(data, tfhd[0] + 4)[0]]
+        description_index, default_duration, default_size, default_flags = track.defaults
+        pos, base_offset = tfhd[0] + 8, None
+        if flags & TFHD_BASE_DATA_OFFSET:
+            base_offset = u64.unpack_from(data, pos)[0]
+            pos += 8
+        if flags & TFHD_SAMPLE_DESCRIPTION_INDEX:
+            description_index = u32.unpack_from(data, pos)[0]
+            pos += 4
+        if flags & TFHD_DEFAULT_SAMPLE_DURATION:
+            default_duration = u32.unpack_from(data, pos)[0]
+            pos += 4
+        if flags & TFHD_DEFAULT_SAMPLE_SIZE:
+            default_size = u32.unpack_from(data, pos)[0]
+            pos += 4
+        if flags & TFHD_DEFAULT_SAMPLE_FLAGS:
+            default_flags = u32.unpack_from(data, pos)[0]
+        if base_offset is None:
+            base_offset = moof_offset if flags & TFHD_DEFAULT_BASE_IS_MOOF or previous_data_end is None else previous_data_end
+
+        tfdt = find_box(data, start, end, b'tfdt')
+        if tfdt:
+            version, _ = _full_box_header(data, tfdt[0])
+            track.set_decode_time((u64 if version == 1 else u32).unpack_from(data, tfdt[0] + 4)[0])
+
+        data_offset = base_offset
+        for _, trun_start, _ in filter(lambda b: b[0] == b'trun', iter_boxes(data, start, end)):
+            version, flags = _full_box_header(data, trun_start)
+            sample_count = u32.unpack_from(data, trun_start + 4)[0]
+            pos, first_sample_flags = trun_start + 8, None
+            if flags & TRUN_DATA_OFFSET:
+                data_offset = base_offset + s32.unpack_from(data, pos)[0]
+                pos += 4
+            if flags & TRUN_FIRST_SAMPLE_FLAGS:
+                first_sample_flags = u32.unpack_from(data, pos)[0]
+                pos += 4
+            fields = [
+                (flag, fmt) for flag, fmt in (
+                    (TRUN_SAMPLE_DURATION, 'I'), (TRUN_SAMPLE_SIZE, 'I'), (TRUN_SAMPLE_FLAGS, 'I'),
+                    (TRUN_SAMPLE_COMPOSITION_TIME_OFFSET, 'i' if version else 'I'))
+                if flags & flag]
+            entry = struct.Struct('>' + ''.join(fmt for _, fmt in fields))
+            entries = data[pos:pos + entry.size * sample_count]
+            if len(entries) != entry.size * sample_count:
+                raise ValueError('Truncated trun box')
+            if not sample_count:
+                continue
+            track.chunks.append((data_offset, sample_count, description_index))
+            for i, values in enumerate(entry.iter_unpack(entries) if entry.size else [()] * sample_count):
+                sample = dict(zip((flag for flag, _ in fields), values))
+                size = sample.get(TRUN_SAMPLE_SIZE, default_size)
+                track.add_sample(
+                    sample.get(TRUN_SAMPLE_DURATION, default_duration), size,
+                    sample.get(TRUN_SAMPLE_FLAGS, first_sample_flags if i == 0 and first_sample_flags is not None
+                               else default_flags),
+                    sample.get(TRUN_SAMPLE_COMPOSITION_TIME_OFFSET, 0))
+                data_offset += size
+        previous_data_end = data_offset
+
+
+def _run_length(values):
+    runs = []
+    for value in values:
+        if runs and runs[-1][1] == value:
+            runs[-1][0] += 1
+        else:
+            runs.append([1, value])
+    return runs
+
+
+def _build_stbl(stsd, track):
+    sample_count = len(track.sizes)
+    stts = _run_length(track.durations)
+    payload = box(b'stsd', stsd) + full_box(b'stts', 0, 0, u32.pack(len(stts)) + b''.join(
+        struct.pack('>II', *run) for run in stts))
+
+    if any(track.composition_offsets):
+        version = 1 if min(track.composition_offsets) < 0 else 0
+        ctts = _run_length(track.composition_offsets)
+        payload += full_box(b'ctts', version, 0, u32.pack(len(ctts)) + b''.join(
+            struct.pack('>Ii' if version else '>II', *run) for run in ctts))
+
+    if not all(track.sync_samples):
+        sync_samples = [i for i, sync in enumerate(track.sync_samples, 1) if sync]
+        payload += full_box(b'stss', 0, 0, u32.pack(len(sync_samples)) + struct.pack(
+            f'>{len(sync_samples)}I', *sync_samples))
+
+    stsc = []
+    for chunk_number, (_, count, description_index) in enumerate(track.chunks, 1):
+        if not stsc or stsc[-1][1:] != (count, description_index):
+            stsc.append((chunk_number, count, description_index))
+    payload += full_box(b'stsc', 0, 0, u32.pack(len(stsc)) + b''.join(struct.pack('>3I', *entry) for entry in stsc))
+
+    if len(set(track.sizes)) == 1:
+        payload += full_box(b'stsz', 0, 0, struct.pack('>II', track.sizes[0], sample_count))
+    else:
+        payload += full_box(b'stsz', 0, 0, struct.pack(f'>II{sample_count}I', 0, sample_count, *track.sizes))
+
+    offsets = [offset for offset, *_ in track.chunks]
+    payload += full_box(b'co64', 0, 0, struct.pack(f'>I{len(offsets)}Q', len(offsets), *offsets))
+    return box(b'stbl', payload)
+
+
+def _build_trak(moov, start, end, tracks, movie_timescale):
+    data = bytearray(moov[start:end])
+    track = tracks[_get_u32(data, find_box(data, 0, len(data), b'tkhd')[0], _TRACK_ID_OFFSETS)]
+    media_duration = sum(track.durations)
+    duration = media_duration * movie_timescale // track.timescale
+
+    def rebuild(start, end):
+        payload = b''
+        for box_type, child_start, child_end in iter_boxes(data, start, end):
+            if box_type in (b'tkhd', b'mdhd'):
+                _set_duration(data, box_type, child_start, duration if box_type == b'tkhd' else media_duration)
+            elif box_type == b'elst':
+                version, _ = _full_box_header(data, child_start)
+                # A single edit with an empty duration spans the whole fragmented track
+                if u32.unpack_from(data, child_start + 4)[0] == 1 and not (
+                        u64 if version else u32).unpack_from(data, child_start + 8)[0]:
+                    (u64 if version else u32).pack_into(data, child_start + 8, duration)
+            elif box_type == b'stbl':
+                stsd = find_box(data, child_start, child_end, b'stsd')
+                if not stsd:
+                    raise ValueError('Missing stsd box')
+                payload += _build_stbl(data[stsd[0]:stsd[1]], track)
+                continue
+            elif box_type in (b'mdia', b'minf', b'edts'):
+                payload += box(box_type, rebuild(child_start, child_end))
+                continue
+            payload += box(box_type, data[child_start:child_end])
+        return payload
+
+    return box(b'trak', rebuild(0, len(data))), duration
+
+
+def defragment(path):
+    """
+    Convert a fragmented file into a regular one
+
+    A new moov box with the complete sample tables of all tracks is appended to the file,
+    and the original moov box and all fragment headers are turned into free boxes.
+    The sample tables refer to the media data in the existing mdat boxes
+    """
+    with open(path, 'r+b') as f:
+        boxes = _read_top_level_boxes(f)
+        moovs = [b for b in boxes if b[0] == b'moov']
+        moofs = [b for b in boxes if b[0] == b'moof']
+        if len(moovs) != 1 or not moofs or not boxes[-1][2]:
+            return False
+        moov = _read_payload(f, moovs[0])
+        movie_timescale, tracks = _parse_moov(moov)
+        for moof in moofs:
+            _parse_moof(_read_payload(f, moof), moof[1], tracks)
+        if not all(track.sizes for track in tracks.values()):
+            return False
+        elif len({track.start_time / track.timescale for track in tracks.values()}) > 1:
+            # The tracks cannot be realigned without an edit list
+            return False
+        file_size = boxes[-1][1] + boxes[-1][3]
+        if any(offset < 0 or offset > file_size for track in tracks.values() for offset, *_ in track.chunks):
+            raise ValueError('Sample data is outside of the file')
+
+        payload, movie_duration = b'', 0
+        for box_type, start, end in iter_boxes(moov):
+            if box_type == b'trak':
+                trak, duration = _build_trak(moov, start, end, tracks, movie_timescale)
+                payload += trak
+                movie_duration = max(movie_duration, duration)
+            elif box_type != b'mvex':
+                payload += box(box_type, moov[start:end])
+        payload = bytearray(payload)
+        _set_duration(payload, b'mvhd', find_box(payload, 0, len(payload), b'mvhd')[0], movie_duration)
+
+        ftyp = next((b for b in boxes if b[0] == b'ftyp'), None)
+        if ftyp:
+            original_brands = _read_payload(f, ftyp)
+            brands = bytearray(original_brands)
+            for i in range(0, len(brands) - 3, 4):
+                if i != 4 and brands[i:i + 4] == b'dash':  # skip minor version
+                    brands[i:i + 4] = b'isom'
+
+        # Everything that can fail to parse has been done; only the writes are left
+        obsolete = [b for b in boxes if b[0] in (b'moov', *_FRAGMENT_BOXES)]
+        f.seek(file_size)
+        try:
+            f.write(box(b'moov', payload))
+            for box_info in obsolete:
+                _free_box(f, box_info)
+            if ftyp:
+                f.seek(ftyp[1] + ftyp[2])
+                f.write(brands)
+            f.flush()
+        except OSError:
+            # Restore the original file, so that it can still be fixed up with ffmpeg
+            for box_type, offset, *_ in obsolete:
+                f.seek(offset + 4)
+                f.write(box_type)
+            if ftyp:
+                f.seek(ftyp[1] + ftyp[2])
+                f.write(original_brands)
+            f.truncate(file_size)
+            raise
+    return True
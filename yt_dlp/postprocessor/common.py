@@ -1,6 +1,8 @@
+import concurrent.futures
 import functools
 import json
 import os
+import threading
 
 from ..networking import Request
 from ..networking.exceptions import HTTPError, network_exceptions
@@ -166,6 +168,9 @@ def _hook_progress(self, status, info_dict):
             'info_dict': info_dict,
             'postprocessor': self.pp_key(),
         })
+        pool = getattr(self._downloader, '_pp_pool', None)
+        if pool:
+            status['queue_depth'] = pool.queue_depth
         for ph in self._progress_hooks:
             ph(status)
 
@@ -213,3 +218,83 @@ def _download_json(self, url, *, expected_http_errors=(404,)):
 
 class AudioConversionError(PostProcessingError):  # Deprecated
     pass
+
+
+class PostProcessingPool:
+    """
+    Runs postprocessing jobs on a bounded pool of worker threads
+
+    Each job has two stages. The first stage of all jobs may run concurrently.
+    The second stage of a job is run only after its first stage and the second
+    stages of all the previously submitted jobs have finished, i.e. the second
+    stages are run one at a time in the order of submission.
+
+    At most `workers` jobs are queued or running at once; submit() blocks until
+    one of them has finished. The first exception raised by any job is re-raised
+    by raise_error() or join().
+    """
+
+    def __init__(self, workers):
+        self._executor = concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix='yt-dlp-postprocessor')
+        self._slots = threading.Semaphore(workers)
+        self._lock = threading.Lock()
+        self._jobs = set()
+        self._last_ordered = None
+        self._error = None
+
+    @property
+    def queue_depth(self):
+        """Number of jobs that are queued or running"""
+        with self._lock:
+            return len(self._jobs)
+
+    def submit(self, func=None, ordered=None):
+        self._slots.acquire()
+        previous, done = self._last_ordered, threading.Event()
+        self._last_ordered = done
+
+        def job():
+            try:
+                if func:
+                    func()
+                if previous:
+                    previous.wait()
+                if ordered:
+                    ordered()
+            finally:
+                # Ensure the ordering holds even if this job failed
+                if previous:
+                    previous.wait()
+                done.set()
+
+        with self._lock:
+            future = self._executor.submit(job)
+            self._jobs.add(future)
+        future.add_done_callback(self._job_done)
+
+    def _job_done(self, future):
+        with self._lock:
+            self._jobs.discard(future)
+            if self._error is None and not future.cancelled():
+                self._error = future.exception()
+        self._slots.release()
+
+    def raise_error(self):
+        """Re-raise the first exception raised by a job since the last call, if any"""
+        with self._lock:
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def join(self):
+        """Wait for all the submitted jobs to finish"""
+        while True:
+            with self._lock:
+                jobs = set(self._jobs)
+            if not jobs:
+                break
+            concurrent.futures.wait(jobs)
+        self.raise_error()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
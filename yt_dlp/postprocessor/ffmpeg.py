@@ -1,14 +1,23 @@
+import bisect
 import collections
+import concurrent.futures
+import contextlib
 import contextvars
+import copy
 import functools
 import itertools
 import json
 import os
 import re
+import struct
 import subprocess
+import tempfile
+import threading
 import time
 
+from . import _mp4
 from .common import PostProcessor
+from .. import webvtt
 from ..compat import imghdr
 from ..utils import (
     MEDIA_EXTENSIONS,
@@ -127,7 +136,7 @@ def _determine_executables(self):
             paths[basename] = location
         return paths
 
-    _version_cache, _features_cache = {None: None}, {}
+    _version_cache, _features_cache, _encoders_cache = {None: None}, {}, {}
 
     def _get_ffmpeg_version(self, prog):
         path = self._paths.get(prog)
@@ -158,6 +167,16 @@ def _get_ffmpeg_version(self, prog):
         }
         return ver, features
 
+    @property
+    def _encoders(self):
+        """The names of the encoders of this ffmpeg build"""
+        path = self.executable
+        if path not in self._encoders_cache:
+            out = _get_exe_version_output(path, ['-hide_banner', '-encoders']) or ''
+            self._encoders_cache[path] = {
+                mobj.group(1) for mobj in re.finditer(r'(?m)^\s*[VAS][A-Z.]{5}\s+(\S+)', out)}
+        return self._encoders_cache[path]
+
     @property
     def _versions(self):
         return filter_dict({self.basename: self._version, self.probe_basename: self._probe_version})
@@ -232,38 +251,29 @@ def check_version(self):
     def get_audio_codec(self, path):
         if not self.probe_available and not self.available:
             raise PostProcessingError('ffprobe and ffmpeg not found. Please install or provide the path using --ffmpeg-location')
+        if self.probe_available:
+            try:
+                metadata = self._probe(path)
+            except (OSError, ValueError):
+                return None
+            return traverse_obj(metadata, (
+                'streams', lambda _, v: v['codec_type'] == 'audio', 'codec_name', {str}, any))
+
         try:
-            if self.probe_available:
-                cmd = [
-                    self.probe_executable,
-                    encodeArgument('-show_streams')]
-            else:
-                cmd = [
-                    self.executable,
-                    encodeArgument('-i')]
-            cmd.append(self._ffmpeg_filename_argument(path))
+            cmd = [self.executable, encodeArgument('-i'), self._ffmpeg_filename_argument(path)]
             self.write_debug(f'{self.basename} command line: {shell_quote(cmd)}')
-            stdout, stderr, returncode = Popen.run(
-                cmd, text=True, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            if returncode != (0 if self.probe_available else 1):
+            _, stderr, returncode = self._run_subprocess(
+                self.basename, cmd, text=True, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            if returncode != 1:
                 return None
         except OSError:
             return None
-        output = stdout if self.probe_available else stderr
-        if self.probe_available:
-            audio_codec = None
-            for line in output.split('\n'):
-                if line.startswith('codec_name='):
-                    audio_codec = line.split('=')[1].strip()
-                elif line.strip() == 'codec_type=audio' and audio_codec is not None:
-                    return audio_codec
-        else:
-            # Stream #FILE_INDEX:STREAM_INDEX[STREAM_ID](LANGUAGE): CODEC_TYPE: CODEC_NAME
-            mobj = re.search(
-                r'Stream\s*#\d+:\d+(?:\[0x[0-9a-f]+\])?(?:\([a-z]{3}\))?:\s*Audio:\s*([0-9a-z]+)',
-                output)
-            if mobj:
-                return mobj.group(1)
+        # Stream #FILE_INDEX:STREAM_INDEX[STREAM_ID](LANGUAGE): CODEC_TYPE: CODEC_NAME
+        mobj = re.search(
+            r'Stream\s*#\d+:\d+(?:\[0x[0-9a-f]+\])?(?:\([a-z]{3}\))?:\s*Audio:\s*([0-9a-z]+)',
+            stderr)
+        if mobj:
+            return mobj.group(1)
         return None
 
     def get_metadata_object(self, path, opts=[]):
@@ -272,12 +282,47 @@ def get_metadata_object(self, path, opts=[]):
                 self.report_warning('Only ffprobe is supported for metadata extraction')
             raise PostProcessingError('ffprobe not found. Please install or provide the path using --ffmpeg-location')
         self.check_version()
+        return self._probe(path, opts)
+
+    # Probe results shared by all the postprocessors, keyed by the identity of the file's current contents
+    _probe_cache, _probe_cache_size = collections.OrderedDict(), 64
+    _subprocess_stats = collections.defaultdict(lambda: [0, 0.0])
+    _probe_lock = threading.Lock()
+
+    def _probe_cache_key(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        # A rewritten file always gets a new inode, size or mtime
+        return (self.probe_executable, os.path.abspath(path), stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def _get_cached_probe(self, key):
+        with self._probe_lock:
+            result = self._probe_cache.get(key)
+            if result is not None:
+                self._probe_cache.move_to_end(key)
+        return copy.deepcopy(result)
+
+    def _cache_probe(self, key, result):
+        with self._probe_lock:
+            self._probe_cache[key] = copy.deepcopy(result)
+            while len(self._probe_cache) > self._probe_cache_size:
+                self._probe_cache.popitem(last=False)
+
+    def _probe(self, path, opts=()):
+        key = None if opts else self._probe_cache_key(path)
+        metadata = key and self._get_cached_probe(key)
+        if metadata is not None:
+            self.write_debug(f'Using cached ffprobe result for "{path}"')
+            return metadata
 
         cmd = [
             self.probe_executable,
             encodeArgument('-hide_banner'),
             encodeArgument('-show_format'),
             encodeArgument('-show_streams'),
+            encodeArgument('-show_chapters'),
             encodeArgument('-print_format'),
             encodeArgument('json'),
         ]
@@ -285,8 +330,33 @@ def get_metadata_object(self, path, opts=[]):
         cmd += opts
         cmd.append(self._ffmpeg_filename_argument(path))
         self.write_debug(f'ffprobe command line: {shell_quote(cmd)}')
-        stdout, _, _ = Popen.run(cmd, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.PIPE)
-        return json.loads(stdout)
+        stdout, _, returncode = self._run_subprocess(
+            'ffprobe', cmd, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.PIPE)
+        metadata = json.loads(stdout)
+        if key and returncode == 0:
+            self._cache_probe(key, metadata)
+        return metadata
+
+    @classmethod
+    def _invalidate_probe_cache(cls, path):
+        path = os.path.abspath(path)
+        with cls._probe_lock:
+            for key in [key for key in cls._probe_cache if key[1] == path]:
+                del cls._probe_cache[key]
+
+    def _run_subprocess(self, name, cmd, **kwargs):
+        start = time.perf_counter()
+        try:
+            return Popen.run(cmd, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._probe_lock:
+                stats = self._subprocess_stats[name]
+                stats[0] += 1
+                stats[1] += elapsed
+                count, total = stats
+            self.write_debug(
+                f'{name} finished in {elapsed:.2f}s ({count} {name} processes run in {total:.2f}s in total)')
 
     def get_stream_number(self, path, keys, value):
         streams = self.get_metadata_object(path)['streams']
@@ -329,6 +399,22 @@ def real_run_ffmpeg(self, input_path_opts, output_path_opts, *, expected_retcode
         oldest_mtime = min(
             os.stat(path).st_mtime for path, _ in input_path_opts if path)
 
+        cmd = self._ffmpeg_command(input_path_opts, output_path_opts)
+        self.write_debug(f'ffmpeg command line: {shell_quote(cmd)}')
+        _, stderr, returncode = self._run_subprocess(
+            self.basename, cmd, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.PIPE)
+        for out_path, _ in output_path_opts:
+            if out_path:
+                self._invalidate_probe_cache(out_path)
+        if returncode not in variadic(expected_retcodes):
+            self.write_debug(stderr)
+            raise FFmpegPostProcessorError(stderr.strip().splitlines()[-1])
+        for out_path, _ in output_path_opts:
+            if out_path:
+                self.try_utime(out_path, oldest_mtime, oldest_mtime)
+        return stderr
+
+    def _ffmpeg_command(self, input_path_opts, output_path_opts):
         cmd = [self.executable, encodeArgument('-y')]
         # avconv does not have repeat option
         if self.basename == 'ffmpeg':
@@ -351,17 +437,7 @@ def make_args(file, args, name, number):
             cmd += itertools.chain.from_iterable(
                 make_args(path, list(opts), arg_type, i + 1)
                 for i, (path, opts) in enumerate(path_opts) if path)
-
-        self.write_debug(f'ffmpeg command line: {shell_quote(cmd)}')
-        _, stderr, returncode = Popen.run(
-            cmd, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.PIPE)
-        if returncode not in variadic(expected_retcodes):
-            self.write_debug(stderr)
-            raise FFmpegPostProcessorError(stderr.strip().splitlines()[-1])
-        for out_path, _ in output_path_opts:
-            if out_path:
-                self.try_utime(out_path, oldest_mtime, oldest_mtime)
-        return stderr
+        return cmd
 
     def run_ffmpeg(self, path, out_path, opts, **kwargs):
         return self.run_ffmpeg_multiple_files([path], out_path, opts, **kwargs)
@@ -397,6 +473,145 @@ def force_keyframes(self, filename, timestamps):
             '-force_key_frames', ','.join(f'{t:.6f}' for t in timestamps)])
         return keyframe_file
 
+    def get_keyframes(self, path):
+        """
+        Get the sorted timestamps of the keyframes of the first video stream using a single probe pass.
+        Returns None if the file has no video stream, since then every packet can be cut at
+        """
+        key = self._probe_cache_key(path)
+        key = key and (*key, 'keyframes')
+        keyframes = key and self._get_cached_probe(key)
+        if keyframes is not None:
+            return keyframes or None
+
+        if self.probe_basename != 'ffprobe':
+            raise PostProcessingError('ffprobe not found. Please install or provide the path using --ffmpeg-location')
+        # Only the packet flags are read, so this does not need to decode anything
+        cmd = [
+            self.probe_executable, '-hide_banner', '-v', 'error', '-select_streams', 'v:0',
+            '-show_entries', 'packet=pts_time,flags', '-print_format', 'csv=print_section=0',
+            self._ffmpeg_filename_argument(path)]
+        self.write_debug(f'ffprobe command line: {shell_quote(cmd)}')
+        stdout, stderr, returncode = self._run_subprocess(
+            'ffprobe', cmd, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.PIPE)
+        if returncode:
+            raise FFmpegPostProcessorError(stderr.strip().splitlines()[-1] if stderr.strip() else 'Unable to find keyframes')
+        keyframes = sorted({
+            float(pts_time) for pts_time, _, flags in (
+                line.partition(',') for line in stdout.splitlines())
+            if 'K' in flags and pts_time not in ('', 'N/A')})
+        if key:
+            self._cache_probe(key, keyframes)
+        return keyframes or None
+
+    # Timestamps are only printed with microsecond precision by ffprobe
+    _KEYFRAME_TOLERANCE = 0.001
+    # The encoders to try for each codec. HEVC and MPEG-4 are not listed: the concat demuxer
+    # does not repeat their parameter sets in-band, and x265 keyframes are usually open GOP
+    _KEYFRAME_ENCODERS = {
+        'h264': ('libx264',),
+        'vp8': ('libvpx',),
+        'vp9': ('libvpx-vp9',),
+        'av1': ('libsvtav1', 'libaom-av1'),
+    }
+
+    @classmethod
+    def _plan_keyframe_cut(cls, keyframes, start, end=None):
+        """
+        Split the range [start, end) into parts that can be stream copied and parts that must be re-encoded.
+
+        Only the part before the first keyframe in the range needs to be re-encoded, the rest can be copied.
+        Returns a list of (start, end, copy); end is None for the end of the file
+        """
+        if keyframes is None:
+            return [(start, end, True)]
+        idx = bisect.bisect_left(keyframes, start - cls._KEYFRAME_TOLERANCE)
+        keyframe = keyframes[idx] if idx < len(keyframes) else None
+        if keyframe is not None and keyframe - start <= cls._KEYFRAME_TOLERANCE:
+            return [(start, end, True)]
+        elif keyframe is None or (end is not None and keyframe >= end - cls._KEYFRAME_TOLERANCE):
+            return [(start, end, False)]
+        return [(start, keyframe, False), (keyframe, end, True)]
+
+    def _keyframe_encoder_opts(self, path):
+        """Get the output options to re-encode the video in a way that can be concatenated with the original"""
+        stream = traverse_obj(self.get_metadata_object(path), (
+            'streams', lambda _, v: v['codec_type'] == 'video', any))
+        if not stream:
+            return list(self.stream_copy_opts(ext=determine_ext(path)))
+        encoder = next((
+            encoder for encoder in self._KEYFRAME_ENCODERS.get(stream.get('codec_name'), ())
+            if encoder in self._encoders), None)
+        if not encoder:
+            return None
+        opts = [*self.stream_copy_opts(ext=determine_ext(path)), '-c:v:0', encoder]
+        if stream.get('pix_fmt'):
+            opts += ['-pix_fmt', stream['pix_fmt']]
+        if encoder == 'libx264' and stream.get('profile') in ('Baseline', 'Main', 'High'):
+            opts += ['-profile:v', stream['profile'].lower()]
+        if stream.get('time_base') and determine_ext(path) in ('mp4', 'm4v', 'mov'):
+            opts += ['-video_track_timescale', stream['time_base'].partition('/')[2]]
+        return opts
+
+    def cut_at_keyframes(self, filename, out_file, ranges, *, workers=None):
+        """
+        Cut out the given ranges of the file and concatenate them into out_file.
+
+        The keyframes are found in a single probe pass, and only the parts of each range
+        before its first keyframe are re-encoded; everything else is stream copied.
+
+        @param ranges   List of (start, end) to keep; end may be None for the end of the file
+        @returns        False if the video codec cannot be re-encoded compatibly with this ffmpeg build,
+                        in which case the caller should fall back to force_keyframes
+        """
+        encoder_opts = self._keyframe_encoder_opts(filename)
+        if encoder_opts is None:
+            return False
+        keyframes = self.get_keyframes(filename)
+
+        in_files, concat_opts, jobs = [], [], []
+        for start, end, copy_part in itertools.chain.from_iterable(
+                self._plan_keyframe_cut(keyframes, start, end) for start, end in ranges):
+            if copy_part:
+                in_files.append(filename)
+                concat_opts.append(filter_dict({
+                    'inpoint': f'{start:.6f}' if start else None,
+                    'outpoint': f'{end:.6f}' if end is not None else None,
+                }))
+                continue
+            part_file = prepend_extension(out_file, f'part{len(jobs)}.temp')
+            in_opts = ['-ss', f'{start:.6f}'] + (['-t', f'{end - start:.6f}'] if end is not None else [])
+            jobs.append((part_file, in_opts))
+            in_files.append(part_file)
+            concat_opts.append({})
+
+        self.write_debug(f'Re-encoding {len(jobs)} partial GOPs of "{filename}"')
+        try:
+            self._run_parallel(
+                lambda part_file, in_opts: self.real_run_ffmpeg(
+                    [(filename, in_opts)], [(part_file, [*encoder_opts, '-avoid_negative_ts', 'make_zero'])]),
+                jobs, workers=workers)
+            self.concat_files(in_files, out_file, concat_opts)
+        finally:
+            for part_file, _ in jobs:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(part_file)
+        return True
+
+    def _run_parallel(self, func, args_list, *, workers=None):
+        """Call func(*args) for each of args_list over a pool of threads, re-raising the first error"""
+        workers = min(workers or os.cpu_count() or 1, len(args_list))
+        if workers <= 1:
+            return [func(*args) for args in args_list]
+        with concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix=self.pp_key()) as pool:
+            futures = [pool.submit(func, *args) for args in args_list]
+            try:
+                return [future.result() for future in futures]
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
     def concat_files(self, in_files, out_file, concat_opts=None):
         """
         Use concat demuxer to concatenate multiple files having identical streams.
@@ -817,36 +1032,128 @@ class FFmpegMergerPP(FFmpegPostProcessor):
     def run(self, info):
         filename = info['filepath']
         temp_filename = prepend_extension(filename, 'temp')
+        args = self._merge_opts(info['requested_formats'])
+        self.to_screen(f'Merging formats into "{filename}"')
+        self.run_ffmpeg_multiple_files(info['__files_to_merge'], temp_filename, args)
+        os.rename(temp_filename, filename)
+        return info['__files_to_merge'], info
+
+    def _merge_opts(self, formats, probe=True):
         args = ['-c', 'copy']
         audio_streams = 0
-        for (i, fmt) in enumerate(info['requested_formats']):
+        for (i, fmt) in enumerate(formats):
             if fmt.get('acodec') != 'none':
                 args.extend(['-map', f'{i}:a:0'])
-                aac_fixup = fmt['protocol'].startswith('m3u8') and self.get_audio_codec(fmt['filepath']) == 'aac'
+                aac_fixup = fmt['protocol'].startswith('m3u8') and (
+                    self.get_audio_codec(fmt['filepath']) == 'aac' if probe
+                    else (fmt.get('acodec') or '').startswith(('mp4a', 'aac')))
                 if aac_fixup:
                     args.extend([f'-bsf:a:{audio_streams}', 'aac_adtstoasc'])
                 audio_streams += 1
             if fmt.get('vcodec') != 'none':
                 args.extend(['-map', f'{i}:v:0'])
-        self.to_screen(f'Merging formats into "{filename}"')
-        self.run_ffmpeg_multiple_files(info['__files_to_merge'], temp_filename, args)
-        os.rename(temp_filename, filename)
-        return info['__files_to_merge'], info
+        return args
 
     def can_merge(self):
         # TODO: figure out merge-capable ffmpeg version
         return True
 
+    @staticmethod
+    def can_stream_merge(formats):
+        """Whether ffmpeg can demux all the formats without seeking in the input"""
+        return hasattr(os, 'mkfifo') and all(
+            f.get('protocol') in ('m3u8_native', 'http_dash_segments')
+            or (f.get('container') or '').endswith('_dash')
+            or f.get('ext') in ('webm', 'weba', 'mkv', 'mka')
+            for f in formats)
+
+    def stream_merge(self, info, filename, download):
+        """
+        Merge the requested formats into filename while they are being downloaded
+
+        Each format is written by download(path, fmt) into a named pipe
+        and all of them are muxed by a single ffmpeg process.
+        Unlike run(), no intermediate per-format files are created.
+
+        @returns    True if the merged file was written; False otherwise
+        """
+        self.check_version()
+        formats = info['requested_formats']
+        temp_filename = prepend_extension(filename, 'temp')
+        with tempfile.TemporaryDirectory(prefix='yt-dlp-merge-') as tmpdir:
+            fifos = [os.path.join(tmpdir, f'{i}.{fmt["ext"]}') for i, fmt in enumerate(formats)]
+            for fifo in fifos:
+                os.mkfifo(fifo)
+            cmd = self._ffmpeg_command(
+                [(fifo, []) for fifo in fifos], [(temp_filename, self._merge_opts(formats, probe=False))])
+
+            self.to_screen(f'Merging formats into "{filename}" while downloading')
+            self.write_debug(f'ffmpeg command line: {shell_quote(cmd)}')
+            proc = Popen(cmd, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.PIPE)
+            results = [False] * len(formats)
+
+            def download_format(idx):
+                try:
+                    results[idx] = download(fifos[idx], formats[idx])
+                except Exception as e:
+                    self.write_debug(f'Unable to stream format {formats[idx]["format_id"]}: {e}')
+                finally:
+                    # ffmpeg may be blocked waiting for this input
+                    if not results[idx]:
+                        proc.kill()
+
+            threads = [threading.Thread(target=download_format, args=(i,), daemon=True) for i in range(len(formats))]
+            for thread in threads:
+                thread.start()
+            try:
+                _, stderr = proc.communicate_or_kill()
+            finally:
+                # Writers may still be blocked opening a pipe that ffmpeg never (or no longer) reads.
+                # Briefly opening the read end unblocks them, after which their writes fail with EPIPE
+                while any(thread.is_alive() for thread in threads):
+                    for fifo in fifos:
+                        with contextlib.suppress(OSError):
+                            os.close(os.open(fifo, os.O_RDONLY | os.O_NONBLOCK))
+                    for thread in threads:
+                        thread.join(0.1)
+
+        if proc.returncode != 0 or not all(results):
+            if proc.returncode and stderr.strip():
+                self.write_debug(stderr)
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(temp_filename)
+            return False
+        os.replace(temp_filename, filename)
+        return True
+
 
 class FFmpegFixupPostProcessor(FFmpegPostProcessor):
-    def _fixup(self, msg, filename, options):
-        temp_filename = prepend_extension(filename, 'temp')
+    def _fixup(self, msg, filename, options, native=None):
+        """
+        Fix up the file with ffmpeg
 
+        @param native   Function that can fix up the file in place without ffmpeg.
+                        It should return False if the file is not supported
+        """
         self.to_screen(f'{msg} of "{filename}"')
+        if native and self._native_fixup(native, filename):
+            return
+
+        temp_filename = prepend_extension(filename, 'temp')
         self.run_ffmpeg(filename, temp_filename, options)
 
         os.replace(temp_filename, filename)
 
+    def _native_fixup(self, func, filename):
+        try:
+            if func(filename):
+                self._invalidate_probe_cache(filename)
+                return True
+        except (OSError, ValueError, struct.error) as e:
+            self.write_debug(f'Unable to fix up natively: {e}')
+        self.write_debug('Falling back to ffmpeg')
+        return False
+
 
 class FFmpegFixupStretchedPP(FFmpegFixupPostProcessor):
     @PostProcessor._restrict_to(images=False, audio=False)
@@ -862,7 +1169,8 @@ class FFmpegFixupM4aPP(FFmpegFixupPostProcessor):
     @PostProcessor._restrict_to(images=False, video=False)
     def run(self, info):
         if info.get('container') == 'm4a_dash':
-            self._fixup('Correcting container', info['filepath'], [*self.stream_copy_opts(), '-f', 'mp4'])
+            self._fixup('Correcting container', info['filepath'], [*self.stream_copy_opts(), '-f', 'mp4'],
+                        native=_mp4.defragment)
         return [], info
 
 
@@ -912,19 +1220,23 @@ def run(self, info):
 
 class FFmpegCopyStreamPP(FFmpegFixupPostProcessor):
     MESSAGE = 'Copying stream'
+    _NATIVE_FIXUP = None
 
     @PostProcessor._restrict_to(images=False)
     def run(self, info):
-        self._fixup(self.MESSAGE, info['filepath'], self.stream_copy_opts())
+        native = self._NATIVE_FIXUP if info['ext'] in ('mp4', 'm4a', 'm4v', 'mov') else None
+        self._fixup(self.MESSAGE, info['filepath'], self.stream_copy_opts(), native=native)
         return [], info
 
 
 class FFmpegFixupDurationPP(FFmpegCopyStreamPP):
     MESSAGE = 'Fixing video duration'
+    _NATIVE_FIXUP = staticmethod(_mp4.fix_duration)
 
 
 class FFmpegFixupDuplicateMoovPP(FFmpegCopyStreamPP):
     MESSAGE = 'Fixing duplicate MOOV atoms'
+    _NATIVE_FIXUP = staticmethod(_mp4.fix_duplicate_moov)
 
 
 class FFmpegSubtitlesConvertorPP(FFmpegPostProcessor):
@@ -988,7 +1300,8 @@ def run(self, info):
                 else:
                     sub_filenames.append(srt_file)
 
-            self.run_ffmpeg(old_file, new_file, ['-f', new_format])
+            if ext != 'vtt' or new_ext != 'srt' or not self._convert_vtt_to_srt(old_file, new_file):
+                self.run_ffmpeg(old_file, new_file, ['-f', new_format])
 
             with open(new_file, encoding='utf-8') as f:
                 subs[lang] = {
@@ -1002,6 +1315,16 @@ def run(self, info):
 
         return sub_filenames, info
 
+    def _convert_vtt_to_srt(self, old_file, new_file):
+        """Convert natively, streaming the file instead of invoking ffmpeg. Returns whether it succeeded"""
+        try:
+            with open(old_file, encoding='utf-8') as src, open(new_file, 'w', encoding='utf-8') as dst:
+                webvtt.convert_to_srt(src, dst)
+        except (webvtt.ParseError, UnicodeDecodeError) as e:
+            self.report_warning(f'Unable to convert {old_file} natively, falling back to ffmpeg: {e}')
+            return False
+        return True
+
 
 class FFmpegSplitChaptersPP(FFmpegPostProcessor):
     def __init__(self, downloader, force_keyframes=False):
@@ -1039,14 +1362,39 @@ def run(self, info):
             return [], info
 
         in_file = info['filepath']
-        if self._force_keyframes and len(chapters) > 1:
-            in_file = self.force_keyframes(in_file, (c['start_time'] for c in chapters))
+        keyframe_cut = self._force_keyframes and len(chapters) > 1
+        if keyframe_cut and self._keyframe_encoder_opts(in_file) is None:
+            in_file, keyframe_cut = self.force_keyframes(in_file, (c['start_time'] for c in chapters)), False
+        elif keyframe_cut:
+            # Probed here so that the workers share the cached keyframes
+            self.get_keyframes(in_file)
         self.to_screen(f'Splitting video by chapters; {len(chapters)} chapters found')
+        jobs = []
         for idx, chapter in enumerate(chapters):
-            destination, opts = self._ffmpeg_args_for_chapter(idx + 1, chapter, info)
-            self.real_run_ffmpeg([(in_file, opts)], [(destination, self.stream_copy_opts())])
-        if in_file != info['filepath']:
-            self._delete_downloaded_files(in_file, msg=None)
+            args = self._ffmpeg_args_for_chapter(idx + 1, chapter, info)
+            if args:
+                jobs.append((*args, chapter))
+
+        def split(destination, opts, chapter):
+            if keyframe_cut:
+                if not self.cut_at_keyframes(
+                        in_file, destination, [(chapter['start_time'], chapter['end_time'])], workers=1):
+                    raise FFmpegPostProcessorError('The video codec cannot be re-encoded')
+            else:
+                self.real_run_ffmpeg([(in_file, opts)], [(destination, self.stream_copy_opts())])
+
+        try:
+            try:
+                self._run_parallel(split, jobs)
+            except FFmpegPostProcessorError as e:
+                if not keyframe_cut:
+                    raise
+                self.report_warning(f'Unable to re-encode the chapters partially, re-encoding all of the video: {e}')
+                in_file, keyframe_cut = self.force_keyframes(in_file, (c['start_time'] for c in chapters)), False
+                self._run_parallel(split, jobs)
+        finally:
+            if in_file != info['filepath']:
+                self._delete_downloaded_files(in_file, msg=None)
         return [], info
 
 
@@ -3,9 +3,9 @@
 import os
 
 from .common import PostProcessor
-from .ffmpeg import FFmpegPostProcessor, FFmpegSubtitlesConvertorPP
+from .ffmpeg import FFmpegPostProcessor, FFmpegPostProcessorError, FFmpegSubtitlesConvertorPP
 from .sponsorblock import SponsorBlockPP
-from ..utils import PostProcessingError, orderedSet, prepend_extension
+from ..utils import PostProcessingError, float_or_none, orderedSet, prepend_extension
 
 _TINY_CHAPTER_DURATION = 1
 DEFAULT_SPONSORBLOCK_CHAPTER_TITLE = '[SponsorBlock]: %(category_names)l'
@@ -314,6 +314,14 @@ def remove_chapters(self, filename, ranges_to_cut, concat_opts, force_keyframes=
         in_file = filename
         out_file = prepend_extension(in_file, 'temp')
         if force_keyframes:
+            self.to_screen(f'Removing chapters from {filename} at keyframes')
+            try:
+                if self.cut_at_keyframes(in_file, out_file, [
+                        (float(opts.get('inpoint', 0)), float_or_none(opts.get('outpoint'))) for opts in concat_opts]):
+                    return out_file
+                self.write_debug('The video cannot be re-encoded partially')
+            except FFmpegPostProcessorError as e:
+                self.report_warning(f'Unable to re-encode the video partially, re-encoding all of it: {e}')
             in_file = self.force_keyframes(in_file, (t for c in ranges_to_cut for t in (c['start_time'], c['end_time'])))
         self.to_screen(f'Removing chapters from {filename}')
         self.concat_files([in_file] * len(concat_opts), out_file, concat_opts)
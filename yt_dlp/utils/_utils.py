@@ -2860,6 +2860,7 @@ def q(qid):
     'description': 'description',
     'annotation': 'annotations.xml',
     'infojson': 'info.json',
+    'comments': 'comments.jsonl',
     'link': None,
     'pl_video': None,
     'pl_thumbnail': None,
@@ -5112,6 +5113,7 @@ class _UnsafeExtensionError(Exception):
         # internal
         'description',
         'json',
+        'jsonl',
         'meta',
         'orig',
         'part',
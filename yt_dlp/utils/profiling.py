@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import collections
+import contextlib
+import cProfile
+import os
+import pstats
+import threading
+
+from ._utils import sanitize_filename
+
+
+class Profiler:
+    """Profile the timed phases of each video with cProfile
+
+    The phases are profiled separately, i.e. the profile of a phase excludes the phases nested in it.
+    A profile is written for each phase of each video, and the summary of all of them to summary.txt
+    """
+
+    def __init__(self, directory, top=30):
+        self.directory = directory
+        self.top = top
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def start(self):
+        """Start profiling a phase, pausing the profile of the enclosing phase of this thread
+        @returns the profile to pass to stop()"""
+        stack = self._local.__dict__.setdefault('stack', [])
+        if stack and stack[-1]:
+            stack[-1].disable()
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # Since Python 3.12, only one profile can be active at once across all threads
+            profile = None
+        stack.append(profile)
+        return profile
+
+    def stop(self, profile, span):
+        """Stop profiling the phase of the timing span and resume the profile of the enclosing phase"""
+        stack = self._local.stack
+        assert stack.pop() is profile
+        if profile:
+            profile.disable()
+            with self._lock:
+                key = (span.get('video_id') or 'NA', span['phase'])
+                if key in self._stats:
+                    self._stats[key].add(profile)
+                else:
+                    self._stats[key] = pstats.Stats(profile)
+        if stack and stack[-1]:
+            with contextlib.suppress(ValueError):
+                stack[-1].enable()
+
+    def close(self):
+        """Write the profiles and their summary to the directory"""
+        with self._lock:
+            if not self._stats:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            phase_times = collections.Counter()
+            for (video_id, phase), stats in self._stats.items():
+                stats.dump_stats(os.path.join(
+                    self.directory, f'{sanitize_filename(video_id, restricted=True)}.{phase}.pstats'))
+                phase_times[phase] += stats.total_tt
+
+            with open(os.path.join(self.directory, 'summary.txt'), 'w', encoding='utf-8') as f:
+                f.write('Time spent in each phase, excluding the phases nested in it\n')
+                for phase, total in phase_times.most_common():
+                    f.write(f'    {phase:<20}{total:.3f}s\n')
+                f.write(f'\nThe {self.top} functions with the most internal time\n')
+                summary = pstats.Stats(stream=f)
+                summary.add(*self._stats.values())
+                summary.sort_stats(pstats.SortKey.TIME).print_stats(self.top)
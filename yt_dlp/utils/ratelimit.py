@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import threading
+import time
+import urllib.parse
+
+
+class TokenBucket:
+    """A token bucket of bytes, refilled at `rate` bytes/second up to `burst` bytes
+
+    Reservations may take more tokens than available, leaving the bucket in debt.
+    The next reservations then wait for the debt to be paid, so that the
+    waits are in the order of the reservations, however large they are
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or rate
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount):
+        """Take amount tokens from the bucket
+        @returns the time in seconds to wait before using them"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate) - amount
+            self._updated = now
+            return max(0, -self._tokens / self.rate)
+
+
+class RateLimiter:
+    """Limit the download rate of all the downloads that use the same limiter
+
+    @param rate         Maximum rate of all the downloads, in bytes/second
+    @param host_rate    Maximum rate of the downloads from each host, in bytes/second
+    @param burst        Number of bytes that can be downloaded at once above the
+                        rates after an idle time. Defaults to a second of each rate
+    """
+    _limiters = {}
+    _limiters_lock = threading.Lock()
+
+    def __init__(self, rate=None, host_rate=None, burst=None):
+        self.rate = rate
+        self.host_rate = host_rate
+        self.burst = burst
+        self._bucket = rate and TokenBucket(rate, burst)
+        self._host_buckets = {}
+        self._host_buckets_lock = threading.Lock()
+
+    @classmethod
+    def get(cls, rate=None, host_rate=None, burst=None):
+        """@returns the limiter of the process with these limits, or None if there are none"""
+        if not rate and not host_rate:
+            return None
+        key = (rate, host_rate, burst)
+        with cls._limiters_lock:
+            if key not in cls._limiters:
+                cls._limiters[key] = cls(rate, host_rate, burst)
+            return cls._limiters[key]
+
+    @property
+    def block_size(self):
+        """The largest number of bytes to read at once to keep the rate smooth"""
+        return min(filter(None, (self.burst, self.rate, self.host_rate)))
+
+    def _host_bucket(self, url):
+        host = urllib.parse.urlparse(url).hostname
+        with self._host_buckets_lock:
+            if host not in self._host_buckets:
+                self._host_buckets[host] = TokenBucket(self.host_rate, self.burst)
+            return self._host_buckets[host]
+
+    def reserve(self, amount, url=None):
+        """Take amount bytes from the limits of the url
+        @returns the time in seconds to wait before downloading them"""
+        wait = self._bucket.reserve(amount) if self._bucket else 0
+        if self.host_rate and url:
+            wait = max(wait, self._host_bucket(url).reserve(amount))
+        return wait
+
+    def consume(self, amount, url=None):
+        """Take amount bytes from the limits of the url, sleeping until they are available"""
+        wait = self.reserve(amount, url)
+        if wait:
+            time.sleep(wait)
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import collections
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.parse
+
+
+class _NullSpanData(dict):
+    """Data of a disabled span. Anything stored in it is discarded"""
+
+    def __setitem__(self, key, value):
+        pass
+
+    def update(self, *args, **kwargs):
+        pass
+
+
+# Returned instead of a span when there are no timing hooks, so that disabled timing costs nothing
+NULL_SPAN = contextlib.nullcontext(_NullSpanData())
+
+
+@contextlib.contextmanager
+def timing_span(hooks, phase, name=None, *, profiler=None, **data):
+    """Time the body of the with statement and pass the span to the hooks
+
+    The yielded dict can be used to add data to the span.
+    The host is added to spans with an url.
+    If a profiler (see utils.profiling) is given, the body is also profiled
+    """
+    span = {'phase': phase, 'name': name, **data, 'start': time.time()}
+    if span.get('url') and 'host' not in span:
+        span['host'] = urllib.parse.urlparse(span['url']).hostname
+    start = time.perf_counter()
+    profile = profiler and profiler.start()
+    try:
+        yield span
+    except BaseException as e:
+        span['status'] = 'error'
+        span.setdefault('error', type(e).__name__)
+        raise
+    else:
+        span.setdefault('status', 'finished')
+    finally:
+        if profiler:
+            profiler.stop(profile, span)
+        span['duration'] = time.perf_counter() - start
+        for hook in hooks:
+            hook(span)
+
+
+class JSONLinesTimingWriter:
+    """Append each span to a file as a line of JSON"""
+
+    def __init__(self, filename):
+        self._file = open(filename, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def __call__(self, span):
+        line = json.dumps(span, ensure_ascii=False, default=str)
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(f'{line}\n')
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class PrometheusTimingWriter:
+    """Aggregate the spans into counters and write them as a textfile of the Prometheus exposition format
+
+    The file is replaced atomically, at most every FLUSH_INTERVAL seconds and when closed,
+    so that it can be read at any time by e.g. the textfile collector of node_exporter.
+    Errors writing the file are only raised when closed, not into the phases being timed
+    """
+    FLUSH_INTERVAL = 10
+
+    _METRICS = {
+        'yt_dlp_spans_total': ('counter', 'Number of timed phases', ('phase', 'name', 'status')),
+        'yt_dlp_span_seconds_total': ('counter', 'Time spent in each phase', ('phase', 'name')),
+        'yt_dlp_host_requests_total': ('counter', 'Number of requests and downloads per host', ('phase', 'host')),
+        'yt_dlp_host_seconds_total': ('counter', 'Time spent in requests and downloads per host', ('phase', 'host')),
+        'yt_dlp_downloaded_bytes_total': ('counter', 'Number of downloaded bytes', ('host',)),
+        'yt_dlp_downloaded_fragments_total': ('counter', 'Number of downloaded fragments', ('host',)),
+        'yt_dlp_download_retries_total': ('counter', 'Number of retried downloads and fragments', ('host',)),
+    }
+
+    def __init__(self, filename):
+        self._filename = filename
+        self._values = {metric: collections.Counter() for metric in self._METRICS}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        # Changing the umask to read it is not thread-safe, so do it once before any download
+        self._umask = os.umask(0)
+        os.umask(self._umask)
+        self._flush()
+
+    def __call__(self, span):
+        with self._lock:
+            values = self._values
+            phase, name = span['phase'], span.get('name') or ''
+            values['yt_dlp_spans_total'][phase, name, span['status']] += 1
+            values['yt_dlp_span_seconds_total'][phase, name] += span['duration']
+            if host := span.get('host'):
+                values['yt_dlp_host_requests_total'][phase, host] += 1
+                values['yt_dlp_host_seconds_total'][phase, host] += span['duration']
+                for metric, key in (
+                    ('yt_dlp_downloaded_bytes_total', 'bytes'),
+                    ('yt_dlp_downloaded_fragments_total', 'fragments'),
+                    ('yt_dlp_download_retries_total', 'retries'),
+                ):
+                    if span.get(key):
+                        values[metric][host,] += span[key]
+            if time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL:
+                with contextlib.suppress(OSError):
+                    self._flush()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+
+    @staticmethod
+    def _escape(value):
+        return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+    def _format(self):
+        for metric, (kind, description, labels) in self._METRICS.items():
+            yield f'# HELP {metric} {description}'
+            yield f'# TYPE {metric} {kind}'
+            for key, value in sorted(self._values[metric].items()):
+                label_str = ','.join(f'{label}="{self._escape(v)}"' for label, v in zip(labels, key))
+                yield f'{metric}{{{label_str}}} {value}'
+
+    def _flush(self):
+        self._last_flush = time.monotonic()
+        tf = tempfile.NamedTemporaryFile(
+            prefix=f'{os.path.basename(self._filename)}.', dir=os.path.dirname(self._filename) or '.',
+            suffix='.tmp', delete=False, mode='w', encoding='utf-8')
+        try:
+            with tf:
+                tf.write(''.join(f'{line}\n' for line in self._format()))
+            # The temporary file is only readable by the owner
+            os.chmod(tf.name, 0o666 & ~self._umask)
+            os.replace(tf.name, self._filename)
+        except Exception:
+            with contextlib.suppress(OSError):
+                os.remove(tf.name)
+            raise
+
+
+TIMING_WRITERS = {
+    'jsonl': JSONLinesTimingWriter,
+    'prometheus': PrometheusTimingWriter,
+}
@@ -8,6 +8,8 @@
 in RFC 8216 §3.5 <https://tools.ietf.org/html/rfc8216#section-3.5>.
 """
 
+import codecs
+import html
 import io
 import re
 
@@ -114,6 +116,13 @@ def _format_ts(ts):
     return '%02u:%02u:%02u.%03u' % timetuple_from_msec(int((ts + 45) // 90))
 
 
+def _format_srt_ts(ts):
+    """
+    Convert an MPEG PES timestamp into a SubRip timestamp.
+    """
+    return '%02u:%02u:%02u,%03u' % timetuple_from_msec(int((ts + 45) // 90))
+
+
 class Block:
     """
     An abstract WebVTT block.
@@ -333,7 +342,9 @@ def as_json(self):
         }
 
     def __eq__(self, other):
-        return self.as_json == other.as_json
+        return (
+            (self.id, self.start, self.end, self.text, self.settings)
+            == (other.id, other.start, other.end, other.text, other.settings))
 
     @classmethod
     def from_json(cls, json):
@@ -353,46 +364,176 @@ def hinges(self, other):
         return self.start <= self.end == other.start <= other.end
 
 
+class StreamParser:
+    """
+    An incremental WebVTT parser. Text (or bytes) can be fed to it in chunks
+    of any size, and the blocks are yielded as soon as they are complete.
+    Since blocks can not contain blank lines, only the incomplete trailing
+    block is ever buffered.
+    """
+
+    _REGEX_BLOCK_END = re.compile(r'(?:\r\n|\n|\r(?!\n)){2,}')
+
+    def __init__(self):
+        self._buffer = ''
+        self._scan_pos = 0
+        self._decoder = None
+        self._state = 'magic'
+
+    def feed(self, data, final=False):
+        """
+        Add data to the stream and yield the blocks that are now complete.
+        If final is set, the data is the end of the stream
+        """
+        if isinstance(data, bytes):
+            if not self._decoder:
+                self._decoder = codecs.getincrementaldecoder('utf-8')()
+            data = self._decoder.decode(data, final)
+        self._buffer += data
+
+        end = len(self._buffer)
+        if not final:
+            end = None
+            # A trailing \r may be the first half of a \r\n
+            scan_end = len(self._buffer) - self._buffer.endswith('\r')
+            for m in self._REGEX_BLOCK_END.finditer(self._buffer, max(self._scan_pos - 1, 0), scan_end):
+                end = m.end()
+            if end is None:
+                self._scan_pos = scan_end
+                return
+        data, self._buffer, self._scan_pos = self._buffer[:end], self._buffer[end:], 0
+        yield from self._parse(_MatchParser(data))
+
+    def close(self):
+        """Yield the remaining blocks at the end of the stream"""
+        yield from self.feed(b'' if self._decoder else '', final=True)
+
+    def _parse(self, parser):
+        if self._state == 'magic':
+            yield Magic.parse(parser)
+            self._state = 'header'
+
+        while self._state == 'header' and not parser.match(_REGEX_EOF):
+            if parser.consume(_REGEX_BLANK):
+                continue
+
+            block = RegionBlock.parse(parser)
+            if block:
+                yield block
+                continue
+            block = StyleBlock.parse(parser)
+            if block:
+                yield block
+                continue
+            block = CommentBlock.parse(parser)
+            if block:
+                yield block  # XXX: or skip
+                continue
+
+            self._state = 'cues'
+
+        while not parser.match(_REGEX_EOF):
+            if parser.consume(_REGEX_BLANK):
+                continue
+
+            block = CommentBlock.parse(parser)
+            if block:
+                yield block  # XXX: or skip
+                continue
+            block = CueBlock.parse(parser)
+            if block:
+                yield block
+                continue
+
+            raise ParseError(parser)
+
+
 def parse_fragment(frag_content):
     """
     A generator that yields (partially) parsed WebVTT blocks when given
     a bytes object containing the raw contents of a WebVTT file.
     """
+    return StreamParser().feed(frag_content, final=True)
 
-    parser = _MatchParser(frag_content.decode())
 
-    yield Magic.parse(parser)
+class CueWindow:
+    """
+    Merges the cues that are repeated or continued in the following fragments
+    of a stream. Each cue is held back until no later cue can repeat or extend
+    it; at most max_size cues are held back at once.
 
-    while not parser.match(_REGEX_EOF):
-        if parser.consume(_REGEX_BLANK):
-            continue
+    The state of the window is kept in the list `cues`, which is updated in
+    place and can be serialized as JSON to resume the stream later.
+    """
 
-        block = RegionBlock.parse(parser)
-        if block:
-            yield block
-            continue
-        block = StyleBlock.parse(parser)
-        if block:
-            yield block
-            continue
-        block = CommentBlock.parse(parser)
-        if block:
-            yield block  # XXX: or skip
-            continue
+    MAX_SIZE = 1000
+
+    def __init__(self, cues=None, max_size=None):
+        self.cues = [] if cues is None else cues
+        self.max_size = max_size or self.MAX_SIZE
+        self._blocks = [CueBlock.from_json(cue) for cue in self.cues]
+
+    def push(self, block):
+        """Add a cue to the window and return the cues which are ready to be written"""
+        overflow = len(self._blocks) + 1 - self.max_size
+        ready = self._blocks[:max(overflow, 0)]
+        if overflow > 0:
+            del self._blocks[:overflow], self.cues[:overflow]
+
+        i, is_new = 0, True
+        while i < len(self._blocks):
+            wblock = self._blocks[i]
+            if wblock.hinges(block):
+                wblock.end = self.cues[i]['end'] = block.end
+                is_new = False
+            elif wblock == block:
+                is_new = False
+            elif wblock.end <= block.start:
+                ready.append(wblock)
+                del self._blocks[i], self.cues[i]
+                continue
+            i += 1
 
-        break
+        if is_new:
+            self._blocks.append(block)
+            self.cues.append(block.as_json)
+        return ready
+
+    def flush(self):
+        """Remove all cues from the window and return them"""
+        ready = self._blocks
+        self._blocks = []
+        self.cues.clear()
+        return ready
+
+
+_REGEX_CUE_TAG = re.compile(r'<(/?)([^\s>./]*)[^>]*>')
+
+
+def _cue_text_to_srt(text):
+    # SubRip only understands the basic formatting tags
+    text = _REGEX_CUE_TAG.sub(
+        lambda m: f'<{m.group(1)}{m.group(2)}>' if m.group(2) in ('b', 'i', 'u') else '', text)
+    return html.unescape('\n'.join(text.splitlines()))
 
-    while not parser.match(_REGEX_EOF):
-        if parser.consume(_REGEX_BLANK):
-            continue
 
-        block = CommentBlock.parse(parser)
-        if block:
-            yield block  # XXX: or skip
+def convert_to_srt(src, dst, chunk_size=65536):
+    """
+    Convert a WebVTT stream into SubRip, reading the file object src
+    in chunks and writing the result into the text file object dst
+    """
+    parser, index = StreamParser(), 0
+
+    def blocks():
+        while data := src.read(chunk_size):
+            yield from parser.feed(data)
+        yield from parser.close()
+
+    for block in blocks():
+        if not isinstance(block, CueBlock):
             continue
-        block = CueBlock.parse(parser)
-        if block:
-            yield block
+        text = _cue_text_to_srt(block.text)
+        if not text.strip():
             continue
-
-        raise ParseError(parser)
+        index += 1
+        dst.write(f'{index}\n{_format_srt_ts(block.start)} --> {_format_srt_ts(block.end)}\n{text}\n\n')